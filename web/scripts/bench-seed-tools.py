@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Seed Tools Benchmark
+Measures the throughput of the Python seed-data tools on synthetic catalogs
+built by scaling up the brand files in db/seeds/data/03-store/products.
+
+Usage:
+  python bench-seed-tools.py --sizes 1000 100000 --files 20
+  python bench-seed-tools.py --only categorize analyze --baseline .cache/bench/previous.json
+
+The urlcheck benchmark runs against a local stub server and needs no network.
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import multiprocessing
+import platform
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is reported as null
+    resource = None
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+PRODUCTS_DIR = SCRIPTS_DIR.parent / 'db' / 'seeds' / 'data' / '03-store' / 'products'
+RESULTS_DIR = SCRIPTS_DIR / '.cache' / 'bench'
+
+SQL_HOSTS = [
+    'images.unsplash.com', 'http2.mlstatic.com', 'cdn.shopify.com', 'm.media-amazon.com',
+    'www.royalcanin.com', 'purina.com.py', 'example.org',
+]
+
+
+def load_script(path: Path):
+    """Import a script whose file name is not a valid module name (fix-categories.py)
+
+    The module is registered in sys.modules so its functions can be pickled
+    for worker processes.
+    """
+    spec = importlib.util.spec_from_file_location(path.stem.replace('-', '_'), path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+class PhaseTimer:
+    def __init__(self):
+        self.phases = defaultdict(float)
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] += time.perf_counter() - start
+
+    def rounded(self) -> dict:
+        return {name: round(seconds, 4) for name, seconds in self.phases.items()}
+
+
+def template_products() -> list:
+    products = []
+    for f in sorted(PRODUCTS_DIR.glob('products-*.json')):
+        with open(f, 'r', encoding='utf-8') as fh:
+            products.extend(json.load(fh).get('products', []))
+    return products
+
+
+def synthetic_products(size: int) -> list:
+    """size products cycled from the brand files, each with a unique name and SKU"""
+    templates = template_products()
+    products = []
+    for i in range(size):
+        product = dict(templates[i % len(templates)])
+        product['name'] = f"{product.get('name', '')} #{i}"
+        product['sku'] = f"{product.get('sku', 'SKU')}-{i}"
+        products.append(product)
+    return products
+
+
+def build_catalog(size: int, files: int, workdir: Path) -> list:
+    products = synthetic_products(size)
+    per_file = -(-size // files)
+    paths = []
+    for n in range(files):
+        chunk = products[n * per_file:(n + 1) * per_file]
+        if not chunk:
+            break
+        path = workdir / f"products-bench-{n:03d}.json"
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'brand_slug': f"bench-{n}", 'products': chunk}, f, ensure_ascii=False, indent=2)
+        paths.append(path)
+    return paths
+
+
+def bench_categorize(size: int, files: int, workdir: Path) -> dict:
+    fc = load_script(SCRIPTS_DIR / 'gsheets' / 'fix-categories.py')
+    names = [p.get('name', '') for p in synthetic_products(size)]
+    timer = PhaseTimer()
+
+    fc.CACHE = fc.CategoryCache(fc.RULES.version)
+    with timer.phase('categorize_product'):
+        for name in names:
+            fc.categorize_product(name)
+
+    fc.CACHE = fc.CategoryCache(fc.RULES.version)
+    with timer.phase('categorize_many'):
+        fc.categorize_many(names)
+
+    with timer.phase('categorize_many_cached'):
+        fc.categorize_many(names)
+
+    seconds = timer.phases['categorize_product']
+    return {
+        'items': size, 'unit': 'names', 'seconds': round(seconds, 4),
+        'rate': round(size / seconds, 1), 'phases': timer.rounded(),
+        'rates': {phase: round(size / t, 1) for phase, t in timer.phases.items() if t},
+    }
+
+
+def bench_analyze(size: int, files: int, workdir: Path) -> dict:
+    fc = load_script(SCRIPTS_DIR / 'gsheets' / 'fix-categories.py')
+    paths = build_catalog(size, files, workdir)
+    timer = PhaseTimer()
+
+    # The stages analyze --apply goes through, timed separately
+    fc.CACHE = fc.CategoryCache(fc.RULES.version)
+    for path in paths:
+        with timer.phase('parse'):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        with timer.phase('categorize'):
+            fc.categorize_many(p.get('name', '') for p in data.get('products', []))
+        with timer.phase('serialize'):
+            text = json.dumps(data, ensure_ascii=False, indent=2)
+        with timer.phase('write'):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+
+    fc.CACHE = fc.CategoryCache(fc.RULES.version)
+    with timer.phase('analyze_file'):
+        for path in paths:
+            fc.analyze_file(path)
+
+    seconds = timer.phases['analyze_file']
+    return {
+        'items': size, 'files': len(paths), 'unit': 'products', 'seconds': round(seconds, 4),
+        'rate': round(size / seconds, 1), 'files_per_sec': round(len(paths) / seconds, 2),
+        'phases': timer.rounded(),
+    }
+
+
+def bench_sql(size: int, files: int, workdir: Path) -> dict:
+    fpi = load_script(SCRIPTS_DIR / 'fix-product-images.py')
+    sql_file = workdir / 'generated-seed.sql'
+    timer = PhaseTimer()
+
+    def build():
+        with timer.phase('build'):
+            with open(sql_file, 'w', encoding='utf-8') as f:
+                for i in range(size):
+                    host = SQL_HOSTS[i % len(SQL_HOSTS)]
+                    f.write("INSERT INTO store_products (sku, name, image_url) VALUES "
+                            f"('SKU-{i}', 'Producto {i}', 'https://{host}/images/{i}.jpg');\n")
+
+    build()
+    megabytes = sql_file.stat().st_size / (1024 * 1024)
+    with timer.phase('update_sql_seed'):
+        with contextlib.redirect_stdout(io.StringIO()):
+            fpi.update_sql_seed(sql_file)
+
+    build()
+    with timer.phase('update_sql_seed_mmap'):
+        with contextlib.redirect_stdout(io.StringIO()):
+            fpi.update_sql_seed(sql_file, use_mmap=True)
+
+    seconds = timer.phases['update_sql_seed']
+    return {
+        'items': size, 'unit': 'rows', 'seconds': round(seconds, 4),
+        'rate': round(size / seconds, 1), 'mb_per_sec': round(megabytes / seconds, 2),
+        'phases': timer.rounded(),
+    }
+
+
+class StubImageHandler(BaseHTTPRequestHandler):
+    """Local stand-in for image CDNs: /ok/, /missing/, /nohead/ (405 on HEAD), /redirect/"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def _reply(self, status: int, body: bytes = b'', location: str = None):
+        self.send_response(status)
+        if location:
+            self.send_header('Location', location)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command == 'GET':
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        kind, _, rest = self.path.lstrip('/').partition('/')
+        if kind == 'ok':
+            self._reply(200)
+        elif kind == 'nohead':
+            self._reply(405)
+        elif kind == 'redirect':
+            self._reply(301, location=f"/ok/{rest}")
+        else:
+            self._reply(404)
+
+    def do_GET(self):
+        kind, _, rest = self.path.lstrip('/').partition('/')
+        if kind in ('ok', 'nohead'):
+            self._reply(206, b'x')
+        elif kind == 'redirect':
+            self._reply(301, location=f"/ok/{rest}")
+        else:
+            self._reply(404, b'not found')
+
+    def log_message(self, format, *args):
+        pass
+
+
+def bench_urlcheck(size: int, files: int, workdir: Path) -> dict:
+    fpi = load_script(SCRIPTS_DIR / 'fix-product-images.py')
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubImageHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    kinds = ['ok', 'missing', 'nohead', 'redirect']
+    urls = [f"http://127.0.0.1:{server.server_port}/{kinds[i % 4]}/{i}.jpg" for i in range(size)]
+    timer = PhaseTimer()
+
+    try:
+        checker = fpi.URLChecker(host_rate=None, cache=fpi.UrlCache(workdir / 'url-health.json'))
+        with timer.phase('check_all'):
+            results = checker.check_all(urls)
+        checker.cache.save()
+
+        checker = fpi.URLChecker(host_rate=None, cache=fpi.UrlCache(workdir / 'url-health.json'))
+        with timer.phase('check_all_cached'):
+            checker.check_all(urls)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    wrong = sum(1 for url in urls if results[url] is not ('/missing/' not in url))
+    if wrong:
+        raise RuntimeError(f"{wrong} URLs misjudged by the checker")
+    seconds = timer.phases['check_all']
+    return {
+        'items': size, 'unit': 'urls', 'seconds': round(seconds, 4),
+        'rate': round(size / seconds, 1), 'phases': timer.rounded(),
+    }
+
+
+def bench_generate(size: int, files: int, workdir: Path) -> dict:
+    gp = load_script(SCRIPTS_DIR / 'generate_products.py')
+    output = workdir / 'products.jsonl'
+    timer = PhaseTimer()
+
+    with timer.phase('generate_products'):
+        with contextlib.redirect_stdout(io.StringIO()):
+            gp.generate_products(size, seed=size, fmt='jsonl', output=str(output))
+    if gp.np is not None:
+        with timer.phase('generate_numpy'):
+            with contextlib.redirect_stdout(io.StringIO()):
+                gp.generate_products(size, seed=size, fmt='jsonl', output=str(workdir / 'numpy.jsonl'),
+                                     backend='numpy')
+    shards = multiprocessing.cpu_count()
+    with timer.phase(f'generate_sharded_x{shards}'):
+        with contextlib.redirect_stdout(io.StringIO()):
+            gp.generate_sharded(size, seed=size, fmt='jsonl', output=str(workdir / 'sharded.jsonl'),
+                                shards=shards)
+
+    seconds = timer.phases['generate_products']
+    return {
+        'items': size, 'unit': 'products', 'seconds': round(seconds, 4),
+        'rate': round(size / seconds, 1), 'phases': timer.rounded(),
+    }
+
+
+BENCHMARKS = {
+    'categorize': bench_categorize,
+    'analyze': bench_analyze,
+    'sql': bench_sql,
+    'urlcheck': bench_urlcheck,
+    'generate': bench_generate,
+}
+
+
+def run_benchmark(name: str, size: int, files: int) -> dict:
+    """Run one benchmark; called in a fresh process so peak RSS is its own"""
+    with tempfile.TemporaryDirectory(prefix='bench-seed-') as tmp:
+        result = BENCHMARKS[name](size, files, Path(tmp))
+    result.update({'bench': name, 'size': size, 'peak_rss_mb': peak_rss_mb()})
+    return result
+
+
+def compare(results: list, baseline_file: Path):
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = {(r['bench'], r['size']): r for r in json.load(f)['results']}
+    print(f"\nCompared with {baseline_file}:")
+    for r in results:
+        old = baseline.get((r['bench'], r['size']))
+        if old and old.get('rate'):
+            change = 100 * (r['rate'] / old['rate'] - 1)
+            flag = '  <-- regression' if change < -10 else ''
+            print(f"  {r['bench']:<12}{r['size']:>10}  {old['rate']:>12,.0f} -> {r['rate']:>12,.0f} "
+                  f"{r['unit']}/s ({change:+.1f}%){flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Python seed-data tools")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000],
+                        help="catalog sizes to test (products / names / SQL rows)")
+    parser.add_argument('--files', type=int, default=10, help="files the analyze catalog is split into")
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--output', type=Path, help="results JSON (default: .cache/bench/<timestamp>.json)")
+    parser.add_argument('--baseline', type=Path, help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    created = datetime.now(timezone.utc)
+    output = args.output or RESULTS_DIR / f"bench-{created:%Y%m%dT%H%M%SZ}.json"
+
+    print("=" * 80)
+    print("SEED TOOLS BENCHMARK")
+    print("=" * 80)
+    print(f"{'bench':<12}{'size':>10}{'seconds':>10}{'rate/s':>14}{'peak MB':>10}  phases")
+
+    results = []
+    ctx = multiprocessing.get_context('spawn')
+    for name in args.only:
+        for size in args.sizes:
+            # Executor workers are not daemonic, so benchmarks may start their own pools
+            with ProcessPoolExecutor(1, mp_context=ctx) as pool:
+                r = pool.submit(run_benchmark, name, size, args.files).result()
+            results.append(r)
+            phases = ', '.join(f"{k}={v:.3f}s" for k, v in r['phases'].items())
+            print(f"{name:<12}{size:>10}{r['seconds']:>10.3f}{r['rate']:>14,.0f}"
+                  f"{r['peak_rss_mb'] if r['peak_rss_mb'] is not None else '-':>10}  {phases}")
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'created': created.isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }, f, indent=2)
+    print(f"\nSaved results to {output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == '__main__':
+    main()
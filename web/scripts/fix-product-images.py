@@ -1,152 +1,422 @@
 #!/usr/bin/env python3
 """
-Update all product image URLs to use the placeholder image.
-This fixes broken external image references.
+Rewrite seed image URLs by the rules in image-url-rules.json.
+
+Each rule matches a host (and optionally a path prefix) and keeps the URL,
+maps it to a local path, or replaces it with the placeholder image; image
+hosts known to break hot-linking are listed there with the placeholder.
+URLs on hosts no rule matches are kept, as are the curated URLs of
+image-urls.json. The same rules apply to the JSON seed files and to
+generated-seed.sql. With --check-urls a URL bound for the placeholder is
+only replaced when a live check finds it broken.
+
+Usage:
+  python fix-product-images.py --dry-run
+  python fix-product-images.py --check-urls --concurrency 64
+
+Seed JSON files are handled in one walk over db/seeds/data: every file is
+matched against the TRANSFORMERS registry, parsed once, run through all of
+its field transformers and written at most once.
 """
 
+import argparse
+import contextlib
 import json
+import os
 import re
+import sys
+import time
+from collections import defaultdict
+from fnmatch import fnmatch
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from seedlib import jsonstream, sqlstream  # noqa: E402
+from seedlib.categories import CategoryIndex  # noqa: E402
+from seedlib.manifest import Manifest  # noqa: E402
+from seedlib.urlcheck import URLChecker, UrlCache  # noqa: E402
+from seedlib.urlindex import UrlIndex  # noqa: E402
 
-def update_product_images(products_dir: Path, placeholder_url: str = "/placeholder-product.svg"):
-    """Update all product image URLs in seed data files."""
+DATA_DIR = Path(__file__).parent.parent / 'db' / 'seeds' / 'data'
+SEEDS_DIR = Path(__file__).parent.parent / 'db' / 'seeds'
+MANIFEST_FILE = Path(__file__).parent / '.cache' / 'fix-product-images.manifest.json'
+URL_CACHE_FILE = Path(__file__).parent / '.cache' / 'url-health.json'
+URL_RULES_FILE = Path(__file__).parent / 'image-url-rules.json'
+CURATED_URLS_FILE = Path(__file__).parent / 'image-urls.json'
+PLACEHOLDER_URL = "/placeholder-product.svg"
 
-    updated_files = []
+# Every quoted http(s) literal in the SQL seed; the URL index decides its fate
+SQL_URL = re.compile(r"'(https?://[^']*)'")
 
-    for json_file in products_dir.glob("products-*.json"):
-        print(f"Processing: {json_file.name}")
 
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+def load_url_index(placeholder_url: str = PLACEHOLDER_URL) -> UrlIndex:
+    """Rewrite rules from image-url-rules.json plus the curated URLs of image-urls.json"""
+    index = UrlIndex(placeholder_url).load(URL_RULES_FILE)
+    if CURATED_URLS_FILE.exists():
+        index.load(CURATED_URLS_FILE)
+    return index
 
-        modified = False
-        products = data.get('products', [])
 
-        for product in products:
-            if 'image_url' in product and product['image_url'] != placeholder_url:
-                product['image_url'] = placeholder_url
-                modified = True
+URL_INDEX = load_url_index()
 
-        if modified:
-            with open(json_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                f.write('\n')
-            updated_files.append(json_file.name)
-            print(f"  Updated {len(products)} products")
-        else:
-            print(f"  No changes needed")
-
-    return updated_files
-
-
-def update_category_images(categories_file: Path, placeholder_url: str = "/placeholder-product.svg"):
-    """Update category image URLs recursively."""
-
-    with open(categories_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
 
-    def update_category(cat):
-        if 'image_url' in cat:
-            cat['image_url'] = placeholder_url
-        for subcat in cat.get('subcategories', []):
-            update_category(subcat)
+def url_rewriter(index: UrlIndex, healthy=None):
+    """url -> rewritten url; with healthy, only URLs it reports as failing become the placeholder
 
-    for category in data.get('categories', []):
-        update_category(category)
+    healthy(url) answers like URLChecker.check_all: True, False, or None when
+    the URL could not be reached. Only False counts as broken, so a flaky
+    network never replaces an image. The JSON transformers and
+    update_sql_seed share it, so a URL is rewritten the same way wherever it
+    appears.
+    """
 
-    with open(categories_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-        f.write('\n')
+    def rewrite(url):
+        new = index.rewrite(url)
+        if healthy and new == index.placeholder and new != url and healthy(url) is not False:
+            return url
+        return new
 
-    print(f"Updated: {categories_file.name}")
+    return rewrite
 
 
-def update_pet_photos(pets_file: Path, placeholder_url: str = "/placeholder-product.svg"):
-    """Update pet photo URLs."""
-
-    with open(pets_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    pets = data.get('pets', [])
-    for pet in pets:
-        if 'photo_url' in pet:
-            pet['photo_url'] = placeholder_url
+def _rewrite_field(item: dict, field: str, rewrite) -> int:
+    url = item.get(field)
+    if not isinstance(url, str):
+        return 0
+    new = rewrite(url)
+    if new == url:
+        return 0
+    item[field] = new
+    return 1
 
-    with open(pets_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-        f.write('\n')
 
-    print(f"Updated {len(pets)} pets in: {pets_file.name}")
+def replace_product_images(products: list, rewrite) -> int:
+    """Rewrite image_url through the URL index, returning how many products changed."""
 
+    return sum(_rewrite_field(product, 'image_url', rewrite) for product in products)
 
-def update_sql_seed(sql_file: Path, placeholder_url: str = "/placeholder-product.svg"):
-    """Update image_url values in SQL seed file."""
 
-    with open(sql_file, 'r', encoding='utf-8') as f:
-        content = f.read()
+def replace_category_images(categories: list, rewrite) -> int:
+    """Update category image URLs at every level, through the flattened category tree."""
 
-    # Pattern to match image_url with external URLs in INSERT statements
-    # Matches: image_url, 'https://...' or image_url = 'https://...'
-    patterns = [
-        # For VALUES: ... image_url, target_species ... VALUES (... 'https://...', ARRAY...
-        (r"'https?://[^']+(?:\.png|\.jpg|\.jpeg|\.svg|\.gif|fit=crop[^']*)'", f"'{placeholder_url}'"),
-        # More general URL pattern for image fields
-        (r"(image_url,\s*[^)]+\([\s\S]*?)'https?://[^']*'", rf"\1'{placeholder_url}'"),
-    ]
+    return sum(_rewrite_field(node.item, 'image_url', rewrite) for node in CategoryIndex(categories))
 
-    # Count replacements
-    original_len = len(content)
 
-    # Replace external image URLs with placeholder
-    # Match pattern: 'https://...' where it looks like an image URL
-    url_pattern = r"'(https?://(?:images\.unsplash\.com|assets\.ruralmakro\.org|assets\.petco\.com|www\.[a-z]+\.com|[a-z]+\.cloudinary\.com|m\.media-amazon\.com|cdn\.shopify\.com|http2\.mlstatic\.com|placehold\.co|d36tnp772eyphs\.cloudfront\.net)[^']*)'"
-
-    count = len(re.findall(url_pattern, content))
-    content = re.sub(url_pattern, f"'{placeholder_url}'", content)
+def replace_pet_photos(pets: list, rewrite) -> int:
+    """Update pet photo URLs."""
 
-    with open(sql_file, 'w', encoding='utf-8') as f:
-        f.write(content)
+    return sum(_rewrite_field(pet, 'photo_url', rewrite) for pet in pets)
+
+
+# Field transformers: (file glob relative to db/seeds/data, array member, stage, function).
+# The function gets the member's items and a rewrite(url) -> url function, and
+# returns how many values it changed.
+TRANSFORMERS = [
+    ('03-store/products/products-*.json', 'products', 'product images', replace_product_images),
+    ('03-store/categories.json', 'categories', 'category images', replace_category_images),
+    ('*/pets.json', 'pets', 'pet photos', replace_pet_photos),
+]
+
+
+class SeedPipeline:
+    """Single walk over the seed data applying every matching transformer per file"""
+
+    def __init__(self, data_dir: Path, transformers: list = TRANSFORMERS,
+                 index: UrlIndex = None, stream: bool = False,
+                 manifest: Manifest = None, force: bool = False, dry_run: bool = False):
+        self.data_dir = Path(data_dir)
+        self.transformers = transformers
+        self.index = index or URL_INDEX
+        self.rewrite = url_rewriter(self.index)
+        self.stream = stream
+        self.manifest = manifest
+        self.force = force
+        self.dry_run = dry_run
+        self.checker = None
+        self.healthy = {}
+        self.timings = defaultdict(float)
+        self.changes = defaultdict(int)
+        self.updated = []
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] += time.perf_counter() - start
+
+    def plan(self) -> list:
+        """(path, transformers) for every seed file at least one transformer applies to"""
+        plan = []
+        for root, dirs, files in os.walk(self.data_dir):
+            dirs.sort()
+            for name in sorted(files):
+                if not name.endswith('.json'):
+                    continue
+                path = Path(root) / name
+                rel = path.relative_to(self.data_dir).as_posix()
+                matched = [t for t in self.transformers if fnmatch(rel, t[0])]
+                if matched:
+                    plan.append((path, matched))
+        return plan
+
+    def _streams(self, matched: list) -> bool:
+        return self.stream and len({key for _, key, _, _ in matched}) == 1
+
+    def _collect_urls(self, matched: list, items_for, urls: set):
+        """Add every URL the transformers would replace with the placeholder to urls"""
+
+        def collect(url):
+            if self.index.rewrite(url) == self.index.placeholder != url:
+                urls.add(url)
+            return url
+
+        with self.stage('collect urls'):
+            for _, key, _, func in matched:
+                func(items_for(key), collect)
+
+    def _check_batch(self, matched: list, batch: list):
+        """Check the URLs of one streamed batch that no earlier check has seen"""
+        urls = set()
+        self._collect_urls(matched, lambda _: batch, urls)
+        with self.stage('check urls'):
+            self.healthy.update(self.checker.check_all(urls - self.healthy.keys()))
+
+    def run(self, checker: URLChecker = None) -> list:
+        """Process every planned file; with a checker only URLs failing the check are replaced
+
+        Each file is parsed once. With a checker, whole-file documents are
+        parsed up front and kept so all their URLs are checked concurrently;
+        streamed files check each batch's URLs before rewriting it.
+        """
+        with self.stage('walk'):
+            plan = self.plan()
+        if self.manifest and not self.force:
+            current = {path for path, _ in plan if self.manifest.is_current(path)}
+            self.manifest.skipped += len(current)
+            plan = [(path, matched) for path, matched in plan if path not in current]
+        documents = {}
+        if checker:
+            self.checker = checker
+            urls = set()
+            for path, matched in plan:
+                if not self._streams(matched):
+                    documents[path] = data = self._load(path)
+                    self._collect_urls(matched, lambda key: data.get(key, []), urls)
+            with self.stage('check urls'):
+                self.healthy = checker.check_all(urls)
+            # Bound to the dict, so URLs checked later by streamed batches count too
+            self.rewrite = url_rewriter(self.index, self.healthy.get)
+        for path, matched in plan:
+            self.process(path, matched, documents.pop(path, None))
+            if self.manifest and not self.dry_run:
+                self.manifest.record(path)
+        return self.updated
+
+    def _load(self, path: Path):
+        with self.stage('parse'):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+    def _apply(self, matched: list, items_for, counts: dict) -> int:
+        changed = 0
+        for _, key, stage, func in matched:
+            with self.stage(stage):
+                n = func(items_for(key), self.rewrite)
+            counts[stage] += n
+            changed += n
+        return changed
+
+    def process(self, path: Path, matched: list, data=None):
+        """Transform one planned file; data is its already parsed document, if any"""
+        print(f"Processing: {path.relative_to(self.data_dir).as_posix()}")
+        counts = defaultdict(int)
+
+        if self._streams(matched):
+            # Item by item; transformer and check time is booked to its own stage
+            key = matched[0][1]
+            stages = [stage for _, _, stage, _ in matched] + ['collect urls', 'check urls']
+            before = sum(self.timings[stage] for stage in stages)
+            start = time.perf_counter()
+
+            def transform(batch):
+                if self.checker:
+                    self._check_batch(matched, batch)
+                return self._apply(matched, lambda _: batch, counts)
+
+            if self.dry_run:
+                changed = sum(transform(batch) for batch in jsonstream.iter_batches(path, 1000, array_key=key))
+            else:
+                # Through a temp file, renamed over the original only on change
+                changed = jsonstream.rewrite_array(path, transform, array_key=key, trailing_newline=True)
+            spent = sum(self.timings[stage] for stage in stages) - before
+            self.timings['parse' if self.dry_run else 'parse+write'] += time.perf_counter() - start - spent
+        else:
+            if data is None:
+                data = self._load(path)
+            changed = self._apply(matched, lambda key: data.get(key, []), counts)
+            # A dry run transforms the parsed copy only: counts, no write I/O
+            if changed and not self.dry_run:
+                with self.stage('write'):
+                    jsonstream.dump_atomic(path, data, trailing_newline=True)
+
+        if changed:
+            self.updated.append(path.name)
+            for stage, n in counts.items():
+                self.changes[stage] += n
+                if n:
+                    print(f"  {stage}: {n} {self.verb}")
+        else:
+            print("  No changes needed")
+
+    @property
+    def verb(self) -> str:
+        return 'would be updated' if self.dry_run else 'updated'
+
+    def report(self):
+        print("Changes:")
+        for stage, n in self.changes.items():
+            print(f"  {stage}: {n} {self.verb}")
+        print("\nTimings:")
+        for stage, seconds in self.timings.items():
+            print(f"  {stage:<20}{seconds:8.3f}s")
+
+
+def update_sql_seed(sql_file: Path, index: UrlIndex = None,
+                    chunk_size: int = sqlstream.CHUNK_SIZE, use_mmap: bool = False,
+                    dry_run: bool = False, healthy=None):
+    """Update image_url values in SQL seed file.
+
+    Every quoted http(s) URL goes through the same URL index and rewrite
+    function as the JSON transformers, index default included. In SQL a URL
+    is only known to be an image by its host, so the shipped rules keep
+    unmatched URLs and list image hosts explicitly. The index is compiled
+    into two patterns: literals on hosts that always become the placeholder
+    are replaced by the regex engine alone, and only the remaining
+    candidates are looked up one by one. The file is streamed in chunks, so memory
+    stays flat however large the generated seed gets. With use_mmap the
+    patterns run over the memory-mapped bytes instead and the output is
+    spliced from the mapping, skipping text decoding entirely. dry_run only
+    counts the URLs that would be replaced. With healthy, only URLs it
+    reports as failing become the placeholder (see url_rewriter).
+    """
+
+    index = index or URL_INDEX
+    rewrite = url_rewriter(index, healthy)
+    # A health check has to see every candidate, so nothing takes the fast path
+    fast, slow = index.quoted_patterns("'", split=healthy is None)
+    placeholder = f"'{index.placeholder}'"
+
+    def unchanged(match):
+        url = match.group(1)
+        if isinstance(url, bytes):
+            url = url.decode('utf-8')
+        return rewrite(url) == url
+
+    def replace(match):
+        url = match.group(1)
+        new = rewrite(url)
+        return None if new == url else f"'{new}'"
+
+    if dry_run:
+        count = sum(sqlstream.count(sql_file, pattern, chunk_size, exclude)
+                    for pattern, exclude in ((fast, None), (slow, unchanged)) if pattern)
+        print(f"Would update {count} image URLs in: {sql_file.name}")
+        return count
+    if use_mmap:
+        spans = []
+        if fast:
+            fixed = placeholder.encode('utf-8')
+            spans += [span + (fixed,) for span in
+                      sqlstream.scan_spans(sql_file, re.compile(fast.pattern.encode('utf-8')))]
+        if slow:
+            spans += sqlstream.scan_spans(sql_file, re.compile(slow.pattern.encode('utf-8')), unchanged)
+        spans.sort()
+        count = sqlstream.splice(sql_file, spans,
+                                 lambda raw: f"'{rewrite(raw[1:-1].decode('utf-8'))}'".encode('utf-8'))
+    else:
+        steps = []
+        if fast:
+            steps.append((fast, placeholder.replace('\\', '\\\\'), None))
+        if slow:
+            steps.append((slow, replace, None))
+        count = sqlstream.rewrite_many(sql_file, steps, chunk_size) if steps else 0
 
     print(f"Updated {count} image URLs in: {sql_file.name}")
+    return count
 
 
 if __name__ == '__main__':
-    base_dir = Path(__file__).parent.parent / 'db' / 'seeds' / 'data'
-    seeds_dir = Path(__file__).parent.parent / 'db' / 'seeds'
-
-    print("=" * 50)
-    print("Updating Product Images")
-    print("=" * 50)
+    parser = argparse.ArgumentParser(
+        description="Rewrite seed image URLs by the rules in image-url-rules.json",
+        epilog="URLs on hosts no rule matches are kept unless the rule file's 'default' says otherwise.")
+    parser.add_argument('--stream', action='store_true',
+                        help="rewrite seed files item by item to keep memory flat")
+    parser.add_argument('--force', action='store_true',
+                        help="reprocess every file, ignoring the manifest of unchanged files")
+    parser.add_argument('--mmap', action='store_true',
+                        help="scan the SQL seed through a memory map instead of decoding it")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="report what would change without writing any file")
+    parser.add_argument('--check-urls', action='store_true',
+                        help="only replace URLs that fail a live health check")
+    parser.add_argument('--concurrency', type=int, default=32,
+                        help="--check-urls: requests in flight at once")
+    args = parser.parse_args()
+
+    # Files already rewritten for this placeholder and untouched since are skipped.
+    # A health check can fail later, so --check-urls always processes every file.
+    manifest = Manifest(MANIFEST_FILE, URL_INDEX.version)
+    use_manifest = not args.check_urls
+    pipeline = SeedPipeline(DATA_DIR, stream=args.stream, manifest=manifest if use_manifest else None,
+                            force=args.force, dry_run=args.dry_run)
+
+    checker = None
+    if args.check_urls:
+        url_cache = UrlCache(URL_CACHE_FILE)
+        checker = URLChecker(concurrency=args.concurrency, cache=url_cache)
 
-    products_dir = base_dir / '03-store' / 'products'
-    updated = update_product_images(products_dir)
-    print(f"\nUpdated {len(updated)} product files")
-
-    print("\n" + "=" * 50)
-    print("Updating Category Images")
     print("=" * 50)
-
-    categories_file = base_dir / '03-store' / 'categories.json'
-    if categories_file.exists():
-        update_category_images(categories_file)
-
-    print("\n" + "=" * 50)
-    print("Updating Pet Photos")
+    print("Updating Seed Images")
     print("=" * 50)
 
-    pets_file = base_dir / '02-global' / 'pets.json'
-    if pets_file.exists():
-        update_pet_photos(pets_file)
+    updated = pipeline.run(checker)
+    print(f"\n{'Would update' if args.dry_run else 'Updated'} {len(updated)} seed files")
 
     print("\n" + "=" * 50)
     print("Updating Generated SQL Seed")
     print("=" * 50)
 
-    sql_seed = seeds_dir / 'generated-seed.sql'
-    if sql_seed.exists():
-        update_sql_seed(sql_seed)
+    sql_seed = SEEDS_DIR / 'generated-seed.sql'
+    if not sql_seed.exists():
+        print(f"Not found: {sql_seed.name}")
+    elif use_manifest and not args.force and manifest.is_current(sql_seed):
+        manifest.skipped += 1
+        print(f"Unchanged since last run: {sql_seed.name}")
+    else:
+        healthy = None
+        if checker:
+            with pipeline.stage('check urls'):
+                urls = {m.group(1) for m in sqlstream.iter_matches(sql_seed, SQL_URL)
+                        if URL_INDEX.rewrite(m.group(1)) == PLACEHOLDER_URL}
+                healthy = checker.check_all(urls).get
+        with pipeline.stage('sql seed'):
+            update_sql_seed(sql_seed, use_mmap=args.mmap, dry_run=args.dry_run, healthy=healthy)
+        if use_manifest and not args.dry_run:
+            manifest.record(sql_seed)
+
+    if checker:
+        if not args.dry_run:
+            url_cache.save()
+        failed = sum(1 for status in checker.statuses.values() if status and not 200 <= status < 300)
+        unreachable = sum(1 for status in checker.statuses.values() if not status)
+        print(f"\nURL check: {len(checker.statuses)} URLs, {checker.probed} probed, "
+              f"{checker.cached} from cache, {failed} failing, {unreachable} unreachable (kept)")
+    if use_manifest and not args.dry_run:
+        manifest.save()
 
     print("\n" + "=" * 50)
-    print("Done!")
+    print(f"Done! ({manifest.skipped} unchanged files skipped, --force to reprocess)")
     print("=" * 50)
+    pipeline.report()
@@ -1,6 +1,40 @@
+"""
+Synthetic product catalog generator.
+
+Builds a catalog from the CATEGORIES taxonomy for storefront load tests.
+Products are generated lazily and streamed to disk, so memory stays
+constant from a few hundred items to millions. With --seed the output is
+reproducible byte for byte. With --shards the catalog is split into
+disjoint id ranges generated by parallel worker processes, one file per
+shard plus a manifest; shard contents depend only on the seed and the
+shard index, so they are identical whatever --jobs is.
+
+--backend numpy draws the attributes of a whole batch column by column
+with NumPy and only formats strings at the end, which is much faster for
+large fixtures. It samples from the same lists with the same
+distributions, but from a different random stream than the default python
+backend, so the two give different catalogs for the same seed.
+
+Usage:
+  python generate_products.py                                    # 450 products, pretty JSON
+  python generate_products.py --count 1000000 --seed 42 --format jsonl -o products.jsonl
+  python generate_products.py --count 100000 --weights Alimentos=3 Farmacia=1 --format compact
+  python generate_products.py --count 5000000 --seed 42 --format jsonl --shards 32 -o out/products.jsonl
+  python generate_products.py --count 5000000 --seed 42 --format jsonl --backend numpy -o products.jsonl
+"""
+
+import argparse
+import bisect
+import hashlib
 import json
-import random
 import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # only the python backend is available
+    np = None
 
 # Configuration
 OUTPUT_FILE = os.path.join(
@@ -10,6 +44,25 @@ OUTPUT_FILE = os.path.join(
     "products.json",
 )
 TARGET_COUNT = 450
+FORMATS = ("json", "compact", "jsonl")
+BACKENDS = ("python", "numpy")
+BATCH_SIZE = 1 << 14  # products per batch in the numpy backend
+PRODUCT_FIELDS = ("id", "name", "category", "price", "image", "description")
+
+# Relative share of the catalog per category; 450 products split 120/100/80/60/90
+DEFAULT_WEIGHTS = {
+    "Alimentos": 120,
+    "Farmacia": 100,
+    "Accesorios": 80,
+    "Higiene": 60,
+    "Juguetes": 90,
+}
+
+# Per-category attribute options
+FOOD_WEIGHTS_KG = [1, 3, 7.5, 15, 20]
+PACK_SIZES = [1, 3, 6]
+COLORS = ["Rojo", "Azul", "Negro", "Rosa", "Verde", "Camuflado"]
+SIZES = ["S", "M", "L", "XL"]
 
 # Taxonomy Data
 CATEGORIES = {
@@ -105,82 +158,513 @@ CATEGORIES = {
 }
 
 
-def generate_products():
-    products = []
+def allocate(count, weights):
+    """Split count over the categories in proportion to weights (largest remainder)."""
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("Category weights must add up to more than zero")
+    shares = {category: count * weight / total for category, weight in weights.items()}
+    counts = {category: int(share) for category, share in shares.items()}
+    by_remainder = sorted(weights, key=lambda c: counts[c] - shares[c])
+    for category in by_remainder[: count - sum(counts.values())]:
+        counts[category] += 1
+    return counts
+
+
+class IdPermutation:
+    """Seeded bijection on range(count), computed per index in constant memory.
+
+    A small Feistel network permutes the enclosing power-of-two range and
+    values outside range(count) are walked forward until they land inside
+    (cycle walking), so no list of ids is ever built.
+    """
+
+    ROUNDS = 4
+
+    def __init__(self, count, seed=None):
+        self.count = count
+        bits = max(2, (count - 1).bit_length())
+        self.half = (bits + 1) // 2
+        self.mask = (1 << self.half) - 1
+        keys = random.Random(seed)
+        self.keys = [keys.getrandbits(32) for _ in range(self.ROUNDS)]
+
+    def _round(self, value, key):
+        value = ((value ^ key) * 0x45D9F3B) & 0xFFFFFFFF
+        value ^= value >> 16
+        return value & self.mask
+
+    def _encrypt(self, value):
+        left, right = value >> self.half, value & self.mask
+        for key in self.keys:
+            left, right = right, left ^ self._round(right, key)
+        return (left << self.half) | right
+
+    def __call__(self, index):
+        value = self._encrypt(index)
+        while value >= self.count:
+            value = self._encrypt(value)
+        return value
+
+    def _encrypt_many(self, values):
+        half, mask = np.uint64(self.half), np.uint64(self.mask)
+        left, right = values >> half, values & mask
+        for key in self.keys:
+            mixed = ((right ^ np.uint64(key)) * np.uint64(0x45D9F3B)) & np.uint64(0xFFFFFFFF)
+            mixed ^= mixed >> np.uint64(16)
+            left, right = right, left ^ (mixed & mask)
+        return (left << half) | right
+
+    def many(self, indexes):
+        """Permutation of every index in a uint64 array; same values as __call__"""
+        values = self._encrypt_many(indexes)
+        outside = values >= self.count
+        while outside.any():
+            values[outside] = self._encrypt_many(values[outside])
+            outside = values >= self.count
+        return values
 
-    # Generate balanced distribution
-    distribution = {
-        "Alimentos": 120,
-        "Farmacia": 100,
-        "Accesorios": 80,
-        "Higiene": 60,
-        "Juguetes": 90,
+
+def id_width(count):
+    """Digits in product ids: 4 as before, more once the catalog outgrows prod_9999"""
+    return max(4, len(str(count)))
+
+
+def shard_seed(seed, shard):
+    """Independent, deterministic RNG seed for one shard of a master seed"""
+    digest = hashlib.sha256(f"{seed}:{shard}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def make_product(rng, number, category, width=4):
+    data = CATEGORIES[category]
+    brand = rng.choice(data.get("brands", ["Genérico"]))
+    subtype = rng.choice(data["subtypes"])
+
+    # Name construction
+    name = f"{subtype} {brand}"
+
+    description_parts = [f"{subtype} de la marca {brand}."]
+
+    if category == "Alimentos":
+        animal = rng.choice(data["animals"])
+        age = rng.choice(data["ages"])
+        weight = rng.choice(FOOD_WEIGHTS_KG)
+        name += f" {animal} {age} {weight}kg"
+        description_parts.append(
+            f"Alimento balanceado completo para {animal}s en etapa {age}."
+        )
+        price_base = 25000 + (weight * 4000)
+    elif category == "Farmacia":
+        name += f" x{rng.choice(PACK_SIZES)} unid."
+        description_parts.append("Producto farmacéutico veterinario de venta libre.")
+        price_base = 40000
+    elif category == "Accesorios":
+        color = rng.choice(COLORS)
+        name += f" {color} Talle {rng.choice(SIZES)}"
+        description_parts.append(f"Accesorio de alta calidad, color {color}.")
+        price_base = 15000
+    else:
+        price_base = 10000
+
+    # Randomize price slightly
+    price = int(price_base * rng.uniform(0.8, 1.5) / 100) * 100
+
+    return {
+        "id": f"prod_{number:0{width}d}",
+        "name": name,
+        "category": category,
+        "price": price,
+        "image": rng.choice(data["images"]),
+        "description": " ".join(description_parts) + " Excelente calidad garantizada.",
     }
 
-    count = 1
-
-    for category, limit in distribution.items():
-        data = CATEGORIES[category]
-        for _ in range(limit):
-            brand = random.choice(data.get("brands", ["Genérico"]))
-            subtype = random.choice(data["subtypes"])
-
-            # Name construction
-            name = f"{subtype} {brand}"
-
-            description_parts = [f"{subtype} de la marca {brand}."]
-
-            if category == "Alimentos":
-                animal = random.choice(data["animals"])
-                age = random.choice(data["ages"])
-                weight = random.choice([1, 3, 7.5, 15, 20])
-                name += f" {animal} {age} {weight}kg"
-                description_parts.append(
-                    f"Alimento balanceado completo para {animal}s en etapa {age}."
-                )
-                price_base = 25000 + (weight * 4000)
-            elif category == "Farmacia":
-                name += f" x{random.choice([1, 3, 6])} unid."
-                description_parts.append(
-                    "Producto farmacéutico veterinario de venta libre."
-                )
-                price_base = 40000
-            elif category == "Accesorios":
-                color = random.choice(
-                    ["Rojo", "Azul", "Negro", "Rosa", "Verde", "Camuflado"]
-                )
-                name += f" {color} Talle {random.choice(['S', 'M', 'L', 'XL'])}"
-                description_parts.append(f"Accesorio de alta calidad, color {color}.")
-                price_base = 15000
-            else:
-                price_base = 10000
-
-            # Randomize price slightly
-            price = int(price_base * random.uniform(0.8, 1.5) / 100) * 100
-
-            product = {
-                "id": f"prod_{count:04d}",
-                "name": name,
-                "category": category,
-                "price": price,
-                "image": random.choice(data["images"]),
-                "description": " ".join(description_parts)
-                + " Excelente calidad garantizada.",
-            }
-            products.append(product)
-            count += 1
-
-    # Shuffle to make it look natural in the grid
-    random.shuffle(products)
-
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(products, f, indent=4, ensure_ascii=False)
-
-    print(f"Generated {len(products)} products in {OUTPUT_FILE}")
+
+def _layout(count, weights):
+    """Categories with products and the cumulative id bound of each block"""
+    counts = allocate(count, weights or DEFAULT_WEIGHTS)
+    categories = [category for category, n in counts.items() if n]
+    bounds = []
+    total = 0
+    for category in categories:
+        total += counts[category]
+        bounds.append(total)
+    return categories, bounds
+
+
+def _iter_range(rng, start, stop, categories, bounds, width):
+    permutation = IdPermutation(stop - start, rng.getrandbits(64))
+    for position in range(stop - start):
+        index = start + permutation(position)
+        category = categories[bisect.bisect_right(bounds, index)]
+        yield make_product(rng, index + 1, category, width)
+
+
+def _escape(text):
+    """text as it appears inside a JSON string literal"""
+    return json.dumps(text, ensure_ascii=False)[1:-1]
+
+
+def _escape_all(values):
+    return [_escape(str(value)) for value in values]
+
+
+def _template(fmt, category, width):
+    """%-template that emits a product of category exactly as encode_product() does
+
+    Takes (number, name, price, image, subtype, brand, detail); everything
+    fixed for the category is already filled in.
+    """
+    sample = {field: f"@{field}@" for field in PRODUCT_FIELDS}
+    sample["category"] = category
+    template = encode_product(sample, fmt).replace("%", "%%")
+    template = template.replace('"@price@"', "%d").replace("@id@", f"prod_%0{width}d")
+    template = template.replace("@name@", "%s").replace("@image@", "%s")
+    return template.replace(
+        "@description@", "%s de la marca %s.%s Excelente calidad garantizada."
+    )
+
+
+def _encode_numpy(rng, category, numbers, width, fmt):
+    """Encoded products of one category, drawing each attribute as a column"""
+    data = CATEGORIES[category]
+    n = len(numbers)
+    brands = _escape_all(data.get("brands", ["Genérico"]))
+    subtypes = _escape_all(data["subtypes"])
+    pairs = list(
+        zip(
+            rng.integers(len(subtypes), size=n).tolist(),
+            rng.integers(len(brands), size=n).tolist(),
+        )
+    )
+    heads = [f"{subtypes[s]} {brands[b]}" for s, b in pairs]
+
+    if category == "Alimentos":
+        animals, ages = _escape_all(data["animals"]), _escape_all(data["ages"])
+        kilos = _escape_all(FOOD_WEIGHTS_KG)
+        animal = rng.integers(len(animals), size=n).tolist()
+        age = rng.integers(len(ages), size=n).tolist()
+        weight = rng.integers(len(FOOD_WEIGHTS_KG), size=n)
+        names = [
+            f"{head} {animals[a]} {ages[g]} {kilos[w]}kg"
+            for head, a, g, w in zip(heads, animal, age, weight.tolist())
+        ]
+        details = [
+            f" Alimento balanceado completo para {animals[a]}s en etapa {ages[g]}."
+            for a, g in zip(animal, age)
+        ]
+        price_base = 25000 + np.array(FOOD_WEIGHTS_KG)[weight] * 4000
+    elif category == "Farmacia":
+        packs = rng.integers(len(PACK_SIZES), size=n).tolist()
+        names = [f"{head} x{PACK_SIZES[p]} unid." for head, p in zip(heads, packs)]
+        details = [" Producto farmacéutico veterinario de venta libre."] * n
+        price_base = 40000
+    elif category == "Accesorios":
+        colors, sizes = _escape_all(COLORS), _escape_all(SIZES)
+        color = rng.integers(len(colors), size=n).tolist()
+        size = rng.integers(len(sizes), size=n).tolist()
+        names = [
+            f"{head} {colors[c]} Talle {sizes[z]}" for head, c, z in zip(heads, color, size)
+        ]
+        details = [f" Accesorio de alta calidad, color {colors[c]}." for c in color]
+        price_base = 15000
+    else:
+        names = heads
+        details = [""] * n
+        price_base = 10000
+
+    # Same rounding as int(price_base * uniform / 100) * 100 for positive prices
+    prices = np.floor(price_base * rng.uniform(0.8, 1.5, size=n) / 100).astype(np.int64) * 100
+    images = _escape_all(data["images"])
+    image = rng.integers(len(images), size=n).tolist()
+    template = _template(fmt, category, width)
+    return [
+        template % (number, name, price, images[i], subtypes[s], brands[b], detail)
+        for number, name, price, i, (s, b), detail in zip(
+            numbers, names, prices.tolist(), image, pairs, details
+        )
+    ]
+
+
+def _iter_range_numpy(rng, start, stop, categories, bounds, width, fmt):
+    """Batches of encoded products for ids start+1..stop"""
+    permutation = IdPermutation(stop - start, int(rng.integers(1 << 63)))
+    bounds = np.array(bounds)
+    for first in range(0, stop - start, BATCH_SIZE):
+        positions = np.arange(first, min(first + BATCH_SIZE, stop - start), dtype=np.uint64)
+        indexes = start + permutation.many(positions).astype(np.int64)
+        blocks = np.searchsorted(bounds, indexes, side="right")
+        batch = np.empty(len(indexes), dtype=object)
+        for block in np.unique(blocks).tolist():
+            where = np.flatnonzero(blocks == block)
+            numbers = (indexes[where] + 1).tolist()
+            batch[where] = _encode_numpy(rng, categories[block], numbers, width, fmt)
+        yield batch.tolist()
+
+
+def _products(backend, seed, start, stop, count, weights, fmt):
+    """(items, encoded) for ids start+1..stop of a count-product catalog
+
+    The python backend yields product dicts, the numpy backend batches of
+    text already encoded for fmt.
+    """
+    categories, bounds = _layout(count, weights)
+    width = id_width(count)
+    if backend == "numpy":
+        if np is None:
+            raise ValueError("The numpy backend needs numpy (pip install numpy)")
+        rng = np.random.default_rng(seed)
+        return _iter_range_numpy(rng, start, stop, categories, bounds, width, fmt), True
+    return _iter_range(random.Random(seed), start, stop, categories, bounds, width), False
+
+
+def iter_products(count=TARGET_COUNT, weights=None, seed=None):
+    """Yield count products in a shuffled but seed-determined order.
+
+    Ids are assigned in blocks per category, as before; instead of shuffling
+    a full list, position i of the output gets id permutation(i), so any
+    catalog size streams in constant memory.
+    """
+    categories, bounds = _layout(count, weights)
+    rng = random.Random(seed)
+    yield from _iter_range(rng, 0, count, categories, bounds, id_width(count))
+
+
+def encode_product(product, fmt):
+    """One product as it appears in a file of format fmt"""
+    if fmt == "jsonl":
+        return json.dumps(product, ensure_ascii=False)
+    if fmt == "compact":
+        return json.dumps(product, separators=(",", ":"), ensure_ascii=False)
+    # Items of an indent=4 list are indented one more level
+    return json.dumps(product, indent=4, ensure_ascii=False).replace("\n", "\n    ")
+
+
+def _batched(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_products(products, path, fmt="json", encoded=False):
+    """Stream products to path as indented JSON, compact JSON or JSON Lines.
+
+    With encoded, products come as batches (lists) of encode_product()
+    text. The file is written under a temporary name and renamed into
+    place, so an interrupted run never leaves a truncated catalog. Returns
+    the number of products written.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown output format {fmt!r}")
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    written = 0
+    # Lists come out as the same bytes json.dump(list, ...) would produce
+    if fmt == "jsonl":
+        opening, first, between, last, closing = "", "", "\n", "\n", ""
+    elif fmt == "json":
+        opening, first, between, last, closing = "[", "\n    ", ",\n    ", "\n", "]"
+    else:
+        opening, first, between, last, closing = "[", "", ",", "", "]"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(opening)
+            if not encoded:
+                products = _batched((encode_product(p, fmt) for p in products), 4096)
+            for batch in products:
+                if batch:
+                    f.write((between if written else first) + between.join(batch))
+                    written += len(batch)
+            f.write((last if written else "") + closing)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+    return written
+
+
+def generate_products(
+    count=TARGET_COUNT,
+    weights=None,
+    seed=None,
+    fmt="json",
+    output=OUTPUT_FILE,
+    backend="python",
+):
+    products, encoded = _products(backend, seed, 0, count, count, weights, fmt)
+    written = write_products(products, output, fmt, encoded)
+    print(f"Generated {written} products in {output}")
+    return written
+
+
+def shard_path(output, shard, shards):
+    base, ext = os.path.splitext(output)
+    return f"{base}-{shard:05d}-of-{shards:05d}{ext}"
+
+
+def generate_shard(spec):
+    """Write one shard: products with ids start+1..stop, shuffled within the shard.
+
+    Runs in a worker process, so it takes and returns plain values.
+    """
+    shard, start, stop, count, weights, seed, fmt, path, backend = spec
+    width = id_width(count)
+    products, encoded = _products(
+        backend, shard_seed(seed, shard), start, stop, count, weights, fmt
+    )
+    written = write_products(products, path, fmt, encoded)
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return {
+        "file": os.path.basename(path),
+        "count": written,
+        "first_id": f"prod_{start + 1:0{width}d}" if written else None,
+        "last_id": f"prod_{stop:0{width}d}" if written else None,
+        "sha256": digest.hexdigest(),
+    }
+
+
+def generate_sharded(
+    count,
+    weights=None,
+    seed=None,
+    fmt="jsonl",
+    output=OUTPUT_FILE,
+    shards=1,
+    jobs=None,
+    backend="python",
+):
+    """Generate count products as shards of disjoint id ranges in parallel.
+
+    Writes <output stem>-<shard>-of-<shards><ext> per shard and
+    <output stem>.manifest.json listing them. Without a seed a master seed
+    is drawn and recorded in the manifest, so any run can be reproduced.
+    Returns the manifest.
+    """
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(63)
+    specs = [
+        (
+            shard,
+            count * shard // shards,
+            count * (shard + 1) // shards,
+            count,
+            weights,
+            seed,
+            fmt,
+            shard_path(output, shard, shards),
+            backend,
+        )
+        for shard in range(shards)
+    ]
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        entries = list(pool.map(generate_shard, specs))
+
+    manifest = {
+        "count": count,
+        "seed": seed,
+        "weights": weights or DEFAULT_WEIGHTS,
+        "format": fmt,
+        "backend": backend,
+        "shards": entries,
+    }
+    manifest_file = os.path.splitext(output)[0] + ".manifest.json"
+    tmp = f"{manifest_file}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, manifest_file)
+    print(f"Generated {count} products in {shards} shards, manifest {manifest_file}")
+    return manifest
+
+
+def parse_weights(pairs):
+    weights = {}
+    for pair in pairs:
+        category, sep, weight = pair.partition("=")
+        if not sep or category not in CATEGORIES:
+            raise ValueError(
+                f"Expected <category>=<weight> with one of {', '.join(CATEGORIES)}: {pair!r}"
+            )
+        weights[category] = float(weight)
+        if weights[category] < 0:
+            raise ValueError(f"Weight for {category} must not be negative")
+    return weights
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic product catalog")
+    parser.add_argument(
+        "--count", type=int, default=TARGET_COUNT, help="number of products"
+    )
+    parser.add_argument(
+        "--weights",
+        nargs="+",
+        metavar="CATEGORY=WEIGHT",
+        help="relative share per category; unlisted categories get none "
+        f"(default: {' '.join(f'{c}={w}' for c, w in DEFAULT_WEIGHTS.items())})",
+    )
+    parser.add_argument(
+        "--seed", type=int, help="seed for a reproducible catalog (default: random)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="json",
+        help="json (indented), compact (single-line JSON) or jsonl (one product per line)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="python",
+        help="numpy draws attributes column-wise, much faster for large catalogs",
+    )
+    parser.add_argument("-o", "--output", default=OUTPUT_FILE, help="output file")
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=0,
+        help="split the catalog into this many files of disjoint id ranges, "
+        "generated in parallel, plus a manifest",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=0, help="--shards: worker processes (0 = one per CPU)"
+    )
+    args = parser.parse_args()
+
+    if args.count < 0:
+        parser.error("--count must not be negative")
+    if args.shards < 0:
+        parser.error("--shards must not be negative")
+    if args.backend == "numpy" and np is None:
+        parser.error("--backend numpy needs numpy (pip install numpy)")
+    try:
+        weights = parse_weights(args.weights) if args.weights else None
+        if args.shards:
+            generate_sharded(
+                args.count,
+                weights,
+                args.seed,
+                args.format,
+                args.output,
+                args.shards,
+                args.jobs or None,
+                args.backend,
+            )
+        else:
+            generate_products(
+                args.count, weights, args.seed, args.format, args.output, args.backend
+            )
+    except ValueError as e:
+        parser.error(str(e))
 
 
 if __name__ == "__main__":
-    generate_products()
+    main()
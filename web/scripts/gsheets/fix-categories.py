@@ -4,610 +4,641 @@ Product Categorization Fixer
 Analyzes and fixes product categories in JSON files
 """
 
+import argparse
+import contextlib
+import hashlib
 import json
+import os
+import re
 import sys
-from collections import defaultdict
+import time
+import unicodedata
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    import numpy as np
+except ImportError:  # categorize_many falls back to per-name resolution
+    np = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from seedlib import categories, jsonstream, trigrams  # noqa: E402
+from seedlib.manifest import Manifest  # noqa: E402
+from seedlib.trigrams import TrigramIndex  # noqa: E402
+
 # Fix encoding for Windows
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8', errors='replace')
 
-DATA_DIR = Path(__file__).parent.parent.parent / "db" / "99_seed" / "data"
+DATA_DIR = Path(__file__).parent.parent.parent / "db" / "seeds" / "data" / "03-store"
 PRODUCTS_DIR = DATA_DIR / "products"
+CATEGORIES_FILE = DATA_DIR / "categories.json"
+RULES_FILE = Path(__file__).parent / "category-rules.json"
+CACHE_DIR = Path(__file__).parent.parent / ".cache"
+CACHE_FILE = CACHE_DIR / "category-cache.json"
+FUZZY_FILE = CACHE_DIR / "category-trigrams.idx"
+
+# Bump when matching semantics change in code rather than in category-rules.json
+ENGINE_VERSION = 2
+# Bump when the per-file results kept in manifests change shape
+RESULTS_VERSION = 2
+# Reviewed names where the rule table intentionally differs from legacy_categorize:
+# name -> (legacy slug, rule table slug)
+PARITY_EXCEPTIONS = {
+    # 'LATA ' matched inside 'PLATA AZ'
+    'COMEDERO P/ PERRO INOX DECOR PLATA AZ400ml1.400ml': ('NUT-CAN-HUM', 'ACC-COM-PER'),
+    # 'OMEGA 3' now matches the glued 'OMEGA3'
+    'POTE PETCHEF PESCADO OMEGA3 120GR120GR': ('UNKNOWN', 'FAR-SUP-VIT'),
+}
+# Most recently used names kept by the categorization cache
+CACHE_SIZE = 100_000
+
+# Joins names for bulk scanning; never part of a normalized name
+NAME_SEPARATOR = '\x00'
+# Runs of letters or of digits; quantities glued to words ('CAT85G') become their own tokens
+_TOKEN = re.compile(r'[^\W\d_]+|\d+')
+# Rows per hit matrix in categorize_many, keeps memory bounded on huge catalogs
+BATCH_SIZE = 65536
+# Products held in memory at once by --stream
+STREAM_BATCH_SIZE = 1000
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize_name(name: str) -> str:
+    """Uppercase, fold accents and split into tokens: ' TOKEN TOKEN ' with a space at each end"""
+    if not name.isascii():
+        name = ''.join(ch for ch in unicodedata.normalize('NFKD', name) if not unicodedata.combining(ch))
+    return f" {' '.join(_TOKEN.findall(name.upper()))} "
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Normalize a rule keyword like a name, keeping its edges as token boundaries
+
+    A keyword matches anywhere in a normalized name, so 'GATO' also matches
+    'GATOS'. A space or punctuation at an edge anchors that edge to a token
+    boundary: ' CAT ' is the token CAT only, 'CASITA P/' ends at 'P'.
+    Flags such as '@cat' are returned unchanged.
+    """
+    if keyword.startswith('@'):
+        return keyword
+    core = normalize_name(keyword).strip()
+    if not core:
+        raise ValueError(f"Keyword {keyword!r} has no letters or digits")
+    head = '' if keyword[0].isalnum() else ' '
+    tail = '' if keyword[-1].isalnum() else ' '
+    return head + core + tail
+
+
+def normalize_keywords(keywords) -> frozenset:
+    return frozenset(normalize_keyword(keyword) for keyword in keywords)
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton that finds every registered keyword in one pass"""
+
+    def __init__(self, keywords):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [frozenset()]
+        for keyword in keywords:
+            self._add(keyword)
+        self._link()
+
+    def _add(self, keyword: str):
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(frozenset())
+            state = nxt
+        self._out[state] = self._out[state] | {keyword}
+
+    def _link(self):
+        """Build failure links breadth-first and merge suffix outputs"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] | self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> set:
+        """Return the set of keywords occurring anywhere in text"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+        return found
+
+    def find_rows(self, text: str, separator: str, rows: int) -> list:
+        """Scan separator-joined texts in one pass, returning one keyword set per row"""
+        goto, fail, out = self._goto, self._fail, self._out
+        results = [set() for _ in range(rows)]
+        row = 0
+        found = results[0]
+        state = 0
+        for ch in text:
+            if ch == separator:
+                row += 1
+                found = results[row]
+                state = 0
+                continue
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+        return results
+
+
+class Rule:
+    """One ordered categorization rule loaded from category-rules.json"""
+
+    __slots__ = ('index', 'slug', 'keywords', 'requires', 'excludes', 'note')
+
+    def __init__(self, index: int, spec: dict):
+        self.index = index
+        self.slug = spec['slug']
+        self.keywords = normalize_keywords(spec['any'])
+        self.requires = tuple(normalize_keywords(group) for group in spec.get('requires', ()))
+        self.excludes = normalize_keywords(spec.get('none', ()))
+        self.note = spec.get('note', '')
+
+    def accepts(self, found: set) -> bool:
+        """Check the extra conditions once a trigger keyword has been found"""
+        if self.excludes and not self.excludes.isdisjoint(found):
+            return False
+        return all(not group.isdisjoint(found) for group in self.requires)
+
+
+class RuleTable:
+    """Ordered rules indexed by keyword; the lowest matching rule index wins"""
+
+    def __init__(self, spec: dict):
+        # Flags such as @cat or @wet are derived keywords rules can test like any other
+        self.flags = {f"@{flag}": normalize_keywords(words) for flag, words in spec['flags'].items()}
+        self.rules = [Rule(i, rule) for i, rule in enumerate(spec['rules'])]
+        canonical = json.dumps([ENGINE_VERSION, spec], sort_keys=True, ensure_ascii=False)
+        self.version = hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+        index = defaultdict(list)
+        for rule in self.rules:
+            for keyword in rule.keywords:
+                index[keyword].append(rule.index)
+        self.index = {keyword: tuple(ids) for keyword, ids in index.items()}
+
+        keywords = set()
+        for words in self.flags.values():
+            keywords |= words
+        for rule in self.rules:
+            keywords |= rule.keywords | rule.excludes
+            for group in rule.requires:
+                keywords |= group
+        keywords -= self.flags.keys()
+        self.matcher = KeywordMatcher(sorted(keywords))
+        self._matrices = None
+
+    @classmethod
+    def load(cls, path: Path) -> 'RuleTable':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def scan(self, text: str) -> set:
+        """Find every keyword in a normalized name and add the derived flags"""
+        found = self.matcher.find(text)
+        for flag, words in self.flags.items():
+            if not words.isdisjoint(found):
+                found.add(flag)
+        return found
+
+    def resolve(self, found: set) -> str:
+        """Return the slug of the first rule triggered by found that accepts it"""
+        candidates = set()
+        for keyword in found:
+            candidates.update(self.index.get(keyword, ()))
+        for rule_id in sorted(candidates):
+            rule = self.rules[rule_id]
+            if rule.accepts(found):
+                return rule.slug
+        return 'UNKNOWN'
+
+    def categorize(self, name: str) -> str:
+        return self.resolve(self.scan(normalize_name(name)))
+
+    def scan_many(self, names: list) -> list:
+        """Scan all names in a single automaton pass over their normalized forms"""
+        if not names:
+            return []
+        text = NAME_SEPARATOR.join(map(normalize_name, names))
+        hits = self.matcher.find_rows(text, NAME_SEPARATOR, len(names))
+        for found in hits:
+            for flag, words in self.flags.items():
+                if not words.isdisjoint(found):
+                    found.add(flag)
+        return hits
+
+    def categorize_many(self, names) -> list:
+        names = list(names)
+        hits = self.scan_many(names)
+        if np is None:
+            return [self.resolve(found) for found in hits]
+        results = []
+        for start in range(0, len(hits), BATCH_SIZE):
+            results.extend(self._resolve_matrix(hits[start:start + BATCH_SIZE]))
+        return results
+
+    def _build_matrices(self):
+        """Express every rule condition as columns over a shared keyword-group axis"""
+        groups = {}
+
+        def group_id(words: frozenset) -> int:
+            return groups.setdefault(words, len(groups))
+
+        never = group_id(frozenset())  # excluded-keyword column for rules without exclusions
+        triggers = [group_id(rule.keywords) for rule in self.rules]
+        excludes = [group_id(rule.excludes) if rule.excludes else never for rule in self.rules]
+        required = [[group_id(group) for group in rule.requires] for rule in self.rules]
+
+        token_groups = defaultdict(list)
+        for words, gid in groups.items():
+            for token in words:
+                token_groups[token].append(gid)
+
+        requires = np.zeros((len(groups), len(self.rules)), dtype=np.float32)
+        for rule_id, gids in enumerate(required):
+            requires[gids, rule_id] = 1
+        self._matrices = {
+            'groups': len(groups),
+            'token_groups': {token: tuple(gids) for token, gids in token_groups.items()},
+            'triggers': np.array(triggers),
+            'excludes': np.array(excludes),
+            'requires': requires,
+            'required_counts': requires.sum(axis=0),
+            'slugs': np.array([rule.slug for rule in self.rules] + ['UNKNOWN']),
+        }
+        return self._matrices
+
+    def _resolve_matrix(self, hits: list) -> list:
+        """Pick the winning rule per name with array operations over a names x rules matrix"""
+        m = self._matrices or self._build_matrices()
+        token_groups = m['token_groups']
+        rows, cols = [], []
+        for row, found in enumerate(hits):
+            for token in found:
+                gids = token_groups.get(token)
+                if gids:
+                    rows.extend([row] * len(gids))
+                    cols.extend(gids)
+
+        group_hits = np.zeros((len(hits), m['groups']), dtype=bool)
+        group_hits[rows, cols] = True
+
+        matched = group_hits[:, m['triggers']]
+        matched &= ~group_hits[:, m['excludes']]
+        matched &= group_hits.astype(np.float32) @ m['requires'] == m['required_counts']
+
+        winners = np.where(matched.any(axis=1), matched.argmax(axis=1), len(self.rules))
+        return m['slugs'][winners].tolist()
+
+
+class CategoryCache:
+    """Bounded LRU of normalized name -> slug, valid for one rule-table version"""
+
+    def __init__(self, version: str, maxsize: int = CACHE_SIZE):
+        self.version = version
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.fresh = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        slug = self.entries.get(key)
+        if slug is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return slug
+
+    def put(self, key: str, slug: str):
+        self.fresh[key] = slug
+        self.entries[key] = slug
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def drain(self) -> dict:
+        """Return and forget the entries added since the last drain"""
+        fresh, self.fresh = self.fresh, {}
+        return fresh
+
+    def merge(self, fresh: dict, hits: int, misses: int):
+        """Fold in the entries and counters gathered by a worker process"""
+        for key, slug in fresh.items():
+            self.put(key, slug)
+        self.hits += hits
+        self.misses += misses
+
+    def load(self, path: Path) -> int:
+        """Load entries saved by a previous run; files from other rule versions are ignored"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if data.get('version') != self.version:
+            return 0
+        for key, slug in data.get('entries', {}).items():
+            self.put(key, slug)
+        return len(self.entries)
+
+    def save(self, path: Path):
+        """Write entries in LRU order so a reload keeps recency"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.version, 'entries': self.entries}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = 100 * self.hits / total if total else 0
+        return f"{self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate), {len(self.entries)} entries"
+
+
+RULES = RuleTable.load(RULES_FILE)
+CACHE = CategoryCache(RULES.version)
+CATEGORY_TREE = categories.load(CATEGORIES_FILE)
 
 
 def categorize_product(name: str, current_cat: str = '') -> str:
     """Categorize a product based on its name"""
-    name_upper = name.upper()
-
-    # Species detection - PRIORITY
-    is_cat_product = any(k in name_upper for k in [
-        'GATO', ' CAT ', 'CAT ', ' CAT', 'GATITO', 'KITTEN', 'FELINO', 'FELINE',
-        'CATCHOW', 'CAT CHOW'
-    ])
-    is_dog_product = any(k in name_upper for k in [
-        'PERRO', ' DOG ', 'DOG ', ' DOG', 'CACHORRO', 'PUPPY', 'CANINO', 'CANINE'
-    ])
-
-    # ===== CLINICAL EQUIPMENT =====
-    # Laboratory Equipment
-    if any(k in name_upper for k in ['CENTRIFUGA', 'CENTRÍFUGA', 'MICROPIPETA',
-                                       'MICROSCOPIO', 'BAÑO MARIA', 'BAÑO MARÍA',
-                                       'ESTUFA DE LABORATORIO']):
-        return 'CLI-EQU-LAB'
-
-    # Anesthesia equipment
-    if any(k in name_upper for k in ['MAQUINA DE ANESTESIA', 'MÁQUINA DE ANESTESIA',
-                                       'VAPORIZADOR', 'ISOFLURANO', 'SEVOFLURANO',
-                                       'MONITOR MULTIPARAMETRICO', 'MONITOR MULTIPARAMÉTRICO',
-                                       'PULSIOXIMETRO', 'PULSIOXÍMETRO', 'CAPNOGRAFO', 'CAPNÓGRAFO',
-                                       'CIRCUITO BAIN', 'CIRCUITO CIRCULAR', 'CAL SODADA',
-                                       'MASCARA FACIAL', 'MÁSCARA FACIAL', 'MASCARAS FACIALES',
-                                       'MÁSCARAS FACIALES', 'REANIMADOR', 'AMBU',
-                                       'BOLSAS DE REINHALACION', 'BOLSAS DE REINHALACIÓN']):
-        return 'CLI-EQU-ANE'
-
-    # Diagnostic equipment
-    if any(k in name_upper for k in ['ESTETOSCOPIO', 'OTOSCOPIO', 'OFTALMOSCOPIO',
-                                       'TERMOMETRO', 'TERMÓMETRO', 'APARATO DE PRESION',
-                                       'APARATO DE PRESIÓN', 'LITTMANN', 'WELCH ALLYN',
-                                       'ANALIZADOR', 'CATALYST', 'PROCYTE', 'BASCULA',
-                                       'BÁSCULA']):
-        return 'CLI-EQU-DIA'
-
-    # Surgical instruments and kits
-    if any(k in name_upper for k in ['MANGO DE BISTURI', 'MANGO DE BISTURÍ',
-                                       'PORTA AGUJAS', 'PINZA KELLY', 'PINZA MOSQUITO',
-                                       'PINZA ALLIS', 'PINZA BABCOCK', 'PINZA KOCHER',
-                                       'TIJERA MAYO', 'TIJERA METZENBAUM',
-                                       'GRAPADORA DE PIEL', 'REMOVEDOR DE GRAPAS',
-                                       'ELECTROBISTURI', 'ELECTROBISTURÍ',
-                                       'LAPIZ PARA ELECTRO', 'LÁPIZ PARA ELECTRO',
-                                       'SEPARADOR SENN', 'SEPARADOR GELPI',
-                                       'RETRACTOR', 'FORCEPS',
-                                       'SET QUIRURGICO', 'SET QUIRÚRGICO',
-                                       'KIT QUIRURGICO', 'KIT QUIRÚRGICO']):
-        return 'CLI-EQU-INS'
-
-    # Mobility equipment
-    if any(k in name_upper for k in ['CAMILLA', 'MESA DE MAYO', 'MESA DE INSPECCION',
-                                       'MESA DE INSPECCIÓN', 'SOPORTE SUERO', 'BIOMBO']):
-        return 'CLI-EQU-MOB'
-
-    # ===== CLINICAL PHARMACY =====
-    # Neurology
-    if any(k in name_upper for k in ['EPIPHEN', 'FENOBARBITAL', 'LEVETIRACETAM']):
-        return 'CLI-FAR-NEU'
-
-    # Vaccines
-    if any(k in name_upper for k in ['VACUNA', 'NOBIVAC', 'VACCINE', 'DHPP', 'QUINTUPLE',
-                                       'EURICAN', 'RABISIN', 'PUREVAX', 'RECOMBITEK']):
-        return 'CLI-FAR-VAC'
-
-    # Antibiotics
-    if any(k in name_upper for k in ['AMOXICILINA', 'CEFALEXINA', 'ENROFLOXACINA',
-                                       'METRONIDAZOL', 'DOXICICLINA', 'AZITROMICINA', 'AGEMOXI',
-                                       'MARBOCYL', 'MARBOFLOXACINA', 'CLAVULANATO']):
-        return 'CLI-FAR-ANB'
-
-    # Anti-inflammatories (also GI meds like omeprazole)
-    if any(k in name_upper for k in ['MELOXICAM', 'CARPROFENO', 'PREDNISOLONA',
-                                       'DEXAMETASONA', 'KETOPROFENO', 'ANALGESIN', 'PREVICOX',
-                                       'TOLFEDINE', 'TOLFENÁMICO', 'RIMADYL',
-                                       'GAVIZ', 'OMEPRAZOL', 'MELOXI ', ' MELOXI']):
-        return 'CLI-FAR-AIN'
-
-    # Fluids
-    if any(k in name_upper for k in ['SUERO FISIOLOGICO', 'SUERO FISIOLÓGICO',
-                                       'RINGER', 'DEXTROSA', 'SOLUCION SALINA',
-                                       'SOLUCIÓN SALINA']):
-        return 'CLI-FAR-FLU'
-
-    # ===== CLINICAL CONSUMABLES =====
-    # Lab consumables
-    if any(k in name_upper for k in ['SNAP 4DX', 'SNAP PARVO', 'SNAP GIARDIA', 'SNAP FIV',
-                                       'SNAP CPL', 'VACUTAINER', 'TUBO EDTA',
-                                       'PORTAOBJETO', 'TEST RAPIDO', 'TEST RÁPIDO',
-                                       'TIRAS DE URIAN', 'REACTIVO']):
-        return 'CLI-INS-LAB'
-
-    # Surgical consumables / Sutures / Tubes
-    if any(k in name_upper for k in ['SUTURA', 'VICRYL', 'MONOCRYL', 'PDS II',
-                                       'PROLENE', 'ETHILON', 'MONONYLON', 'SEDA 3-0',
-                                       'HOJAS DE BISTURI', 'HOJAS DE BISTURÍ',
-                                       'BAJALENGUA', 'COLECTOR DE ORINA',
-                                       'SONDA DE ASPIRACION', 'SONDA DE ASPIRACIÓN',
-                                       'SONDA ENDOTRAQUEAL', 'SONDA NASOGASTRICA',
-                                       'SONDA NASOGÁSTRICA', 'SONDA URETRAL',
-                                       'SONDA FOLEY', 'SONDA ALIMENTACION',
-                                       'TUBO ENDOTRAQUEAL', 'TUBOS ENDOTRAQUEALES',
-                                       'LARINGOSCOPIO']):
-        return 'CLI-INS-QUI'
-
-    # Syringes/Needles/IV
-    if any(k in name_upper for k in ['JERINGA', 'JERINGA BD', 'AGUJA ', 'AGUJAS BD',
-                                       'CATETER IV', 'CATÉTER IV',
-                                       'SET DE INFUSION', 'SET DE INFUSIÓN',
-                                       'SET DE EXTENSION', 'SET DE EXTENSIÓN',
-                                       'MICROINFUSION', 'MICROINFUSIÓN',
-                                       'LLAVE DE 3 VIAS', 'LLAVE DE 3 VÍAS',
-                                       'MARIPOSA BD', 'PUERTO DE INYECCION',
-                                       'PUERTO DE INYECCIÓN']):
-        return 'CLI-INS-AGU'
-
-    # PPE
-    if any(k in name_upper for k in ['GUANTES DE NITRILO', 'GUANTES DE LATEX',
-                                       'GUANTES DE LÁTEX', 'GUANTES QUIRURGICOS',
-                                       'GUANTES QUIRÚRGICOS', 'MASCARILLA',
-                                       'BATA QUIRURGICA', 'BATA QUIRÚRGICA',
-                                       'BATA DESCART', 'CONTENEDOR DE DESECHOS',
-                                       'DESCARTEX', 'GORROS QUIRURGICOS', 'GORROS QUIRÚRGICOS',
-                                       'CUBRE ZAPATOS', 'CAMPOS QUIRURGICOS', 'CAMPOS QUIRÚRGICOS']):
-        return 'CLI-INS-EPP'
-
-    # Bandages
-    if any(k in name_upper for k in ['GASA HIDROFILA', 'GASA HIDRÓFILA', 'GASA EN ROLLO',
-                                       'GASAS ESTERILES', 'GASAS ESTÉRILES',
-                                       'VENDA ELASTICA', 'VENDA ELÁSTICA', 'VENDA COHESIVA',
-                                       'ALGODON HIDROFILO', 'ALGODÓN HIDRÓFILO',
-                                       'ESPARADRAPO', 'MICROPORE', 'CINTA QUIRURGICA',
-                                       'CINTA QUIRÚRGICA', 'TORUNDAS']):
-        return 'CLI-INS-VEN'
-
-    # ===== PHARMACY (OTC) =====
-    # Antiparasitics - External
-    if any(k in name_upper for k in ['FRONTLINE', 'NEXGARD', 'BRAVECTO', 'SIMPARICA',
-                                       'ADVANTAGE', 'SERESTO', 'SCALIBOR', 'EFFIPRO',
-                                       'HECTORPAR', 'HECTOPAR', 'ECTOGAL', 'FIPROTECTOR', 'FIPRONIL',
-                                       'PERMETRINA', 'TALCO ANTIPULGA']):
-        return 'FAR-ANT-EXT'
-    if any(k in name_upper for k in ['PIPETA ANTI', 'ANTIPULGA', 'ANTIGARRAPATA']):
-        return 'FAR-ANT-EXT'
-    if 'COLLAR ANTIPARASITARIO' in name_upper or 'COLLAR ANTI PULGA' in name_upper:
-        return 'FAR-ANT-EXT'
-
-    # Antiparasitics - Internal
-    if any(k in name_upper for k in ['DRONTAL', 'VERMIFUGO', 'VERMÍFUGO', 'DESPARASITANTE',
-                                       'ANTIPARASITARIO APTO', 'BASKEN', 'FENTEL', 'VERMINOL',
-                                       'ANTIHELMINT', 'DESPARASITAN']):
-        return 'FAR-ANT-INT'
-
-    # Joint Supplements
-    if any(k in name_upper for k in ['ARTRIN', 'CONDROVET', 'COSEQUIN', 'ARTROFLEX']):
-        return 'FAR-SUP-ART'
-
-    # Supplements/Vitamins (including calming/behavioral/liver)
-    if any(k in name_upper for k in ['VITAMINA', 'OMEGA 3', 'GLICOPAN', 'HEMOLITAN',
-                                       'SUPLEMENTO', 'AMINOMIX', 'ORGANEW', 'CONDROTON',
-                                       'FELIWAY', 'ADAPTIL', 'CALCI PLUS', 'PELO E DERME',
-                                       'NUTRIBOUND', 'ZYLKENE', 'ANXITANE', 'IPAKITINE',
-                                       'NUTRICAM', 'ANAVIMIN', 'BIOMODULADOR', 'OHM ',
-                                       'CALMANTE', 'RELAJANTE', 'CALMING',
-                                       'KUALCOHEPAT', 'HEPATO', 'MEGA MATER', 'FERTIL']):
-        return 'FAR-SUP-VIT'
-
-    # Probiotics / Digestive / Anti-hairball
-    if any(k in name_upper for k in ['PROBIOTICO', 'PROBIÓTICO', 'FORTIFLORA', 'PRO-KOLIN',
-                                       'KOPROFAGIA', 'BALL FREE', 'ANTI BOLAS DE PELO',
-                                       'HAIRBALL', 'MALTA']):
-        return 'FAR-SUP-DIG'
-
-    # Dermatology topicals / Antifungals
-    if any(k in name_upper for k in ['POMADA', 'CREMA DERMA', 'SPRAY CICATRIZ', 'ALLERDERM',
-                                       'KUALCODERM', 'CREMA CICATRIZ', 'UNGÜENTO', 'UNGUENTO',
-                                       'CREMA ANTIMICO', 'CREMA ANTIFUNG', 'CREMA HIDRAT',
-                                       'DERMIL', 'DERMOMICINA', 'CLORHPET', 'CLOREXHIDINA',
-                                       'ANTISEPTICO', 'ANTISÉPTICO', 'GLICOL PET',
-                                       'ITRACONAZOL', 'KETOCONAZOL', 'LABYDERM']):
-        return 'FAR-DER-TOP'
-
-    # Ear/Eye medications
-    if any(k in name_upper for k in ['OTOLOGICA', 'OTOLÓGICA', 'AURIZON', 'EASOTIC',
-                                       'COLIRIO', 'CLEAN-UP', 'LIMPIADOR OIDO',
-                                       'LIMPIADOR OÍDO', 'EPI-OTIC', 'LIMPIADOR OTICO',
-                                       'LIMPIADOR ÓTICO', 'MOXIOFTAL', 'OFTALMICO', 'OFTÁLMICO']):
-        return 'FAR-DER-OTI'
-
-    # ===== EXOTIC NUTRITION =====
-    # Fish food
-    if any(k in name_upper for k in ['LABCON', 'ALCON COLOURS', 'TETRAMIN', 'ALIMENTO PECES',
-                                       'ALCON BASIC', 'ALCON GOLD']):
-        return 'NUT-EXO-PEC'
-
-    # Bird food
-    if any(k in name_upper for k in ['ALCON CLUB', 'MEZCLA CANARIO', 'SEMILLAS GIRASOL',
-                                       'ALCON PSITA', 'ALIMENTO AVES', 'ALPISTE',
-                                       'MISTURA PARA LORO', 'LORO', 'COTORRA', 'CACATUA']):
-        return 'NUT-EXO-AVE'
-
-    # ===== NUTRITION - Check species FIRST =====
-
-    # Cat litter - check BEFORE food brands
-    if any(k in name_upper for k in ['ARENA PARA GATO', 'ARENA HIGIENICA', 'ARENA HIGIÉNICA',
-                                       'PIEDRA SANITARIA', 'ARENA AGLOMERANTE',
-                                       'ARENA BIODEGRADABLE', 'ARENA NATURAL',
-                                       'ARENA LAVANDA', 'ARENA PERFUMADA', 'ARENA SILICE',
-                                       'ARENA SÍLICE', 'ARENA BABY POWDER',
-                                       'BIOKITTY', 'CATRON', 'KETS ARENA',
-                                       'ARENA SANITARIA', 'ARENA AURA', 'ARENA TOI MOI',
-                                       'GRANULADO HIGIENICO', 'GRANULADO HIGIÉNICO',
-                                       'GRANULADO PARA GATOS', 'BIO PELLETS',
-                                       'TOI MOI', 'SILICA GREAT', 'CRISTAL PARA GATO',
-                                       'ARENA FLORA', 'ARENA NATURA', 'CLUMPING CAT']):
-        return 'ACC-HIG-ARE'
-
-    # Wet food detection - check BEFORE dry food
-    is_wet_food = any(k in name_upper for k in ['SACHET', 'LATA ', ' LATA', 'POUCH',
-                                                  'HUMEDO', 'HÚMEDO', 'SALSA', 'PATE', 'PATÉ',
-                                                  'GELATINA', 'DELICIOSO', 'DELICATESSE'])
-
-    # Cat wet food brands
-    cat_wet_brands = ['WHISKAS', 'FELIX', 'SHEBA', 'GOURMET', 'FANCY FEAST']
-    if any(k in name_upper for k in ['FELIX SENSATIONS', 'FELIX KITTEN',
-                                       'SHEBA DELICATESSE', 'SHEBA FRESH',
-                                       'GOURMET GOLD', 'GOURMET REVELATIONS']):
-        return 'NUT-FEL-HUM'
-    if is_wet_food and (is_cat_product or any(k in name_upper for k in cat_wet_brands)):
-        return 'NUT-FEL-HUM'
-    # Gourmet brand is always cat wet food
-    if 'GOURMET' in name_upper:
-        return 'NUT-FEL-HUM'
-
-    # Dog wet food brands
-    if any(k in name_upper for k in ['CESAR DELICIOSO', 'CESAR MULTIPACK', 'CESAR GOURMET']):
-        return 'NUT-CAN-HUM'
-    if is_wet_food and is_dog_product:
-        return 'NUT-CAN-HUM'
-
-    # Snacks - before dry food
-    if any(k in name_upper for k in ['DENTASTIX', 'DREAMIES', 'TEMPTATION', 'PARTY MIX']):
-        if is_cat_product:
-            return 'NUT-FEL-SNA'
-        return 'NUT-CAN-SNA'
-
-    if any(k in name_upper for k in ['SNACK ', ' SNACK', 'PREMIO', 'TREAT', 'GALLETA',
-                                       'BISCUIT', ' BITES', 'HUESO COMESTIBLE', 'DUDOGS',
-                                       'COOKIE GOLDEN', 'COOKIE PREMIER', 'COOKIES',
-                                       'HUESO MASTICABLE', 'HUESO HUMERO', 'HUESO NATURAL',
-                                       'HUESO PALITO', 'HUESO FEMUR', 'GRAN CANI',
-                                       'CARNAZA', 'OREJA DE CERDO', 'PATA DE POLLO',
-                                       'GOLOSINA P/']):
-        if 'TABLETA' not in name_upper:
-            if is_cat_product or 'GATO' in name_upper:
-                return 'NUT-FEL-SNA'
-            return 'NUT-CAN-SNA'
-
-    # Cat dry food brands
-    cat_food_brands = ['MONELLO CAT', 'CAT CHOW', 'CATCHOW', 'MATISSE',
-                       'THREE CATS', 'PRIMOGATO',
-                       'BIRBO PREMIUM GATOS', 'BIRBO PREMIUM GATITOS',
-                       'EXCELLENT GATOS', 'EXCELLENT GATITOS',
-                       'MONELLO ADULT CAT', 'MONELLO KITTEN',
-                       'WHISKAS ADULTO', 'WHISKAS GATITO', 'WHISKAS CASTRADO']
-    if any(k in name_upper for k in cat_food_brands):
-        return 'NUT-FEL-SEC'
-
-    # Dog dry food brands
-    dog_food_brands = ['MONELLO DOG', 'DOG CHOW', 'PEDIGREE', 'MIKDOG', 'LUPY DOG',
-                       'PRO PLAN DOG', 'PRIORITA', 'THREE DOG',
-                       'EXCELLENT DOG', 'GANADOR', 'PRIMOCAO',
-                       'BIRBO PREMIUM ADULTOS', 'BIRBO PREMIUM CACHORROS',
-                       'MONELLO ADULT DOG', 'MONELLO PUPPY', 'MONELLO PERRO',
-                       'MONELLO TRADICIONAL', 'MONELLO LIGHT', 'MONELLO SELECT',
-                       'EXCELLENT ADULTOS', 'EXCELLENT CACHORROS',
-                       'POTE EVEREST', 'EVEREST ADULTO']
-    if any(k in name_upper for k in dog_food_brands):
-        return 'NUT-CAN-SEC'
-
-    # General balanced food with species detection
-    if any(k in name_upper for k in ['BALANCEADO', 'RATION', 'PIENSO', 'ALIMENTO SECO']):
-        # VetLife therapeutic diets
-        if 'VETLIFE' in name_upper or 'VET LIFE' in name_upper:
-            if is_cat_product:
-                return 'NUT-FEL-PRE'
-            return 'NUT-CAN-PRE'
-        if is_cat_product and not is_dog_product:
-            return 'NUT-FEL-SEC'
-        if is_dog_product or any(k in name_upper for k in ['ADULTO', 'CACHORRO', 'SENIOR']):
-            return 'NUT-CAN-SEC'
-
-    # Brand-based detection with species awareness
-    # Formula Natural
-    if 'FORMULA NATURAL' in name_upper or 'FÓRMULA NATURAL' in name_upper:
-        if is_cat_product:
-            return 'NUT-FEL-SEC'
-        return 'NUT-CAN-SEC'
-
-    # N&D Farmina
-    if 'N&D' in name_upper or 'FARMINA' in name_upper:
-        if is_cat_product:
-            return 'NUT-FEL-SEC'
-        return 'NUT-CAN-SEC'
-
-    # Pro Plan
-    if 'PRO PLAN' in name_upper or 'PROPLAN' in name_upper:
-        if is_cat_product:
-            return 'NUT-FEL-SEC'
-        return 'NUT-CAN-SEC'
-
-    # Hills
-    if 'HILL' in name_upper or 'SCIENCE DIET' in name_upper:
-        if is_cat_product:
-            if any(k in name_upper for k in ['PRESCRIPTION', 'VETERINARY']):
-                return 'NUT-FEL-PRE'
-            return 'NUT-FEL-SEC'
-        if any(k in name_upper for k in ['PRESCRIPTION', 'VETERINARY']):
-            return 'NUT-CAN-PRE'
-        return 'NUT-CAN-SEC'
-
-    # Vet Life / therapeutic diets
-    if 'VET LIFE' in name_upper or 'VETLIFE' in name_upper:
-        if is_cat_product:
-            return 'NUT-FEL-PRE'
-        return 'NUT-CAN-PRE'
-
-    # Royal Canin
-    if 'ROYAL CANIN' in name_upper:
-        is_prescription = any(k in name_upper for k in ['GASTROINTESTINAL', 'RENAL',
-                                                          'URINARY', 'HEPATIC', 'CARDIAC',
-                                                          'HYPOALLERGENIC', 'DIABETIC'])
-        if is_cat_product or any(k in name_upper for k in ['STERILISED', 'INDOOR', 'KITTEN']):
-            if is_wet_food:
-                return 'NUT-FEL-HUM'
-            if is_prescription:
-                return 'NUT-FEL-PRE'
-            return 'NUT-FEL-SEC'
-        if is_wet_food:
-            return 'NUT-CAN-HUM'
-        if is_prescription:
-            return 'NUT-CAN-PRE'
-        return 'NUT-CAN-SEC'
-
-    # Vitalcan
-    if 'VITALCAN' in name_upper:
-        if is_cat_product:
-            return 'NUT-FEL-SEC'
-        return 'NUT-CAN-SEC'
-
-    # Cibau
-    if 'CIBAU' in name_upper:
-        if is_cat_product:
-            return 'NUT-FEL-SEC'
-        return 'NUT-CAN-SEC'
-
-    # Ganador
-    if 'GANADOR' in name_upper:
-        if is_cat_product:
-            return 'NUT-FEL-SEC'
-        return 'NUT-CAN-SEC'
-
-    # Origens
-    if 'ORIGENS' in name_upper:
-        if is_cat_product:
-            return 'NUT-FEL-SEC'
-        return 'NUT-CAN-SEC'
-
-    # Select
-    if 'SELECT' in name_upper and ('NUTRICION' in name_upper or 'NUTRICIÓN' in name_upper or 'DIGESTION' in name_upper):
-        return 'NUT-CAN-SEC'
-
-    # ===== ACCESSORIES =====
-
-    # Dental care products
-    if any(k in name_upper for k in ['FRESH BREATH', 'ADITIVO ORAL', 'LIMPIADOR DENTAL',
-                                       'GEL LIMPIADOR DE DIENTES', 'PASTA DENTAL',
-                                       'CEPILLO DENTAL', 'CREMA DENTAL', 'C.E.T.']):
-        return 'ACC-HIG-DEN'
-
-    # Shampoo/Grooming cosmetics
-    if any(k in name_upper for k in ['SHAMPOO', 'CHAMPU', 'CHAMPÚ', 'ACONDICIONADOR',
-                                       'PERFUME', 'COLONIA', 'HIDRAPET', 'CLORESTEN',
-                                       'TROPICLEAN', 'HYDRA COLOGNE', 'HYDRA COLGNE', 'JABON', 'JABÓN',
-                                       'SUAVEPEL', 'PULGAFIN', 'BAÑO SECO', 'LYSOFORM',
-                                       'DESINFECTANTE PET', 'NEUTRALIZADOR OLORES',
-                                       'LIMPIA PATAS', 'ESPUMA LIMPIA', 'LIMPIADOR PATAS']):
-        return 'ACC-HIG-SHA'
-
-    # Grooming tools
-    if any(k in name_upper for k in ['ALICATE', 'CORTAUNA', 'CORTA UÑA', 'CORTA UNA',
-                                       'LIMA UÑA', 'FURMINATOR', 'CEPILLO', 'PEINE',
-                                       'CARDINA', 'SLICKER', 'RASCADOR DE MADERA',
-                                       'CLIPER']):
-        if 'DENTAL' not in name_upper:
-            return 'ACC-HIG-CEP'
-
-    # Sanitary bags/pads/dispensers/diapers/training
-    if any(k in name_upper for k in ['BOLSA SANITARIA', 'BOLSAS SANITARIAS', 'ABSORBENTE',
-                                       'TAPETE HIGIENICO', 'TAPETE HIGIÉNICO',
-                                       'DISPENSADOR BOLSA', 'BOMBACHITA', 'PAÑAL PERRO',
-                                       'PAÑAL MACHO', 'EDUCADOR URINE', 'EDUCA PET',
-                                       'REPELENTE EDUCADOR', 'ATRAYENTE']):
-        return 'ACC-HIG-PAÑ'
-
-    # Litter boxes and bathtubs
-    if any(k in name_upper for k in ['BANDEJA SANITARIA', 'BANDEJA HIGIENICA',
-                                       'BANDEJA HIGIÉNICA', 'ARENERO', 'LITTER BOX',
-                                       'BAÑERA GATO', 'BAÑERA OVAL', 'BANDEJA P/ GATO',
-                                       'BANDEJA INTELIGENTE', 'BANDEJA CLASSIC']):
-        return 'ACC-HIG-BAN'
-
-    # Collars/Leashes/Harnesses
-    if any(k in name_upper for k in ['COLLAR ', ' COLLAR', 'CORREA', 'PRETAL', 'ARNES',
-                                       'ARNÉS', 'GUIA ', ' GUIA', 'GUÍA', 'BOZAL',
-                                       'PECHERA', 'TIRADOR']):
-        if 'ANTIPARASITARIO' not in name_upper and 'ANTI PULGA' not in name_upper:
-            return 'ACC-PAS-COL'
-
-    # Carriers/Transport/Car accessories
-    if any(k in name_upper for k in ['TRANSPORTADORA', 'BOLSO TRANSPORTE', 'CARRIER',
-                                       'MOCHILA', 'BOLSA AEREA', 'BOLSA AÉREA',
-                                       'CAJA DE TRANSPORTE', 'LOVE TRAVEL',
-                                       'BOLSA DE TRANSPORTE', 'PET AERIAL', 'PET ATENAS',
-                                       'PET GRECIA', 'PET IPANEMA', 'PET RED',
-                                       'CAJA TRANSPORTE', 'VARI KENNEL', 'CUBRE ASIENTO',
-                                       'PROTECTOR ASIENTO', 'RAMPA PLEGABLE']):
-        return 'ACC-PAS-TRA'
-
-    # Clothes
-    if any(k in name_upper for k in ['CHALECO', 'IMPERMEABLE', 'ABRIGO', 'CAMISETA PET',
-                                       'BANDANA', 'ROPA PARA PERRO']):
-        return 'ACC-PAS-ROP'
-
-    # Beds/Stairs/Mats
-    if any(k in name_upper for k in ['CAMA ', 'CAMA PARA', 'COLCHON', 'COLCHÓN', 'COLCHONETA',
-                                       'SLEEPER', 'PET COOL', 'CAMA CLOUD', 'DONUT CAMA',
-                                       'ESCALERA PET', 'ESCALERA MASCOTA', 'RAMPA PET']):
-        return 'ACC-DES-CAM'
-
-    # Houses/Kennels/Cages/Enclosures for dogs
-    if any(k in name_upper for k in ['CUCHA', 'CASA PERRO', 'CASA PLASTICA', 'CASA PLÁSTICA',
-                                       'IGLU', 'IGLÚ', 'CASITA PLASTICA', 'CASITA PLÁSTICA',
-                                       'CASITA P/', 'CASITA PLAST', 'JAULA CERCADO',
-                                       'BLACK DOG HOUSE', 'ECO DOG HOUSE',
-                                       'CERCADO GALVANIZADO', 'CORRAL PERRO', 'PEN PERRO',
-                                       'PUERTA MASCOTA', 'PUERTA PERRO']):
-        return 'ACC-DES-CUC'
-
-    # Scratchers/Cat trees
-    if any(k in name_upper for k in ['RASCADOR', 'ARAÑADOR', 'ARANADOR',
-                                       'TORRE GATO', 'GIMNASIO GATO', 'VESPER',
-                                       'ARBOL RASCADOR', 'ÁRBOL RASCADOR']):
-        return 'ACC-DES-RAS'
-
-    # Interactive toys
-    if any(k in name_upper for k in ['KONG', 'DISPENSER', 'PUZZLE', 'LICKS', 'INTERACTIVO']):
-        return 'ACC-JUG-INT'
-
-    # Cat toys / Enrichment
-    if any(k in name_upper for k in ['RATON', 'RATÓN', 'PLUMA', 'CIRCUIT', 'SENSES 2.0',
-                                       'TUNEL DE JUEGO', 'TÚNEL DE JUEGO',
-                                       'CATNIP', 'ALMOHADA PARA GATO', 'VALERIAN']):
-        return 'ACC-JUG-GAT'
-
-    # Catit brand (cat accessories)
-    if 'CATIT' in name_upper:
-        if any(k in name_upper for k in ['FOUNTAIN', 'FUENTE']):
-            return 'ACC-COM-GAT'
-        if any(k in name_upper for k in ['DIGGER', 'FOOD TREE', 'SENSES']):
-            return 'ACC-COM-GAT'
-        if any(k in name_upper for k in ['SPINNER', 'CIRCUIT']):
-            return 'ACC-JUG-GAT'
-        if any(k in name_upper for k in ['VESPER', 'TOWER', 'ROCKET']):
-            return 'ACC-DES-RAS'
-        return 'ACC-JUG-GAT'
-
-    # Chuckit brand (dog toys)
-    if 'CHUCKIT' in name_upper:
-        return 'ACC-JUG-PEL'
-
-    # Trixie brand
-    if 'TRIXIE' in name_upper:
-        if any(k in name_upper for k in ['JUEGO', 'GAME', 'BOARD', 'PUZZLE', 'STRATEGY']):
-            return 'ACC-JUG-INT'
-        if any(k in name_upper for k in ['TUNNEL', 'TUNEL']):
-            return 'ACC-JUG-GAT'
-        if any(k in name_upper for k in ['CEPILLO', 'BRUSH', 'CORTAUNA', 'SCISSORS']):
-            return 'ACC-HIG-CEP'
-        if any(k in name_upper for k in ['CAMA', 'DONUT']):
-            return 'ACC-DES-CAM'
-        if any(k in name_upper for k in ['RASCADOR', 'ARBOL', 'ÁRBOL']):
-            return 'ACC-DES-RAS'
-        return 'ACC-JUG-PEL'
-
-    # Zeedog brand
-    if 'ZEEDOG' in name_upper:
-        if any(k in name_upper for k in ['ARNES', 'ARNÉS', 'COLLAR', 'CORREA']):
-            return 'ACC-PAS-COL'
-        if 'BOLSA' in name_upper:
-            return 'ACC-HIG-PAÑ'
-        if 'BANDANA' in name_upper:
-            return 'ACC-PAS-ROP'
-        if 'CAMA' in name_upper:
-            return 'ACC-DES-CAM'
-        return 'ACC-PAS-COL'
-
-    # Ferplast brand
-    if 'FERPLAST' in name_upper:
-        if any(k in name_upper for k in ['ARNES', 'ARNÉS', 'COLLAR', 'CORREA', 'AGILA']):
-            return 'ACC-PAS-COL'
-        if any(k in name_upper for k in ['CAMA', 'SIESTA', 'SLEEPER']):
-            return 'ACC-DES-CAM'
-        if 'COMEDERO' in name_upper or 'GLAM' in name_upper:
-            return 'ACC-COM-PER'
-        return 'ACC-PAS-COL'
-
-    # General toys
-    if any(k in name_upper for k in ['JUGUETE', 'PELOTA', 'CUERDA', 'MORDEDOR', 'TOY',
-                                       'PELUCHE', 'BOLA ']):
-        # Cat toys
-        if is_cat_product or any(k in name_upper for k in ['SISAL', 'CATNIP', 'MATATABI']):
-            return 'ACC-JUG-GAT'
-        return 'ACC-JUG-PEL'
-
-    # Feeders/Bowls/Food Storage
-    if any(k in name_upper for k in ['COMEDERO', 'BEBEDERO', 'FUENTE AGUA', 'PLATO',
-                                       'BOWL', 'ANTI HORMIGA', 'CANISTER', 'CONTENEDOR ALIMENTO',
-                                       'DISPENSADOR ALIMENTO', 'PORTA BALANCEADO']):
-        if is_cat_product:
-            return 'ACC-COM-GAT'
-        return 'ACC-COM-PER'
-
-    # Feeder mats
-    if 'ALFOMBRA' in name_upper or 'ZEEMAT' in name_upper:
-        return 'ACC-COM-PER'
-
-    # ===== EXOTIC ACCESSORIES =====
-    # Bird cages and accessories
-    if any(k in name_upper for k in ['JAULA ', 'NIDO P/', 'NIDO PARA', 'BAÑERA PARA PAJARO',
-                                       'BAÑERA OVAL PARA PAJARO', 'PERCHAS']):
-        return 'ACC-EXO-AVE'
-
-    # Rodent/Cage accessories / Sand bath
-    if any(k in name_upper for k in ['EXTENSOR DE REJILLA', 'KIT PORTON', 'RUEDA DE EJERCICIO',
-                                       'ARENA DE BAÑO', 'ARENA ZOOBET', 'VIRUTA', 'HAMSTER']):
-        return 'ACC-EXO-ROE'
-
-    # ===== CLINICAL KITS/COMBOS =====
-    if 'KIT DOSIFICADOR' in name_upper:
-        return 'CLI-INS-AGU'
-    if any(k in name_upper for k in ['COMBO CLINICO', 'COMBO CLÍNICO', 'BOTIQUIN', 'BOTIQUÍN',
-                                       'COMBO SALUD']):
-        return 'CLI-INS-QUI'
-
-    # Medical applicators and tools
-    if any(k in name_upper for k in ['APLICADOR COMPRIMIDO', 'APLICADOR DE PASTILLA',
-                                       'PILL DISPENSER', 'PASTILLERO']):
-        return 'ACC-HIG-DEN'  # Goes with dental/oral care tools
-
-    # Generic insumos check (last resort for CLI-INS items without specific subcategory)
-    if any(k in name_upper for k in ['INSUMOS HOSPITALARIOS', 'INSUMOS VETERINARIOS',
-                                       'INSUMOS DE LABORATORIO', 'EQUIPOS DE LABORATORIO',
-                                       'EQUIPOS HOSPITALARIOS', 'EQUIPOS VETERINARIOS']):
-        # These are category headers, not actual products - skip
-        return 'UNKNOWN'
+    key = normalize_name(name)
+    slug = CACHE.get(key)
+    if slug is None:
+        slug = RULES.categorize(name)
+        CACHE.put(key, slug)
+    return slug
+
+
+_fuzzy = None
+
+
+def fuzzy_index() -> TrigramIndex:
+    """Trigram index of categorized catalog names, mapped once per process"""
+    global _fuzzy
+    if _fuzzy is None:
+        _fuzzy = TrigramIndex(FUZZY_FILE)
+    return _fuzzy
+
+
+def catalog_stamp(files: list) -> str:
+    """Identifies the rules, category tree and catalog files a fuzzy index was built from"""
+    digest = hashlib.sha256(f"{RULES.version}.{CATEGORY_TREE.version}".encode('utf-8'))
+    for f in files:
+        st = f.stat()
+        digest.update(f"{f.name}:{st.st_size}:{st.st_mtime_ns}\n".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def ensure_fuzzy_index(files: list) -> bool:
+    """Rebuild the fuzzy index if the catalog or rules changed, returning whether it was rebuilt
+
+    Only names the rules place in the category tree are indexed, labelled
+    with the slug the rules give them. Names are keyed on normalize_name(),
+    like fuzzy_query() keys its queries, so accents and glued quantities
+    do not split otherwise equal names.
+    """
+    global _fuzzy
+    stamp = catalog_stamp(files)
+    if TrigramIndex.stamp_of(FUZZY_FILE) == stamp:
+        return False
+
+    def entries():
+        for f in files:
+            for batch in jsonstream.iter_batches(f, STREAM_BATCH_SIZE):
+                names = [p.get('name', '') for p in batch]
+                for name, slug in zip(names, categorize_many(names)):
+                    if slug in CATEGORY_TREE:
+                        yield normalize_name(name), slug
+
+    if _fuzzy is not None:
+        _fuzzy.close()
+        _fuzzy = None
+    trigrams.build(FUZZY_FILE, entries(), stamp)
+    return True
+
+
+def open_fuzzy_index(files: list) -> TrigramIndex:
+    """fuzzy_index() after bringing it up to date with files, reporting whether it was rebuilt
+
+    Building reads the whole catalog, so only runs that query it call this.
+    """
+    rebuilt = ensure_fuzzy_index(files)
+    index = fuzzy_index()
+    print(f"Fuzzy index: {len(index)} categorized names ({'rebuilt' if rebuilt else 'unchanged'})")
+    return index
+
+
+def fuzzy_query(names: list) -> list:
+    """(slug, confidence) per name from the fuzzy index, keyed like its names"""
+    return fuzzy_index().query_many([normalize_name(name) for name in names])
+
+
+def with_fuzzy(names: list, suggestions: list, min_confidence: float) -> list:
+    """Replace UNKNOWN suggestions by fuzzy ones whose confidence is at least min_confidence"""
+    unknown = [i for i, slug in enumerate(suggestions) if slug == 'UNKNOWN']
+    if unknown:
+        for i, (slug, confidence) in zip(unknown, fuzzy_query([names[i] for i in unknown])):
+            if confidence >= min_confidence:
+                suggestions[i] = slug
+    return suggestions
+
+
+def categorize_many(names) -> list:
+    """Categorize a whole catalog column at once, same results as categorize_product"""
+    names = list(names)
+    keys = [normalize_name(name) for name in names]
+    results = [CACHE.get(key) for key in keys]
+
+    # Score each distinct uncached name once
+    pending = {}
+    for i, slug in enumerate(results):
+        if slug is None:
+            pending.setdefault(keys[i], names[i])
+    if pending:
+        for key, slug in zip(pending, RULES.categorize_many(pending.values())):
+            CACHE.put(key, slug)
+            pending[key] = slug
+        results = [slug if slug is not None else pending[key] for key, slug in zip(keys, results)]
+    return results
 
-    return 'UNKNOWN'
 
+class RuleProfile:
+    """Opt-in per-rule counters: how often each rule is tested, matches and costs
+
+    While active it shadows the rule table's scan/resolve methods with
+    instrumented copies and bypasses the category cache; on exit the table
+    is restored, so runs without profiling pay nothing.
+    """
+
+    def __init__(self, table: RuleTable = None):
+        self.table = table or RULES
+        count = len(self.table.rules)
+        self.tested = [0] * count
+        self.matched = [0] * count
+        self.seconds = [0.0] * count
+        self.names = 0
+        self.unknown = 0
+        self.scan_seconds = 0.0
+
+    def __enter__(self):
+        global CACHE
+        self._cache = CACHE
+        CACHE = CategoryCache(self.table.version, maxsize=0)
+        self.table.scan = self._scan
+        self.table.resolve = self._resolve
+        self.table.categorize_many = self._categorize_many
+        return self
+
+    def __exit__(self, *exc):
+        global CACHE
+        CACHE = self._cache
+        for attr in ('scan', 'resolve', 'categorize_many'):
+            delattr(self.table, attr)
+        return False
+
+    def _scan(self, text: str) -> set:
+        start = time.perf_counter()
+        found = RuleTable.scan(self.table, text)
+        self.scan_seconds += time.perf_counter() - start
+        self.names += 1
+        return found
+
+    def _categorize_many(self, names) -> list:
+        names = list(names)
+        start = time.perf_counter()
+        hits = self.table.scan_many(names)
+        self.scan_seconds += time.perf_counter() - start
+        self.names += len(names)
+        return [self._resolve(found) for found in hits]
+
+    def _resolve(self, found: set) -> str:
+        rules, index = self.table.rules, self.table.index
+        candidates = set()
+        for keyword in found:
+            candidates.update(index.get(keyword, ()))
+        for rule_id in sorted(candidates):
+            start = time.perf_counter()
+            accepted = rules[rule_id].accepts(found)
+            self.seconds[rule_id] += time.perf_counter() - start
+            self.tested[rule_id] += 1
+            if accepted:
+                self.matched[rule_id] += 1
+                return rules[rule_id].slug
+        self.unknown += 1
+        return 'UNKNOWN'
 
-def analyze_file(filepath: Path) -> dict:
-    """Analyze a single product file"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    def _label(self, rule_id: int) -> str:
+        rule = self.table.rules[rule_id]
+        note = f"  ({rule.note})" if rule.note else ''
+        return f"#{rule_id:<4}{rule.slug:<13}{note}"
 
-    results = {
-        'brand': data.get('brand_slug', 'unknown'),
-        'total_products': 0,
-        'categories': defaultdict(list)
-    }
+    def report(self, top: int = 15):
+        ids = range(len(self.table.rules))
+        print("\n" + "=" * 80)
+        print("RULE PROFILE")
+        print("=" * 80)
+        print(f"  {self.names} names, {self.unknown} unknown, "
+              f"keyword scan {self.scan_seconds:.3f}s, rules {sum(self.seconds):.3f}s")
+
+        print("\nMost expensive rules (cumulative time):")
+        for i in sorted(ids, key=lambda i: -self.seconds[i])[:top]:
+            if self.tested[i]:
+                print(f"  {self.seconds[i] * 1000:9.2f} ms  {self.tested[i]:>8} tested  {self._label(i)}")
+
+        print("\nHottest rules (matches, hit rate when tested):")
+        for i in sorted(ids, key=lambda i: -self.matched[i])[:top]:
+            if self.matched[i]:
+                rate = 100 * self.matched[i] / self.tested[i]
+                print(f"  {self.matched[i]:>8} matched  {rate:5.1f}%  {self._label(i)}")
+
+        by_slug = defaultdict(lambda: [0, 0, 0.0])
+        for i in ids:
+            totals = by_slug[self.table.rules[i].slug]
+            totals[0] += self.tested[i]
+            totals[1] += self.matched[i]
+            totals[2] += self.seconds[i]
+        print("\nPer target slug (tested / matched / ms):")
+        for slug, (tested, matched, seconds) in sorted(by_slug.items(), key=lambda x: -x[1][1]):
+            print(f"  {slug:<13}{tested:>8}{matched:>8}{seconds * 1000:9.2f}")
+
+        never = [i for i in ids if not self.tested[i]]
+        shadowed = [i for i in ids if self.tested[i] and not self.matched[i]]
+        print(f"\nNever triggered ({len(never)}):")
+        for i in never:
+            print(f"  {self._label(i)}")
+        print(f"\nTriggered but never matched ({len(shadowed)}):")
+        for i in shadowed:
+            print(f"  {self.tested[i]:>8} tested  {self._label(i)}")
+
+
+def print_category_tree_report(suggested: dict):
+    """Suggested products per level-1 and level-2 category, and slugs missing from the tree"""
+    print("\n" + "=" * 80)
+    print("SUGGESTED CATEGORIES BY PARENT")
+    print("=" * 80)
+    for depth in (1, 2):
+        print(f"\n  Level {depth}:")
+        rollup = CATEGORY_TREE.rollup(suggested, depth)
+        nodes = [CATEGORY_TREE.get(slug) for slug in rollup]
+        nodes.sort(key=lambda n: [CATEGORY_TREE.get(a).display_order or 0 for a in n.ancestors])
+        for node in nodes:
+            print(f"  {'  ' * (depth - 1)}{node.slug:<13}{rollup[node.slug]:>8}  {node.name}")
+
+    dangling = CATEGORY_TREE.dangling(suggested)
+    dangling.pop('UNKNOWN', None)
+    if dangling:
+        print(f"\n  Dangling slugs, not in {CATEGORIES_FILE.name} and never applied ({len(dangling)}):")
+        for slug, count in sorted(dangling.items(), key=lambda x: -x[1]):
+            print(f"    {slug:<13}{count:>8}")
+
+
+def write_product_file(filepath: Path, data: dict):
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
 
-    for product in data.get('products', []):
+
+def review_products(products: list, results: dict, apply: bool = False, fuzzy: float = None) -> int:
+    """Record suggested changes for a batch of products, returning how many were modified"""
+    modified = 0
+    names = [p.get('name', '') for p in products]
+    suggestions = categorize_many(names)
+    if fuzzy is not None:
+        suggestions = with_fuzzy(names, suggestions, fuzzy)
+    for product, suggested_cat in zip(products, suggestions):
         name = product.get('name', '')
         current_cat = product.get('category_slug', 'MISSING')
-        suggested_cat = categorize_product(name, current_cat)
         variant_count = len(product.get('variants', [{}]))
 
         results['total_products'] += variant_count
+        results['suggested'][suggested_cat] += variant_count
 
         if current_cat != suggested_cat:
             results['categories'][f"{current_cat} -> {suggested_cat}"].append({
@@ -617,93 +648,316 @@ def analyze_file(filepath: Path) -> dict:
                 'variants': variant_count
             })
 
-    return results
+            if apply and suggested_cat in CATEGORY_TREE:
+                product['category_slug'] = suggested_cat
+                results['fixed'] += variant_count
+                modified += 1
 
+    return modified
+
+
+def analyze_file(filepath: Path, apply: bool = False, stream: bool = False, fuzzy: float = None) -> dict:
+    """Analyze a single product file, optionally applying the fixes in the same pass"""
+    results = {
+        'brand': 'unknown',
+        'total_products': 0,
+        'fixed': 0,
+        'written': False,
+        'categories': defaultdict(list),
+        'suggested': defaultdict(int)
+    }
+
+    def on_member(key, value):
+        if key == 'brand_slug':
+            results['brand'] = value
+
+    if stream:
+        # Item-by-item read; with apply the file is rewritten through a temp file
+        if apply:
+            modified = jsonstream.rewrite_array(filepath, lambda batch: review_products(batch, results, True, fuzzy),
+                                                batch_size=STREAM_BATCH_SIZE, on_member=on_member)
+            results['written'] = modified > 0
+        else:
+            for batch in jsonstream.iter_batches(filepath, STREAM_BATCH_SIZE, on_member=on_member):
+                review_products(batch, results, fuzzy=fuzzy)
+        return results
 
-def fix_file(filepath: Path) -> int:
-    """Fix categories in a single product file"""
     with open(filepath, 'r', encoding='utf-8') as f:
         data = json.load(f)
+    results['brand'] = data.get('brand_slug', 'unknown')
 
-    fixed_count = 0
-    for product in data.get('products', []):
-        name = product.get('name', '')
+    # Only files that actually changed are rewritten
+    if review_products(data.get('products', []), results, apply, fuzzy):
+        write_product_file(filepath, data)
+        results['written'] = True
+
+    return results
+
+
+def fix_products(products: list, fuzzy: float = None) -> tuple:
+    """Apply known suggestions to a batch, returning (modified products, fixed variants)"""
+    modified = fixed_count = 0
+    names = [p.get('name', '') for p in products]
+    suggestions = categorize_many(names)
+    if fuzzy is not None:
+        suggestions = with_fuzzy(names, suggestions, fuzzy)
+    for product, suggested_cat in zip(products, suggestions):
         current_cat = product.get('category_slug', '')
-        suggested_cat = categorize_product(name, current_cat)
 
-        if suggested_cat != 'UNKNOWN' and current_cat != suggested_cat:
+        if suggested_cat in CATEGORY_TREE and current_cat != suggested_cat:
             product['category_slug'] = suggested_cat
             fixed_count += len(product.get('variants', [{}]))
+            modified += 1
 
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    return modified, fixed_count
 
-    return fixed_count
 
+def fix_file(filepath: Path, stream: bool = False, fuzzy: float = None) -> int:
+    """Fix categories in a single product file"""
+    if stream:
+        fixed_count = 0
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python fix-categories.py [analyze|fix]")
-        return
+        def transform(batch):
+            nonlocal fixed_count
+            modified, fixed = fix_products(batch, fuzzy)
+            fixed_count += fixed
+            return modified
 
-    command = sys.argv[1]
+        jsonstream.rewrite_array(filepath, transform, batch_size=STREAM_BATCH_SIZE)
+        return fixed_count
 
-    if command == 'analyze':
-        print("=" * 80)
-        print("PRODUCT CATEGORIZATION ANALYSIS")
-        print("=" * 80)
+    with open(filepath, 'r', encoding='utf-8') as f:
+        data = json.load(f)
 
-        all_changes = defaultdict(int)
-        unknown_products = []
+    modified, fixed_count = fix_products(data.get('products', []), fuzzy)
+    if modified:
+        write_product_file(filepath, data)
 
-        for f in sorted(PRODUCTS_DIR.glob('products-*.json')):
-            results = analyze_file(f)
+    return fixed_count
 
-            has_issues = False
-            for change, products in results['categories'].items():
-                if products:
-                    has_issues = True
-                    count = sum(p['variants'] for p in products)
-                    all_changes[change] += count
 
-                    for p in products:
-                        if 'UNKNOWN' in change:
-                            unknown_products.append(p['name'])
+def _init_worker():
+    CACHE.load(CACHE_FILE)
+    CACHE.drain()
 
-            if has_issues:
-                print(f"\n{f.name} ({results['brand']})")
-                for change, products in results['categories'].items():
-                    if products:
-                        count = sum(p['variants'] for p in products)
-                        print(f"  {change}: {count} products")
-                        for p in products[:2]:
-                            print(f"    - {p['name']}")
 
-        print("\n" + "=" * 80)
-        print("SUMMARY OF CHANGES")
-        print("=" * 80)
-        for change, count in sorted(all_changes.items(), key=lambda x: -x[1]):
-            print(f"  {change}: {count}")
+def _run_worker(task):
+    func, filepath, kwargs = task
+    hits, misses = CACHE.hits, CACHE.misses
+    result = func(filepath, **kwargs)
+    return result, CACHE.drain(), CACHE.hits - hits, CACHE.misses - misses
 
-        print(f"\n\nUNKNOWN PRODUCTS ({len(unknown_products)}):")
-        for p in unknown_products[:20]:
-            print(f"  - {p}")
-        if len(unknown_products) > 20:
-            print(f"  ... and {len(unknown_products) - 20} more")
 
-    elif command == 'fix':
-        print("=" * 80)
-        print("FIXING PRODUCT CATEGORIES")
-        print("=" * 80)
+def process_files(func, files: list, jobs: int = 1, **kwargs):
+    """Yield (file, func(file)) in file order, spreading files over a process pool when jobs > 1"""
+    if jobs <= 1 or len(files) <= 1:
+        for filepath in files:
+            yield filepath, func(filepath, **kwargs)
+        return
+
+    tasks = [(func, filepath, kwargs) for filepath in files]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(files)), initializer=_init_worker) as pool:
+        # map() returns results in submission order, so reports match the serial run
+        for filepath, (result, fresh, hits, misses) in zip(files, pool.map(_run_worker, tasks)):
+            CACHE.merge(fresh, hits, misses)
+            yield filepath, result
+
+
+def process_changed_files(func, files: list, manifest: Manifest, keep, jobs: int = 1,
+                          force: bool = False, **kwargs):
+    """Like process_files, but files unchanged since the last run reuse their recorded result
+
+    keep(result) returns what to store in the manifest for a processed file,
+    or None when the file must be processed again next time.
+    """
+    pending = files if force else [f for f in files if not manifest.is_current(f)]
+    manifest.skipped += len(files) - len(pending)
+    done = dict(process_files(func, pending, jobs, **kwargs))
+    for f in files:
+        if f not in done:
+            yield f, manifest.result(f)
+            continue
+        stored = keep(done[f])
+        if stored is None:
+            manifest.forget(f)
+        else:
+            manifest.record(f, stored)
+        yield f, done[f]
+
+
+def parity_check(files: list) -> tuple:
+    """Compare the rule table against the original if-chain on every product of files
+
+    Returns (checked, known differences, [(file name, name, legacy slug, rule slug)]).
+    """
+    sys.path.insert(0, str(Path(__file__).parent))
+    from legacy_categorize import categorize_product as legacy_categorize_product
+
+    checked = 0
+    mismatches = []
+    known = 0
+    for f in files:
+        raw = f.read_bytes()
+        try:
+            text = raw.decode('utf-8')
+        except UnicodeDecodeError:
+            # Some spreadsheet exports (adris-real-inventory.json) are Latin-1
+            text = raw.decode('latin-1')
+        for product in json.loads(text).get('products', []):
+            name = product.get('name', '')
+            expected = legacy_categorize_product(name)
+            actual = RULES.categorize(name)
+            checked += 1
+            if PARITY_EXCEPTIONS.get(name) == (expected, actual):
+                known += 1
+            elif expected != actual:
+                mismatches.append((f.name, name, expected, actual))
+    return checked, known, mismatches
 
-        total_fixed = 0
-        for f in sorted(PRODUCTS_DIR.glob('products-*.json')):
-            fixed = fix_file(f)
-            if fixed > 0:
-                print(f"  {f.name}: {fixed} products fixed")
-                total_fixed += fixed
 
-        print(f"\nTotal fixed: {total_fixed} products")
+def main():
+    parser = argparse.ArgumentParser(description="Analyze and fix product categories")
+    parser.add_argument('command', choices=['analyze', 'fix', 'parity'])
+    parser.add_argument('--apply', action='store_true',
+                        help="analyze: also apply the fixes in the same pass, writing only changed files")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="process files in N worker processes (0 = one per CPU)")
+    parser.add_argument('--stream', action='store_true',
+                        help="read and write product files item by item to keep memory flat")
+    parser.add_argument('--force', action='store_true',
+                        help="reprocess every file, ignoring the manifest of unchanged files")
+    parser.add_argument('--fuzzy', type=float, metavar='CONFIDENCE',
+                        help="also apply trigram-neighbour suggestions for UNKNOWN products "
+                             "at or above CONFIDENCE (0-1)")
+    parser.add_argument('--profile', action='store_true',
+                        help="report per-rule test/match counts and time (runs serially, bypasses cache)")
+    args = parser.parse_args()
+    if args.fuzzy is not None and not 0 <= args.fuzzy <= 1:
+        parser.error("--fuzzy must be between 0 and 1")
+    jobs = args.jobs or os.cpu_count() or 1
+    if args.profile:
+        # Rule counters live in this process only, and skipped files would go uncounted
+        jobs = 1
+        args.force = True
+    profile = RuleProfile() if args.profile else contextlib.nullcontext()
+
+    command = args.command
+    if command in ('analyze', 'fix'):
+        CACHE.load(CACHE_FILE)
+        files = sorted(PRODUCTS_DIR.glob('products-*.json'))
+        mode = 'analyze-apply' if command == 'analyze' and args.apply else command
+        # Which slugs get applied depends on the category tree as much as on the rules
+        version = f"{RULES.version}.{CATEGORY_TREE.version}.{RESULTS_VERSION}"
+        if args.fuzzy is not None:
+            # Fuzzy results depend on the whole catalog, not just the file itself
+            open_fuzzy_index(files)
+            mode += '-fuzzy'
+            version += f".{fuzzy_index().stamp}.{args.fuzzy}"
+        manifest = Manifest(CACHE_DIR / f"fix-categories-{mode}.manifest.json", version)
+
+    with profile:
+        if command == 'analyze':
+            print("=" * 80)
+            print("PRODUCT CATEGORIZATION ANALYSIS")
+            print("=" * 80)
+
+            all_changes = defaultdict(int)
+            suggested = defaultdict(int)
+            unknown_products = []
+            fixed_files = []
+
+            # A file rewritten by --apply is analyzed again next run to confirm it settled
+            keep = (lambda r: None if r['written'] else r) if args.apply else (lambda r: r)
+            for f, results in process_changed_files(analyze_file, files, manifest, keep, jobs, args.force,
+                                                    apply=args.apply, stream=args.stream, fuzzy=args.fuzzy):
+                if results['fixed']:
+                    fixed_files.append((f.name, results['fixed']))
+                for slug, count in results['suggested'].items():
+                    suggested[slug] += count
+
+                has_issues = False
+                for change, products in results['categories'].items():
+                    if products:
+                        has_issues = True
+                        count = sum(p['variants'] for p in products)
+                        all_changes[change] += count
+
+                        for p in products:
+                            if 'UNKNOWN' in change:
+                                unknown_products.append(p['name'])
+
+                if has_issues:
+                    print(f"\n{f.name} ({results['brand']})")
+                    for change, products in results['categories'].items():
+                        if products:
+                            count = sum(p['variants'] for p in products)
+                            print(f"  {change}: {count} products")
+                            for p in products[:2]:
+                                print(f"    - {p['name']}")
+
+            print("\n" + "=" * 80)
+            print("SUMMARY OF CHANGES")
+            print("=" * 80)
+            for change, count in sorted(all_changes.items(), key=lambda x: -x[1]):
+                print(f"  {change}: {count}")
+
+            print_category_tree_report(suggested)
+
+            print()
+            if unknown_products:
+                open_fuzzy_index(files)
+            guesses = fuzzy_query(unknown_products) if unknown_products else []
+            print(f"\nUNKNOWN PRODUCTS ({len(unknown_products)}), nearest catalog category and confidence:")
+            for p, (slug, confidence) in list(zip(unknown_products, guesses))[:20]:
+                print(f"  - {p:<60}  ~ {slug:<13}{confidence:.2f}")
+            if len(unknown_products) > 20:
+                print(f"  ... and {len(unknown_products) - 20} more")
+
+            if args.apply:
+                print("\n" + "=" * 80)
+                print("APPLIED FIXES")
+                print("=" * 80)
+                for name, fixed in fixed_files:
+                    print(f"  {name}: {fixed} products fixed")
+                total_fixed = sum(fixed for _, fixed in fixed_files)
+                print(f"\nTotal fixed: {total_fixed} products in {len(fixed_files)} files")
+
+        elif command == 'fix':
+            print("=" * 80)
+            print("FIXING PRODUCT CATEGORIES")
+            print("=" * 80)
+
+            total_fixed = 0
+            # After a fix the file has nothing left to fix, so it is recorded with 0
+            for f, fixed in process_changed_files(fix_file, files, manifest, lambda n: 0, jobs, args.force,
+                                                  stream=args.stream, fuzzy=args.fuzzy):
+                if fixed > 0:
+                    print(f"  {f.name}: {fixed} products fixed")
+                    total_fixed += fixed
+
+            print(f"\nTotal fixed: {total_fixed} products")
+
+        elif command == 'parity':
+            print("=" * 80)
+            print("RULE TABLE PARITY CHECK")
+            print("=" * 80)
+
+            checked, known, mismatches = parity_check(sorted(PRODUCTS_DIR.glob('*.json')))
+            for filename, name, expected, actual in mismatches:
+                print(f"  {filename}: {name[:60]}")
+                print(f"    legacy={expected} rules={actual}")
+            print(f"\nChecked {checked} products, {len(mismatches)} mismatches, {known} known differences")
+            if mismatches:
+                sys.exit(1)
+
+    if args.profile:
+        profile.report()
+
+    if command in ('analyze', 'fix'):
+        CACHE.save(CACHE_FILE)
+        manifest.save()
+        print(f"\nCategory cache: {CACHE.stats()}")
+        print(f"Manifest: {manifest.skipped} unchanged files skipped (--force to reprocess)")
 
 
 if __name__ == '__main__':
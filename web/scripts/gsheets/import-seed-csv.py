@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Import a multi-sheet inventory CSV into the store seed files.
+
+Reads seed-data-paraguay.csv, or a larger export of the same template, in
+one pass instead of copying each "# HOJA:" section into Google Sheets by hand:
+  - Productos rows become master products, categorized by the rules of
+    fix-categories.py or else by their sheet category, streamed into one
+    products-<source>-<brand>.json per brand. Rows with no category in the
+    tree or whose SKU is already taken are skipped and reported
+  - Brands are matched to brands.json by name, ignoring case, accents and
+    punctuation; brands it lacks are appended to it and reported
+  - A product listed in Mis Productos takes its sale price as base_price and
+    its "Requiere Receta" flag as requires_prescription. That sheet comes
+    after the products, so a first pass collects it into a temporary SQLite
+    database
+  - Mis Productos rows become tenant-products/<tenant>.json when --tenant is given
+  - Categorías, Proveedores, Marcas and Configuración rows resolve the codes
+    the product rows use and are counted
+
+Usage:
+  python import-seed-csv.py --dry-run
+  python import-seed-csv.py --tenant demo
+  python import-seed-csv.py export.csv --output-dir /tmp/store --tenant demo
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import re
+import sqlite3
+import sys
+import unicodedata
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from seedlib import jsonstream, sheetcsv  # noqa: E402
+from seedlib.skuindex import SkuIndex  # noqa: E402
+
+# Fix encoding for Windows
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+DEFAULT_CSV = Path(__file__).parent / "seed-data-paraguay.csv"
+DATA_DIR = Path(__file__).parent.parent.parent / "db" / "seeds" / "data" / "03-store"
+BRANDS_FILE = DATA_DIR / "brands.json"
+PRODUCT_SCHEMA = "../../../schemas/store.schema.json"
+TENANT_SCHEMA = "../../_schemas/store.schema.json#/definitions/TenantProductsFile"
+SKU_INDEX_FILE = Path(__file__).parent.parent / ".cache" / "import-seed-csv.sku-index.sqlite"
+# Output files kept open at once; the rest are suspended until their next row
+MAX_OPEN_FILES = 64
+REPORT_LIMIT = 20
+
+# Sheet category codes (Categorías tab) -> category tree slugs, for products the
+# rules leave UNKNOWN. A (dog, cat) pair is picked by the product's species.
+SHEET_CATEGORIES = {
+    'ALI': 'NUT',
+    'ALI-PER': 'NUT-CAN', 'ALI-PER-CAC': 'NUT-CAN-SEC', 'ALI-PER-ADU': 'NUT-CAN-SEC',
+    'ALI-PER-SEN': 'NUT-CAN-SEC', 'ALI-PER-RAZ': 'NUT-CAN-SEC',
+    'ALI-GAT': 'NUT-FEL', 'ALI-GAT-KIT': 'NUT-FEL-SEC', 'ALI-GAT-ADU': 'NUT-FEL-SEC', 'ALI-GAT-EST': 'NUT-FEL-SEC',
+    'ALI-TER': ('NUT-CAN-PRE', 'NUT-FEL-PRE'),
+    'MED': 'CLI-FAR',
+    'MED-ANT': 'CLI-FAR-ANB', 'MED-COR': 'CLI-FAR-AIN', 'MED-ANA': 'CLI-FAR-AIN', 'MED-DER': 'FAR-DER-TOP',
+    'MED-OFT': 'FAR-DER-OTI', 'MED-GAS': 'FAR-SUP-DIG', 'MED-CAR': 'CLI-FAR', 'MED-SUE': 'CLI-FAR-FLU',
+    'ANT': 'FAR-ANT', 'ANT-EXT': 'FAR-ANT-EXT', 'ANT-INT': 'FAR-ANT-INT', 'ANT-COM': 'FAR-ANT',
+    'VAC': 'CLI-FAR-VAC', 'VAC-CAN': 'CLI-FAR-VAC', 'VAC-FEL': 'CLI-FAR-VAC', 'VAC-ANT': 'CLI-FAR-VAC',
+    'INS': 'CLI-INS', 'INS-JER': 'CLI-INS-AGU', 'INS-GUA': 'CLI-INS-EPP', 'INS-GAS': 'CLI-INS-VEN',
+    'INS-CAT': 'CLI-INS', 'INS-SUT': 'CLI-INS-QUI', 'INS-DES': 'CLI-INS',
+    'ACC': 'ACC', 'ACC-COL': 'ACC-PAS-COL', 'ACC-CAM': 'ACC-DES-CAM', 'ACC-JUG': 'ACC-JUG',
+    'ACC-TRA': 'ACC-PAS-TRA', 'ACC-COM': 'ACC-COM',
+    'HIG': 'ACC-HIG', 'HIG-SHA': 'ACC-HIG-SHA', 'HIG-CEP': 'ACC-HIG-CEP', 'HIG-LIM': 'ACC-HIG-OJO',
+    'HIG-DEN': 'ACC-HIG-DEN',
+}
+
+
+def load_categorizer():
+    """fix-categories.py as a module; its file name is not importable"""
+    path = Path(__file__).parent / "fix-categories.py"
+    spec = importlib.util.spec_from_file_location("fix_categories", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def fold(text: str) -> str:
+    return ''.join(ch for ch in unicodedata.normalize('NFKD', text) if not unicodedata.combining(ch))
+
+
+def slugify(text: str) -> str:
+    return '-'.join(re.findall(r'[a-z0-9]+', fold(text).lower()))
+
+
+def brand_key(name: str) -> str:
+    """"Hill's Science Diet", 'Hills Science Diet' and 'hills-science-diet' -> 'hillssciencediet'"""
+    return ''.join(re.findall(r'[a-z0-9]+', fold(name).lower()))
+
+
+def append_brands(source: Path, path: Path, brands: list):
+    """Write source's brands.json to path with brands added to the end of its array
+
+    The existing entries keep their formatting, so the diff only shows the new brands.
+    """
+    text = source.read_text(encoding='utf-8')
+    head, bracket, tail = text.rpartition(']')
+    entries = [json.dumps(brand, ensure_ascii=False, indent=2).replace('\n', '\n    ') for brand in brands]
+    head = head.rstrip()
+    separator = '\n    ' if head.endswith('[') else ',\n    '
+    text = head + separator + ',\n    '.join(entries) + '\n  ' + bracket + tail
+    if json.loads(text).get('brands', [])[-len(brands):] != brands:
+        raise ValueError(f"{source}: the brands array is not the file's last member")
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(text, encoding='utf-8')
+    os.replace(tmp, path)
+
+
+def make_sku(brand: str, name: str) -> str:
+    """Brand initials plus the name, e.g. RC-ROYAL-CANIN-MINI-ADULT-7-5KG"""
+    words = re.findall(r'[A-Z]+', fold(brand).upper())
+    prefix = ''.join(word[0] for word in words)
+    if len(prefix) < 2:
+        prefix = ''.join(words)[:3] or 'GEN'
+    return f"{prefix[:5]}-{'-'.join(re.findall(r'[A-Z0-9]+', fold(name).upper()))}"
+
+
+class CodeTable:
+    """Resolves the auto-generated codes of a reference sheet (RO-001, CAL-001)
+
+    A code is the first letters of the name and the row number. Some rows
+    carry a stale number, so a letter prefix shared by exactly one name
+    resolves too.
+    """
+
+    def __init__(self, letters: int):
+        self.letters = letters
+        self.by_code = {}
+        self.by_prefix = defaultdict(list)
+        self.count = 0
+
+    def add(self, name: str):
+        self.count += 1
+        prefix = re.sub(r'[^A-Z0-9]', '', fold(name).upper())[:self.letters]
+        self.by_code[f"{prefix}-{self.count:03d}"] = name
+        self.by_prefix[prefix].append(name)
+
+    def get(self, code: str):
+        if not code:
+            return None
+        if code in self.by_code:
+            return self.by_code[code]
+        names = self.by_prefix.get(code.split('-', 1)[0], [])
+        return names[0] if len(names) == 1 else None
+
+
+class ClinicSheet:
+    """Mis Productos (sale_price, requires_prescription) by product name, read in a first pass
+
+    Rows go to a temporary on-disk SQLite database, not to memory.
+    """
+
+    def __init__(self, path: Path):
+        self.db = sqlite3.connect('')
+        self.db.execute('CREATE TABLE clinic (product TEXT PRIMARY KEY, sale_price INTEGER, rx INTEGER)')
+        rows = ((r['product'], r['sale_price'], r['requires_prescription'])
+                for sheet, _, r in sheetcsv.iter_records(path) if sheet == 'Mis Productos')
+        with self.db:
+            self.db.executemany('INSERT OR REPLACE INTO clinic VALUES (?, ?, ?)', rows)
+
+    def get(self, name: str):
+        row = self.db.execute('SELECT sale_price, rx FROM clinic WHERE product = ?', (name,)).fetchone()
+        return (row[0], bool(row[1])) if row else None
+
+    def close(self):
+        self.db.close()
+
+
+class Importer:
+    """Routes the records of one export to streaming product and tenant files
+
+    index is a SkuIndex over the rest of the catalog. Every product written is
+    staged in it, so SKU collisions within the export and with other files
+    are one indexed query, and Mis Productos rows find their SKU there.
+    clinic(name) gives the Mis Productos (sale_price, requires_prescription)
+    of a product, or None when the clinic does not list it. Only counts and
+    the first REPORT_LIMIT skipped rows are kept in memory.
+    """
+
+    def __init__(self, fc, source: str, output_dir: Path, index: SkuIndex, tenant: str = None,
+                 dry_run: bool = False, clinic=None):
+        self.fc = fc
+        self.source = source
+        self.output_dir = output_dir
+        self.index = index
+        self.tenant = tenant
+        self.dry_run = dry_run
+        self.clinic = clinic or (lambda name: None)
+        self.brands = CodeTable(2)
+        self.suppliers = CodeTable(3)
+        self.countries = {}  # brand_key -> country from the Marcas sheet
+        self.brands_file = output_dir / 'brands.json'
+        if not self.brands_file.exists():
+            self.brands_file = BRANDS_FILE
+        with open(self.brands_file, 'r', encoding='utf-8') as f:
+            known = json.load(f).get('brands', [])
+        # Slugs count as names too: 'Boehringer Ingelheim' is boehringer-ingelheim
+        self.brand_slugs = {brand_key(b[field]): b['slug'] for field in ('slug', 'name') for b in known}
+        self.new_brands = []
+
+        self.files = {}
+        self.open = OrderedDict()  # files with an open handle, least recently written first
+        self.rows = defaultdict(int)
+        self.per_brand = defaultdict(int)
+        self.by_sheet = 0
+        self.priced = 0
+        self.skipped = 0
+        self.skip_reasons = []  # (name, reason) of the first REPORT_LIMIT skipped products
+        self.unresolved = 0
+        self.unresolved_names = []
+
+    def _file(self, key, path: Path, members: dict):
+        if key not in self.files:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.files[key] = jsonstream.AtomicArrayFile(path, members)
+        self.open[key] = self.files[key]
+        self.open.move_to_end(key)
+        if len(self.open) > MAX_OPEN_FILES:
+            self.open.popitem(last=False)[1].suspend()
+        return self.files[key]
+
+    def add(self, sheet: str, record):
+        self.rows[sheet] += 1
+        if sheet == 'Marcas':
+            self.brands.add(record['name'])
+            if record['country']:
+                self.countries[brand_key(record['name'])] = record['country']
+        elif sheet == 'Proveedores':
+            self.suppliers.add(record['name'])
+        elif sheet == 'Productos':
+            self.add_product(record)
+        elif sheet == 'Mis Productos':
+            self.add_assignment(record)
+
+    def brand_slug(self, brand: str) -> str:
+        """Slug of the brands.json entry named brand, adding an entry when there is none"""
+        key = brand_key(brand)
+        slug = self.brand_slugs.get(key)
+        if slug is None:
+            slug = self.brand_slugs[key] = slugify(brand)
+            entry = {'slug': slug, 'name': brand}
+            if key in self.countries:
+                entry['country_origin'] = self.countries[key]
+            self.new_brands.append(entry)
+        return slug
+
+    def _skip(self, name: str, reason: str):
+        self.skipped += 1
+        if len(self.skip_reasons) < REPORT_LIMIT:
+            self.skip_reasons.append((name, reason))
+
+    def category(self, row: dict, species: list) -> str:
+        """Slug from the rules, else from the row's sheet category; None if neither is in the tree"""
+        fc = self.fc
+        slug = fc.categorize_product(row['name'])
+        if slug in fc.CATEGORY_TREE:
+            return slug
+        slug = SHEET_CATEGORIES.get(row['category'])
+        if isinstance(slug, tuple):
+            slug = slug[1] if species == ['cat'] else slug[0]
+        if slug in fc.CATEGORY_TREE:
+            self.by_sheet += 1
+            return slug
+        return None
+
+    def add_product(self, row: dict):
+        fc = self.fc
+        brand = self.brands.get(row['brand']) or row['brand']
+        brand_slug = self.brand_slug(brand)
+        name = row['name']
+        sku = make_sku(brand, name)
+
+        # Descriptions name the species ('perros adultos') far more often than product names
+        found = fc.RULES.scan(fc.normalize_name(f"{name} {row['description'] or ''}"))
+        species = [species for flag, species in (('@dog', 'dog'), ('@cat', 'cat')) if flag in found]
+        slug = self.category(row, species)
+        if slug is None:
+            self._skip(name, f"no category in the tree for {row['category']!r}")
+            return
+        taken = self.index.lookup(sku)
+        if taken:
+            used_by = f"{Path(taken[0]['file']).name}#{taken[0]['position']}"
+            self._skip(name, f"SKU {sku} already used by {used_by}")
+            return
+        path = self.output_dir / 'products' / f"products-{self.source}-{brand_slug}.json"
+        self.index.stage(sku, name, path, self.per_brand[brand_slug])
+        self.per_brand[brand_slug] += 1
+
+        # Productos only has supplier prices: the retail price and the prescription
+        # flag are known only for products the clinic lists in Mis Productos
+        unit_cost = round(row['purchase_price'] / max(row['units_per_purchase'], 1))
+        clinic = self.clinic(name)
+        product = {'sku': sku, 'name': name, 'description': row['description'] or '', 'category_slug': slug}
+        if species:
+            product['target_species'] = species
+        variant = {'size': row['sale_unit']}
+        if clinic:
+            variant['base_price'], product['requires_prescription'] = clinic
+            self.priced += 1
+        variant['cost_price'] = unit_cost
+        variant['sku_suffix'] = ''
+        product['variants'] = [variant]
+        product['attributes'] = {
+            'sheet_category': row['category'],
+            'purchase_unit': row['purchase_unit'],
+            'units_per_purchase': row['units_per_purchase'],
+            'supplier': self.suppliers.get(row['supplier']) or row['supplier'],
+        }
+        product['is_active'] = row['active']
+
+        if not self.dry_run:
+            self._file(brand_slug, path, {'$schema': PRODUCT_SCHEMA, 'brand_slug': brand_slug}).write(product)
+
+    def add_assignment(self, row: dict):
+        if not self.tenant:
+            return
+        sku = self.index.staged_sku(row['product'])
+        if sku is None:
+            self.unresolved += 1
+            if len(self.unresolved_names) < REPORT_LIMIT:
+                self.unresolved_names.append(row['product'])
+            return
+        assignment = {'sku': sku, 'sale_price': row['sale_price'], 'min_stock_level': row['min_stock']}
+        if row['location']:
+            assignment['location'] = row['location']
+        assignment['initial_stock'] = row['initial_stock']
+        assignment['is_active'] = row['active']
+
+        if not self.dry_run:
+            path = self.output_dir / 'tenant-products' / f"{self.tenant}.json"
+            members = {'$schema': TENANT_SCHEMA, 'tenant_id': self.tenant,
+                       'description': f"Imported from {self.source}.csv"}
+            self._file(None, path, members).write(assignment)
+        self.rows['assigned'] += 1
+
+    def commit(self) -> list:
+        written = []
+        if self.new_brands and not self.dry_run:
+            path = self.output_dir / 'brands.json'
+            append_brands(self.brands_file, path, self.new_brands)
+            written.append((path, len(self.new_brands)))
+        for f in self.files.values():
+            f.commit()
+            written.append((f.path, f.items))
+        return written
+
+    def discard(self):
+        for f in self.files.values():
+            f.discard()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a multi-sheet inventory CSV into the store seed files")
+    parser.add_argument('csv', nargs='?', type=Path, default=DEFAULT_CSV, help="CSV export of the template")
+    parser.add_argument('--output-dir', type=Path, default=DATA_DIR,
+                        help="store data directory receiving products/ and tenant-products/")
+    parser.add_argument('--tenant', help="write Mis Productos rows to tenant-products/<TENANT>.json")
+    parser.add_argument('--force', action='store_true', help="replace an existing tenant file")
+    parser.add_argument('--dry-run', action='store_true', help="parse and report without writing anything")
+    args = parser.parse_args()
+
+    if args.tenant and not args.dry_run and not args.force:
+        existing = args.output_dir / 'tenant-products' / f"{args.tenant}.json"
+        if existing.exists():
+            parser.error(f"{existing} exists; pass --force to replace it")
+
+    print("=" * 80)
+    print(f"IMPORTING {args.csv.name}")
+    print("=" * 80)
+
+    source = slugify(args.csv.stem)
+    # SKUs of the rest of the catalog; this export's own files are about to be replaced
+    existing = [f for f in sorted((args.output_dir / 'products').glob('*.json'))
+                if not f.name.startswith(f"products-{source}-")]
+    with SkuIndex(SKU_INDEX_FILE) as index:
+        index.update(existing, [])
+        try:
+            clinic = ClinicSheet(args.csv)
+        except ValueError as e:
+            sys.exit(f"Error: {e}")
+        importer = Importer(load_categorizer(), source, args.output_dir, index, args.tenant, args.dry_run,
+                            clinic.get)
+        try:
+            for sheet, _, record in sheetcsv.iter_records(args.csv):
+                importer.add(sheet, record)
+        except ValueError as e:
+            importer.discard()
+            sys.exit(f"Error: {e}")
+        except BaseException:
+            importer.discard()
+            raise
+        finally:
+            clinic.close()
+    written = importer.commit()
+
+    print("\nRows per sheet:")
+    for sheet, count in importer.rows.items():
+        if sheet != 'assigned':
+            note = '' if sheet in sheetcsv.SHEETS else '  (no column spec, skipped)'
+            print(f"  {sheet:<20}{count:>8}{note}")
+
+    print(f"\nProducts per brand ({len(importer.per_brand)} brands):")
+    for brand, count in sorted(importer.per_brand.items(), key=lambda x: -x[1]):
+        print(f"  {brand:<28}{count:>6}")
+
+    if importer.new_brands:
+        action = 'would be added' if args.dry_run else 'added'
+        print(f"\nBrands not in {importer.brands_file.name}, {action} ({len(importer.new_brands)}):")
+        for brand in importer.new_brands:
+            print(f"  - {brand['slug']}: {brand['name']}")
+
+    print(f"\nCategorized by their sheet category, not by the rules: {importer.by_sheet}")
+    print(f"Priced from Mis Productos: {importer.priced} (the rest have no base_price)")
+    print(f"\nSkipped products ({importer.skipped}):")
+    for name, reason in importer.skip_reasons:
+        print(f"  - {name}: {reason}")
+    if importer.skipped > REPORT_LIMIT:
+        print(f"  ... and {importer.skipped - REPORT_LIMIT} more")
+
+    if args.tenant:
+        print(f"\nTenant {args.tenant}: {importer.rows['assigned']} products assigned, "
+              f"{importer.unresolved} not in the catalog")
+        for name in importer.unresolved_names:
+            print(f"  - {name}")
+    elif importer.rows['Mis Productos']:
+        print(f"\n{importer.rows['Mis Productos']} Mis Productos rows skipped (--tenant to import them)")
+
+    if args.dry_run:
+        print("\nDry run: nothing written")
+    else:
+        print(f"\nWrote {len(written)} files:")
+        for path, count in written:
+            print(f"  {path.name}: {count} {'brands added' if path.name == 'brands.json' else 'products'}")
+
+
+if __name__ == '__main__':
+    main()
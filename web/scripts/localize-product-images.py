@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Localize product images into a content-addressed store.
+
+Fetches every image_url and images[] entry of the product seed files from
+a local mirror directory, a mirror/stub server or the original hosts.
+Responses that are not images (wrong Content-Type, or bytes no image
+signature matches) count as failed fetches and keep their remote URL. Each
+image is stored once by content hash and gets resized variants, built in a
+process pool. The JSON is then rewritten to point at the local hashed
+paths, so the storefront serves small cacheable assets instead of
+hot-linking third-party originals.
+
+Usage:
+  python localize-product-images.py --source ~/mirror          # <host>/<path> layout (wget -x)
+  python localize-product-images.py --source http://127.0.0.1:8000
+  python localize-product-images.py --dry-run
+"""
+
+import argparse
+import http.client
+import json
+import os
+import sys
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from seedlib import jsonstream  # noqa: E402
+from seedlib.imagestore import VARIANT_WIDTHS, Image, ImageStore, make_variants  # noqa: E402
+
+PRODUCTS_DIR = Path(__file__).parent.parent / 'db' / 'seeds' / 'data' / '03-store' / 'products'
+STORE_DIR = Path(__file__).parent.parent / 'public' / 'images' / 'products'
+STORE_URL = '/images/products'
+CARD_WIDTH = 480  # image_url is what the storefront grid shows
+FETCH_TIMEOUT = 30
+USER_AGENT = 'vete-seed-tools/1.0'
+
+
+def product_urls(product: dict):
+    """Remote image URLs referenced by a product"""
+    urls = [product.get('image_url')] + list(product.get('images') or [])
+    return [u for u in urls if isinstance(u, str) and u.startswith(('http://', 'https://'))]
+
+
+def fetch(url: str, source: str = None) -> bytes:
+    """Image bytes for url, read from a <host>/<path> mirror if source is given
+
+    Raises ValueError when the server says the response is not an image.
+    """
+    parts = urlsplit(url)
+    if source and not source.startswith(('http://', 'https://')):
+        return (Path(source) / parts.netloc / unquote(parts.path.lstrip('/'))).read_bytes()
+    if source:
+        url = f"{source.rstrip('/')}/{parts.netloc}{parts.path}"
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+        content_type = response.headers.get_content_type()
+        if response.headers.get('Content-Type') and not content_type.startswith('image/'):
+            raise ValueError(f"not an image: {content_type}")
+        return response.read()
+
+
+def fetch_all(urls: list, store: ImageStore, source: str = None, fetchers: int = 16) -> list:
+    """Fetch urls concurrently into store, returning [(url, error)] for those that failed"""
+    failed = []
+    with ThreadPoolExecutor(max_workers=fetchers) as pool:
+        futures = {pool.submit(fetch, url, source): url for url in urls}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                store.add(url, future.result())
+            except (OSError, ValueError, http.client.HTTPException) as e:
+                # HTTPException covers truncated bodies (IncompleteRead), which are not OSErrors
+                failed.append((url, e))
+    return failed
+
+
+def localize_products(products: list, store: ImageStore) -> int:
+    """Point stored URLs at their local copies, returning how many products changed."""
+
+    changed = 0
+    for product in products:
+        before = (product.get('image_url'), product.get('images'))
+        url = product.get('image_url')
+        if isinstance(url, str):
+            product['image_url'] = store.local_url(url, CARD_WIDTH) or url
+        if isinstance(product.get('images'), list):
+            product['images'] = [store.local_url(u) or u if isinstance(u, str) else u
+                                 for u in product['images']]
+        if (product.get('image_url'), product.get('images')) != before:
+            changed += 1
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy product images into a local content-addressed store")
+    parser.add_argument('--source', help="mirror directory or base URL laid out as <host>/<path> "
+                                         "(default: fetch from the original hosts)")
+    parser.add_argument('--store', type=Path, default=STORE_DIR, help="store directory")
+    parser.add_argument('--url-prefix', default=STORE_URL, help="URL the store directory is served at")
+    parser.add_argument('--fetchers', type=int, default=16, help="concurrent downloads")
+    parser.add_argument('--jobs', type=int, default=0,
+                        help="processes building resized variants (0 = one per CPU)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="report what would be fetched and rewritten without writing anything")
+    args = parser.parse_args()
+
+    store = ImageStore(args.store, args.url_prefix)
+    files = sorted(PRODUCTS_DIR.glob('products-*.json'))
+
+    print("=" * 50)
+    print("Collecting Image URLs")
+    print("=" * 50)
+
+    urls = set()
+    for f in files:
+        with open(f, 'r', encoding='utf-8') as fh:
+            for product in json.load(fh).get('products', []):
+                urls.update(product_urls(product))
+    pending = sorted(u for u in urls if not store.get(u))
+    print(f"{len(urls)} image URLs, {len(urls) - len(pending)} already stored, {len(pending)} to fetch")
+
+    if args.dry_run:
+        return
+
+    print("\n" + "=" * 50)
+    print("Fetching Images")
+    print("=" * 50)
+
+    failed = fetch_all(pending, store, args.source, args.fetchers)
+    print(f"Stored {store.added} new images, {store.deduped} duplicates of stored images")
+    for url, e in failed[:20]:
+        print(f"  failed: {url} ({e})")
+    if len(failed) > 20:
+        print(f"  ... and {len(failed) - 20} more")
+
+    print("\n" + "=" * 50)
+    print("Building Variants")
+    print("=" * 50)
+
+    digests = {entry['digest']: entry['ext'] for entry in store.sources.values()}
+    todo = [d for d in sorted(digests) if d not in store.variants]
+    if Image is None:
+        print("Pillow is not installed: storing originals only (pip install Pillow for variants)")
+    elif todo:
+        jobs = args.jobs or os.cpu_count() or 1
+        paths = [str(store.path(d, digests[d])) for d in todo]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for digest, widths in zip(todo, pool.map(make_variants, paths, chunksize=8)):
+                store.variants[digest] = widths
+        store.dirty = True
+        print(f"Built variants for {len(todo)} images ({', '.join(map(str, VARIANT_WIDTHS))}px)")
+    else:
+        print("All variants up to date")
+    store.save()
+
+    print("\n" + "=" * 50)
+    print("Rewriting Product Files")
+    print("=" * 50)
+
+    total = 0
+    for f in files:
+        with open(f, 'r', encoding='utf-8') as fh:
+            data = json.load(fh)
+        changed = localize_products(data.get('products', []), store)
+        if changed:
+            jsonstream.dump_atomic(f, data, trailing_newline=True)
+            print(f"  {f.name}: {changed} products")
+            total += changed
+
+    print(f"\nDone! {total} products now use local images, {len(failed)} URLs could not be fetched")
+
+
+if __name__ == '__main__':
+    main()
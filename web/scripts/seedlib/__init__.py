@@ -0,0 +1,3 @@
+"""
+Shared helpers for the Python seed-data tools in web/scripts
+"""
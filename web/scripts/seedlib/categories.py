@@ -0,0 +1,100 @@
+"""
+Flattened index of the store category tree
+
+categories.json nests categories through "subcategories". CategoryIndex
+walks the tree once into slug -> node with the parent chain, depth and
+display_order precomputed, so validating a slug or finding its level-1 or
+level-2 parent is a dict lookup and roll-ups never re-walk the tree. load()
+keeps one index per file for the whole run and rebuilds it only when the
+file changes.
+"""
+
+import hashlib
+import json
+import os
+from collections import defaultdict
+from pathlib import Path
+
+
+class CategoryNode:
+    __slots__ = ('slug', 'name', 'depth', 'display_order', 'parent', 'ancestors', 'item')
+
+    def __init__(self, item: dict, depth: int, parent: 'CategoryNode' = None):
+        self.slug = item['slug']
+        self.name = item.get('name', '')
+        self.depth = depth
+        self.display_order = item.get('display_order')
+        self.parent = parent.slug if parent else None
+        # Slugs from the level-1 root down to this node itself
+        self.ancestors = (parent.ancestors if parent else ()) + (self.slug,)
+        self.item = item
+
+    def ancestor(self, depth: int):
+        """Slug of the ancestor at depth (1 = root), or None below this node's depth"""
+        return self.ancestors[depth - 1] if depth <= self.depth else None
+
+
+class CategoryIndex:
+    """slug -> CategoryNode for a list of top-level categories, in tree order"""
+
+    def __init__(self, categories: list):
+        self.nodes = {}
+        # Content hash of the file the tree came from, for caches of results that depend on it
+        self.version = None
+        stack = [(item, 1, None) for item in reversed(categories)]
+        while stack:
+            item, depth, parent = stack.pop()
+            node = CategoryNode(item, depth, parent)
+            if node.slug in self.nodes:
+                raise ValueError(f"Duplicate category slug {node.slug!r}")
+            self.nodes[node.slug] = node
+            stack.extend((child, depth + 1, node) for child in reversed(item.get('subcategories') or []))
+
+    @classmethod
+    def from_file(cls, path: Path) -> 'CategoryIndex':
+        with open(path, 'rb') as f:
+            raw = f.read()
+        index = cls(json.loads(raw).get('categories', []))
+        index.version = hashlib.sha256(raw).hexdigest()[:16]
+        return index
+
+    def __contains__(self, slug) -> bool:
+        return slug in self.nodes
+
+    def __iter__(self):
+        return iter(self.nodes.values())
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def get(self, slug: str):
+        return self.nodes.get(slug)
+
+    def dangling(self, counts: dict) -> dict:
+        """The entries of a slug -> count mapping whose slug is not in the tree"""
+        return {slug: n for slug, n in counts.items() if slug not in self.nodes}
+
+    def rollup(self, counts: dict, depth: int) -> dict:
+        """Sum slug -> count per ancestor at depth; dangling and shallower slugs are left out"""
+        totals = defaultdict(int)
+        for slug, n in counts.items():
+            node = self.nodes.get(slug)
+            if node and node.depth >= depth:
+                totals[node.ancestors[depth - 1]] += n
+        return dict(totals)
+
+
+_loaded = {}
+
+
+def load(path: Path) -> CategoryIndex:
+    """Index for a categories.json, shared by every caller until the file changes"""
+    path = Path(path).resolve()
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _loaded.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    index = CategoryIndex.from_file(path)
+    _loaded[path] = (stamp, index)
+    return index
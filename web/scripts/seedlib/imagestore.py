@@ -0,0 +1,173 @@
+"""
+Content-addressed image store
+
+Each image is stored once as <root>/<aa>/<sha256>.<ext>, however many
+products or brands reference it. Resized variants are written next to it as
+<sha256>-<width>.webp. sources.json maps every source URL to its digest, so
+reruns never refetch. Resizing needs Pillow; without it only originals are
+stored.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+try:
+    from PIL import Image
+except ImportError:  # variants are skipped
+    Image = None
+
+VARIANT_WIDTHS = (200, 480)
+
+_MAGIC = [
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+]
+
+
+def sniff_extension(data: bytes) -> str:
+    """File extension from the image's magic bytes
+
+    Raises ValueError for anything else, such as the HTML error page a
+    host serves with status 200 for a URL ending in .jpg.
+    """
+    for magic, ext in _MAGIC:
+        if data.startswith(magic):
+            return ext
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'webp'
+    head = data.lstrip()[:1024]
+    if head.startswith(b'<svg'):
+        return 'svg'
+    if head.startswith((b'<?xml', b'<!--', b'<!DOCTYPE svg')) and b'<svg' in head:
+        return 'svg'
+    raise ValueError(f"not an image: {data[:16]!r}")
+
+
+def _write_atomic(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def make_variants(path: str, widths=VARIANT_WIDTHS) -> list:
+    """Write <digest>-<width>.webp next to path for each width below the original's
+
+    Runs in worker processes, so it takes and returns plain values. Returns
+    the widths that exist afterwards; an empty list without Pillow or for
+    formats Pillow cannot read (SVG).
+    """
+    if Image is None:
+        return []
+    path = Path(path)
+    done = []
+    try:
+        with Image.open(path) as img:
+            for width in sorted(widths):
+                if width >= img.width:
+                    break
+                target = path.with_name(f"{path.stem}-{width}.webp")
+                if not target.exists():
+                    height = max(1, round(img.height * width / img.width))
+                    resized = img.convert('RGBA' if 'A' in img.getbands() else 'RGB')
+                    resized = resized.resize((width, height), Image.LANCZOS)
+                    tmp = target.with_name(f".{target.name}.tmp")
+                    resized.save(tmp, 'WEBP', quality=80)
+                    os.replace(tmp, target)
+                done.append(width)
+    except OSError:
+        return []
+    return done
+
+
+class ImageStore:
+    """Content-addressed originals and variants under root, served at url_prefix"""
+
+    def __init__(self, root: Path, url_prefix: str):
+        self.root = Path(root)
+        self.url_prefix = url_prefix.rstrip('/')
+        self.index_file = self.root / 'sources.json'
+        self.sources = {}
+        self.variants = {}
+        self.added = 0
+        self.deduped = 0
+        self.dirty = False
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            self.sources = index.get('sources', {})
+            self.variants = index.get('variants', {})
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def relpath(digest: str, ext: str, width: int = None) -> str:
+        if width:
+            return f"{digest[:2]}/{digest}-{width}.webp"
+        return f"{digest[:2]}/{digest}.{ext}"
+
+    def path(self, digest: str, ext: str, width: int = None) -> Path:
+        return self.root / self.relpath(digest, ext, width)
+
+    def url(self, digest: str, ext: str, width: int = None) -> str:
+        return f"{self.url_prefix}/{self.relpath(digest, ext, width)}"
+
+    def get(self, source_url: str):
+        """(digest, ext) stored for source_url, or None"""
+        entry = self.sources.get(source_url)
+        if entry and self.path(entry['digest'], entry['ext']).exists():
+            return entry['digest'], entry['ext']
+        return None
+
+    def add(self, source_url: str, data: bytes):
+        """Store data fetched from source_url unless identical bytes are already stored
+
+        Raises ValueError, storing nothing, when data is not an image.
+        """
+        ext = sniff_extension(data)
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest, ext)
+        if path.exists():
+            self.deduped += 1
+        else:
+            _write_atomic(path, data)
+            self.added += 1
+        self.sources[source_url] = {'digest': digest, 'ext': ext}
+        self.dirty = True
+        return digest, ext
+
+    def local_url(self, source_url: str, width: int = None):
+        """Local URL for source_url: its width variant if there is one, else the original
+
+        Variants are only made below the original's width, so a missing
+        variant means the original is already small enough.
+        """
+        stored = self.get(source_url)
+        if not stored:
+            return None
+        digest, ext = stored
+        if width and width in self.variants.get(digest, []):
+            return self.url(digest, ext, width)
+        return self.url(digest, ext)
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_file.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'sources': self.sources, 'variants': self.variants}, f,
+                      indent=2, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp, self.index_file)
+        self.dirty = False
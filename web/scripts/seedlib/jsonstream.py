@@ -0,0 +1,285 @@
+"""
+Streaming JSON for large seed files
+
+Reads a top-level JSON object member by member, yielding the items of one
+array member (normally "products") one at a time, and writes the same
+layout json.dump(data, indent=2, ensure_ascii=False) produces. Peak memory
+is bounded by the largest single item, not by the file size.
+"""
+
+import json
+import os
+import stat
+import tempfile
+from pathlib import Path
+
+CHUNK_SIZE = 1 << 16
+INDENT = 2
+
+_WHITESPACE = ' \t\n\r'
+_decoder = json.JSONDecoder()
+
+
+class _Buffer:
+    """Text read window over a file that grows only as far as parsing needs"""
+
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size: int = 0) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(max(size, self.chunk_size))
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop the consumed prefix so the window never holds more than one item
+        self.text = self.text[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at EOF)"""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, ch: str):
+        found = self.peek()
+        if found != ch:
+            raise ValueError(f"Expected {ch!r} at offset {self.pos}, found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value, reading more input as needed"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                # Double the window so a huge item costs O(n log n), not O(n^2)
+                if not self._fill(len(self.text) - self.pos):
+                    raise
+                continue
+            # A number at the window edge may continue in the next chunk
+            if end < len(self.text) or not self._fill():
+                self.pos = end
+                return value
+
+
+def iter_events(f, array_key: str = 'products'):
+    """Yield parse events for a top-level object, streaming the items of array_key
+
+    Events are ('member', key, value) for ordinary members and
+    ('start', key, None), ('item', key, item), ('end', key, None) for the
+    streamed array.
+    """
+    buf = _Buffer(f)
+    buf.expect('{')
+    if buf.peek() == '}':
+        buf.pos += 1
+        return
+    while True:
+        key = buf.value()
+        buf.expect(':')
+        if key == array_key and buf.peek() == '[':
+            buf.pos += 1
+            yield ('start', key, None)
+            if buf.peek() == ']':
+                buf.pos += 1
+            else:
+                while True:
+                    yield ('item', key, buf.value())
+                    if buf.peek() == ',':
+                        buf.pos += 1
+                        continue
+                    buf.expect(']')
+                    break
+            yield ('end', key, None)
+        else:
+            yield ('member', key, buf.value())
+        if buf.peek() == ',':
+            buf.pos += 1
+            continue
+        buf.expect('}')
+        return
+
+
+def _dumps(value, depth: int) -> str:
+    text = json.dumps(value, ensure_ascii=False, indent=INDENT)
+    return text.replace('\n', '\n' + ' ' * (INDENT * depth))
+
+
+class ObjectWriter:
+    """Incremental writer matching json.dump(indent=2, ensure_ascii=False) byte for byte"""
+
+    def __init__(self, f):
+        self.f = f
+        self.members = 0
+        self.items = 0
+        f.write('{')
+
+    def _key(self, key: str):
+        self.f.write(',' if self.members else '')
+        self.f.write('\n' + ' ' * INDENT + json.dumps(key, ensure_ascii=False) + ': ')
+        self.members += 1
+
+    def member(self, key: str, value):
+        self._key(key)
+        self.f.write(_dumps(value, 1))
+
+    def start_array(self, key: str):
+        self._key(key)
+        self.f.write('[')
+        self.items = 0
+
+    def item(self, value):
+        self.f.write(',' if self.items else '')
+        self.f.write('\n' + ' ' * (INDENT * 2) + _dumps(value, 2))
+        self.items += 1
+
+    def end_array(self):
+        self.f.write('\n' + ' ' * INDENT + ']' if self.items else ']')
+
+    def close(self):
+        self.f.write('\n}' if self.members else '}')
+
+
+def dump_atomic(path: Path, data, trailing_newline: bool = False):
+    """json.dump(indent=2, ensure_ascii=False) to a temp file next to path, renamed over it"""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=INDENT, ensure_ascii=False)
+            if trailing_newline:
+                f.write('\n')
+        if path.exists():
+            os.chmod(tmp, stat.S_IMODE(os.stat(path).st_mode))
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+class AtomicArrayFile:
+    """Stream {**members, array_key: [items]} into a temp file next to path
+
+    commit() closes the object and renames the temp file over path; discard()
+    drops it and leaves path untouched. suspend() closes the file handle
+    until the next write, for callers with more files than descriptors.
+    """
+
+    def __init__(self, path: Path, members: dict, array_key: str = 'products', trailing_newline: bool = True):
+        self.path = Path(path)
+        self.trailing_newline = trailing_newline
+        fd, self.tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix='.tmp')
+        self.f = os.fdopen(fd, 'w', encoding='utf-8')
+        self.writer = ObjectWriter(self.f)
+        for key, value in members.items():
+            self.writer.member(key, value)
+        self.writer.start_array(array_key)
+
+    @property
+    def items(self) -> int:
+        return self.writer.items
+
+    def suspend(self):
+        self.f.close()
+
+    def _resume(self):
+        if self.f.closed:
+            self.f = self.writer.f = open(self.tmp, 'a', encoding='utf-8')
+
+    def write(self, item):
+        self._resume()
+        self.writer.item(item)
+
+    def commit(self):
+        self._resume()
+        self.writer.end_array()
+        self.writer.close()
+        if self.trailing_newline:
+            self.f.write('\n')
+        self.f.close()
+        if self.path.exists():
+            os.chmod(self.tmp, stat.S_IMODE(os.stat(self.path).st_mode))
+        os.replace(self.tmp, self.path)
+
+    def discard(self):
+        self.f.close()
+        if os.path.exists(self.tmp):
+            os.unlink(self.tmp)
+
+
+def iter_batches(path: Path, batch_size: int, array_key: str = 'products', on_member=None):
+    """Yield lists of at most batch_size items; other members go to on_member(key, value)"""
+    batch = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for kind, key, value in iter_events(f, array_key):
+            if kind == 'item':
+                batch.append(value)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            elif kind == 'member' and on_member:
+                on_member(key, value)
+    if batch:
+        yield batch
+
+
+def rewrite_array(path: Path, transform, batch_size: int = 1000, array_key: str = 'products',
+                  on_member=None, trailing_newline: bool = False) -> int:
+    """Stream path through transform(batch) -> changed count, replacing it atomically on change
+
+    Output goes to a temp file next to path and is renamed over it only if
+    transform reported at least one change; otherwise the original is untouched.
+    """
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    changed = 0
+    try:
+        with open(path, 'r', encoding='utf-8') as src, os.fdopen(fd, 'w', encoding='utf-8') as dst:
+            writer = ObjectWriter(dst)
+            batch = []
+
+            def flush():
+                nonlocal changed
+                changed += transform(batch)
+                for item in batch:
+                    writer.item(item)
+                batch.clear()
+
+            for kind, key, value in iter_events(src, array_key):
+                if kind == 'item':
+                    batch.append(value)
+                    if len(batch) >= batch_size:
+                        flush()
+                elif kind == 'start':
+                    writer.start_array(key)
+                elif kind == 'end':
+                    if batch:
+                        flush()
+                    writer.end_array()
+                else:
+                    if on_member:
+                        on_member(key, value)
+                    writer.member(key, value)
+            writer.close()
+            if trailing_newline:
+                dst.write('\n')
+        if changed:
+            os.chmod(tmp, stat.S_IMODE(os.stat(path).st_mode))
+            os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+    return changed
@@ -0,0 +1,92 @@
+"""
+Processing manifest for incremental runs
+
+Remembers, per file, the content hash, size and mtime seen after a tool
+processed it, together with the tool's version (rule-table hash,
+placeholder URL, ...). A file whose content and version are unchanged can
+be skipped; an optional JSON-able result is kept so reports can still
+include skipped files.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """path -> {hash, size, mtime_ns, version, result} for one tool and mode"""
+
+    def __init__(self, path: Path, version: str):
+        self.path = Path(path)
+        self.version = version
+        self.entries = {}
+        self.dirty = False
+        self.skipped = 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('files', {})
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def _key(filepath: Path) -> str:
+        return Path(filepath).resolve().as_posix()
+
+    def is_current(self, filepath: Path) -> bool:
+        """True if filepath was processed under this version and has not changed since"""
+        entry = self.entries.get(self._key(filepath))
+        if not entry or entry.get('version') != self.version:
+            return False
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return False
+        if st.st_size != entry['size']:
+            return False
+        if st.st_mtime_ns == entry['mtime_ns']:
+            return True
+        # Touched but maybe not modified (checkout, copy): fall back to the content hash
+        if file_hash(filepath) != entry['hash']:
+            return False
+        entry['mtime_ns'] = st.st_mtime_ns
+        self.dirty = True
+        return True
+
+    def result(self, filepath: Path):
+        entry = self.entries.get(self._key(filepath))
+        return entry.get('result') if entry else None
+
+    def record(self, filepath: Path, result=None):
+        """Remember filepath's current content as processed under this version"""
+        st = os.stat(filepath)
+        self.entries[self._key(filepath)] = {
+            'hash': file_hash(filepath),
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'version': self.version,
+            'result': result,
+        }
+        self.dirty = True
+
+    def forget(self, filepath: Path):
+        if self.entries.pop(self._key(filepath), None) is not None:
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'files': self.entries}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+        self.dirty = False
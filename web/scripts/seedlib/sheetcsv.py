@@ -0,0 +1,124 @@
+"""
+Streaming reader for multi-sheet CSV exports of the inventory template
+
+seed-data-paraguay.csv keeps several Google Sheets tabs in one file, each
+introduced by a "# HOJA: <emoji> <name> (...)" comment banner. iter_records()
+reads such a file in one pass and yields every data row with the sheet it
+belongs to, typed by that sheet's column spec in SHEETS. Comment and blank
+lines between rows are dropped before CSV parsing (lines inside a quoted
+multi-line cell are kept), so only the current row is held in memory,
+however large the export.
+"""
+
+import csv
+import re
+from pathlib import Path
+
+_BANNER = re.compile(r'#\s*HOJA:\s*(.+)')
+
+
+def _text(value: str) -> str:
+    return value.strip()
+
+
+def _optional(value: str):
+    return value.strip() or None
+
+
+def _int(value: str) -> int:
+    value = value.strip()
+    if re.fullmatch(r'\d{1,3}(?:\.\d{3})+', value):
+        # Guaraní amounts are often exported with thousands separators: 580.000
+        value = value.replace('.', '')
+    return int(value)
+
+
+def _optional_int(value: str):
+    return _int(value) if value.strip() else None
+
+
+def _bool(value: str) -> bool:
+    value = value.strip().lower()
+    if value in ('sí', 'si', 'yes', 'true', '1'):
+        return True
+    if value in ('no', 'false', '0', ''):
+        return False
+    raise ValueError(f"expected Sí/No, got {value!r}")
+
+
+# Columns as exported, without the auto-generated code column and formula columns
+SHEETS = {
+    'Categorías': (('name', _text), ('level', _int), ('parent', _optional), ('active', _bool)),
+    'Proveedores': (('name', _text), ('type', _text), ('phone', _optional), ('email', _optional),
+                    ('notes', _optional), ('active', _bool)),
+    'Marcas': (('name', _text), ('country', _optional), ('active', _bool)),
+    'Productos': (('name', _text), ('category', _text), ('brand', _text), ('purchase_unit', _text),
+                  ('units_per_purchase', _int), ('sale_unit', _text), ('purchase_price', _int),
+                  ('supplier', _optional), ('description', _optional), ('active', _bool)),
+    'Mis Productos': (('product', _text), ('sale_price', _int), ('min_stock', _int), ('initial_stock', _int),
+                      ('location', _optional), ('requires_prescription', _bool), ('active', _bool)),
+    'Movimientos Stock': (('date', _text), ('product', _text), ('operation', _text), ('quantity', _int),
+                          ('lot', _optional), ('location', _optional), ('responsible', _optional),
+                          ('unit_cost', _optional_int), ('expires', _optional), ('document', _optional)),
+    'Configuración': (('code', _text), ('location', _text), ('description', _optional), ('active', _bool)),
+}
+
+
+def sheet_name(banner: str) -> str:
+    """'📋 Mis Productos (PRODUCTOS DE TU CLÍNICA)' -> 'Mis Productos'"""
+    name = banner.split('(', 1)[0]
+    return re.sub(r'^[\W_]+', '', name).strip()
+
+
+def iter_rows(f):
+    """(sheet, line number, cells) for every data row, sheet taken from the last banner"""
+    sheet = None
+    line_no = 0
+
+    def lines():
+        nonlocal sheet, line_no
+        quoted = False  # inside a quoted cell that continues on the next line
+        for line_no, line in enumerate(f, 1):
+            stripped = line.strip()
+            if not quoted:
+                if stripped.startswith('#'):
+                    match = _BANNER.match(stripped)
+                    if match:
+                        sheet = sheet_name(match.group(1))
+                    continue
+                if not stripped:
+                    continue
+            # An escaped quote ("") does not change the parity
+            if line.count('"') % 2:
+                quoted = not quoted
+            yield line
+
+    # csv.reader pulls lines lazily, so sheet and line_no belong to the row it returns
+    for cells in csv.reader(lines()):
+        yield sheet, line_no, cells
+
+
+def iter_records(path: Path):
+    """(sheet, line number, record) for every row of a multi-sheet export
+
+    Rows of sheets in SHEETS become dicts typed by the column spec; rows of
+    other sheets are passed through as lists of strings. Raises ValueError
+    for a row outside any sheet or one that does not fit its sheet.
+    """
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        for sheet, line_no, cells in iter_rows(f):
+            if sheet is None:
+                raise ValueError(f"{path}:{line_no}: data before the first '# HOJA:' banner")
+            spec = SHEETS.get(sheet)
+            if spec is None:
+                yield sheet, line_no, cells
+                continue
+            while len(cells) > len(spec) and not cells[-1].strip():
+                cells.pop()
+            if len(cells) != len(spec):
+                raise ValueError(f"{path}:{line_no}: {sheet} rows have {len(spec)} columns, got {len(cells)}")
+            try:
+                record = {key: convert(value) for (key, convert), value in zip(spec, cells)}
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_no}: {sheet}: {e}") from None
+            yield sheet, line_no, record
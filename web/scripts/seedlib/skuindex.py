@@ -0,0 +1,256 @@
+"""
+Persistent SKU and barcode index over the store seed files
+
+Master product files (brand products-*.json and inventory exports) define
+one SKU per variant, built the way the store seeder builds them: the
+product's sku, plus "-<sku_suffix>" when the variant has one. Tenant files
+in tenant-products/ reference those SKUs, optionally with a barcode. Both
+go into one SQLite file, so lookups, orphan and duplicate checks are
+indexed queries instead of a reload of every JSON file.
+
+Updates are incremental: a file is re-read only when its size and mtime
+changed and its content hash differs, and its rows are replaced in one
+transaction. Files are streamed item by item, so memory stays flat
+however large a file is. A writer can stage() the SKUs of a file it is
+still producing; they live in a temporary table that lookup() also
+searches and that disappears with the connection.
+"""
+
+import codecs
+import hashlib
+import os
+import sqlite3
+from pathlib import Path
+
+from . import jsonstream
+
+# Bump when the tables or what goes into them change; the index is rebuilt
+SCHEMA_VERSION = 1
+INSERT_BATCH = 5000
+
+_SCHEMA = """
+CREATE TABLE files (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE variants (
+    sku TEXT NOT NULL,
+    barcode TEXT,
+    product_sku TEXT NOT NULL,
+    name TEXT,
+    file TEXT NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE TABLE refs (
+    sku TEXT NOT NULL,
+    barcode TEXT,
+    tenant TEXT NOT NULL,
+    file TEXT NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE INDEX variants_sku ON variants (sku);
+CREATE INDEX variants_barcode ON variants (barcode) WHERE barcode IS NOT NULL;
+CREATE INDEX variants_file ON variants (file);
+CREATE INDEX refs_sku ON refs (sku);
+CREATE INDEX refs_file ON refs (file);
+"""
+
+_STAGED = """
+CREATE TEMP TABLE staged (
+    sku TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    file TEXT NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE INDEX temp.staged_name ON staged (name);
+"""
+
+
+def scan_file(path: Path):
+    """(sha256, encoding) of path in one pass; exports that are not UTF-8 are Latin-1"""
+    digest = hashlib.sha256()
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    encoding = 'utf-8'
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+            if encoding == 'utf-8':
+                try:
+                    decoder.decode(chunk)
+                except UnicodeDecodeError:
+                    encoding = 'latin-1'
+    return digest.hexdigest(), encoding
+
+
+def variant_skus(product: dict):
+    """(sku, barcode) of every variant of a master product, as the store seeder names them"""
+    sku = product.get('sku')
+    if not sku:
+        return []
+    barcode = product.get('barcode')
+    variants = product.get('variants') or []
+    if not variants:
+        return [(sku, barcode)]
+    return [(f"{sku}-{v['sku_suffix']}" if v.get('sku_suffix') else sku, v.get('barcode', barcode))
+            for v in variants]
+
+
+class SkuIndex:
+    """SQLite-backed SKU/barcode index; update() before querying"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.row_factory = sqlite3.Row
+        if self.db.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            for (table,) in self.db.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall():
+                self.db.execute(f'DROP TABLE {table}')
+            self.db.executescript(_SCHEMA)
+            self.db.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            self.db.commit()
+        self.db.executescript(_STAGED)
+        self.updated = []
+        self.removed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        return Path(path).resolve().as_posix()
+
+    def update(self, master_files, tenant_files) -> int:
+        """Bring the index in line with the given files, returning how many were (re)indexed
+
+        Files indexed before but no longer given are dropped.
+        """
+        wanted = {}
+        for kind, files in (('master', master_files), ('tenant', tenant_files)):
+            for path in files:
+                wanted[self._key(path)] = (kind, Path(path))
+        for (key,) in self.db.execute('SELECT path FROM files').fetchall():
+            if key not in wanted:
+                with self.db:
+                    self._forget(key)
+                self.removed.append(key)
+
+        for key, (kind, path) in wanted.items():
+            st = os.stat(path)
+            row = self.db.execute('SELECT hash, size, mtime_ns FROM files WHERE path = ?', (key,)).fetchone()
+            if row and (row['size'], row['mtime_ns']) == (st.st_size, st.st_mtime_ns):
+                continue
+            digest, encoding = scan_file(path)
+            with self.db:
+                if row and row['hash'] == digest:
+                    # Touched but not modified (checkout, copy)
+                    self.db.execute('UPDATE files SET mtime_ns = ? WHERE path = ?', (st.st_mtime_ns, key))
+                    continue
+                self._forget(key)
+                self._load(key, kind, path, encoding)
+                self.db.execute('INSERT INTO files VALUES (?, ?, ?, ?, ?)',
+                                (key, kind, digest, st.st_size, st.st_mtime_ns))
+            self.updated.append(key)
+        return len(self.updated)
+
+    def _forget(self, key: str):
+        for table, column in (('variants', 'file'), ('refs', 'file'), ('files', 'path')):
+            self.db.execute(f'DELETE FROM {table} WHERE {column} = ?', (key,))
+
+    def _load(self, key: str, kind: str, path: Path, encoding: str):
+        tenant = path.stem
+        rows = []
+        if kind == 'master':
+            sql = 'INSERT INTO variants VALUES (?, ?, ?, ?, ?, ?)'
+        else:
+            sql = 'INSERT INTO refs VALUES (?, ?, ?, ?, ?)'
+        with open(path, 'r', encoding=encoding) as f:
+            position = 0
+            for event, member, value in jsonstream.iter_events(f):
+                if event == 'member' and member == 'tenant_id' and isinstance(value, str):
+                    # Members after the products array would come too late; tenant_id comes first
+                    tenant = value
+                if event != 'item' or not isinstance(value, dict):
+                    continue
+                if kind == 'master':
+                    for sku, barcode in variant_skus(value):
+                        rows.append((sku, barcode, value['sku'], value.get('name'), key, position))
+                elif value.get('sku'):
+                    rows.append((value['sku'], value.get('barcode'), tenant, key, position))
+                position += 1
+                if len(rows) >= INSERT_BATCH:
+                    self.db.executemany(sql, rows)
+                    rows.clear()
+        self.db.executemany(sql, rows)
+
+    def stats(self) -> dict:
+        return dict(self.db.execute("""
+            SELECT (SELECT COUNT(*) FROM files) AS files,
+                   (SELECT COUNT(*) FROM variants) AS variants,
+                   (SELECT COUNT(DISTINCT sku) FROM variants) AS skus,
+                   (SELECT COUNT(*) FROM refs) AS refs
+        """).fetchone())
+
+    def lookup(self, sku: str) -> list:
+        """Master variants with this SKU, staged ones included (more than one means a duplicate)"""
+        rows = self.db.execute("""
+            SELECT * FROM variants WHERE sku = ?
+            UNION ALL
+            SELECT sku, NULL, sku, name, file, position FROM staged WHERE sku = ?
+            ORDER BY file, position
+        """, (sku, sku))
+        return [dict(row) for row in rows]
+
+    def stage(self, sku: str, name: str, file: Path, position: int):
+        """Record a SKU of a master file still being written, until the index is closed"""
+        self.db.execute('INSERT INTO staged VALUES (?, ?, ?, ?)', (sku, name, self._key(file), position))
+
+    def staged_sku(self, name: str):
+        """SKU of the first staged product with this name, or None"""
+        row = self.db.execute(
+            'SELECT sku FROM staged WHERE name = ? ORDER BY rowid LIMIT 1', (name,)).fetchone()
+        return row[0] if row else None
+
+    def lookup_barcode(self, barcode: str) -> list:
+        rows = self.db.execute('SELECT * FROM variants WHERE barcode = ? ORDER BY file, position', (barcode,))
+        return [dict(row) for row in rows]
+
+    def duplicates(self) -> list:
+        """(sku, [(file, position, name), ...]) for every SKU defined more than once"""
+        found = {}
+        rows = self.db.execute("""
+            SELECT sku, file, position, name FROM variants
+            WHERE sku IN (SELECT sku FROM variants GROUP BY sku HAVING COUNT(*) > 1)
+            ORDER BY sku, file, position
+        """)
+        for row in rows:
+            found.setdefault(row['sku'], []).append((row['file'], row['position'], row['name']))
+        return list(found.items())
+
+    def orphans(self) -> list:
+        """Tenant references whose SKU no master file defines"""
+        rows = self.db.execute("""
+            SELECT r.* FROM refs r
+            WHERE NOT EXISTS (SELECT 1 FROM variants v WHERE v.sku = r.sku)
+            ORDER BY r.tenant, r.file, r.position
+        """)
+        return [dict(row) for row in rows]
+
+    def barcode_mismatches(self) -> list:
+        """Tenant references whose barcode differs from the one on the master variant"""
+        rows = self.db.execute("""
+            SELECT r.*, v.barcode AS master_barcode FROM refs r
+            JOIN variants v ON v.sku = r.sku
+            WHERE r.barcode IS NOT NULL AND v.barcode IS NOT NULL AND r.barcode != v.barcode
+            ORDER BY r.tenant, r.file, r.position
+        """)
+        return [dict(row) for row in rows]
@@ -0,0 +1,162 @@
+"""
+Streaming rewrites for large SQL seed files
+
+Reads a SQL file in bounded chunks and applies a regex substitution to each
+one. Chunks are cut only at line breaks, so a pattern matching literals
+that do not span lines (URLs) sees the same text it would see in the full
+file, whatever comments or escaped strings surround them. Peak memory is
+about one chunk plus the longest line.
+
+scan_spans/splice are the mmap alternative for multi-GB files: match
+offsets are collected over the mapped bytes and the output is spliced
+together from the mapping, without decoding the file at all.
+"""
+
+import mmap
+import os
+import re
+import stat
+import tempfile
+from pathlib import Path
+
+CHUNK_SIZE = 1 << 20
+
+
+def iter_chunks(f, chunk_size: int = CHUNK_SIZE):
+    """Yield text pieces of f, each ending at a line break (or the end of the file)"""
+    parts = []
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        # Quote counting is fooled by apostrophes in comments and E'\'' strings;
+        # a line break is a safe cut because no URL literal spans lines
+        cut = chunk.rfind('\n') + 1
+        if not cut:
+            parts.append(chunk)
+            continue
+        parts.append(chunk[:cut])
+        yield ''.join(parts)
+        parts = [chunk[cut:]]
+    tail = ''.join(parts)
+    if tail:
+        yield tail
+
+
+def iter_matches(path: Path, pattern: re.Pattern, chunk_size: int = CHUNK_SIZE):
+    """Yield every match of pattern in path, reading it chunk by chunk"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for text in iter_chunks(f, chunk_size):
+            yield from pattern.finditer(text)
+
+
+def count(path: Path, pattern: re.Pattern, chunk_size: int = CHUNK_SIZE, exclude=None) -> int:
+    """Number of matches rewrite() would replace, without writing anything"""
+    return sum(1 for m in iter_matches(path, pattern, chunk_size) if not (exclude and exclude(m)))
+
+
+def rewrite(path: Path, pattern: re.Pattern, replacement: str, chunk_size: int = CHUNK_SIZE,
+            exclude=None) -> int:
+    """Substitute pattern in path chunk by chunk, returning the number of replacements
+
+    replacement is a template string or a function of the match returning the
+    new text, or None to leave the match. Matches for which exclude(match) is
+    true are left as they are too. Output goes to a temp file next to path and
+    is renamed over it only if something was replaced; otherwise the original
+    is untouched.
+    """
+    return rewrite_many(path, [(pattern, replacement, exclude)], chunk_size)
+
+
+def rewrite_many(path: Path, substitutions: list, chunk_size: int = CHUNK_SIZE) -> int:
+    """rewrite() with several (pattern, replacement, exclude) steps applied to each chunk in turn"""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    count = 0
+
+    def substituter(replacement, exclude):
+        def substitute(match):
+            nonlocal count
+            if exclude and exclude(match):
+                return match.group(0)
+            new = replacement(match) if callable(replacement) else match.expand(replacement)
+            if new is None:
+                return match.group(0)
+            count += 1
+            return new
+        return substitute
+
+    steps = []
+    for pattern, replacement, exclude in substitutions:
+        if exclude or callable(replacement):
+            steps.append((pattern, substituter(replacement, exclude)))
+        else:
+            steps.append((pattern, replacement))
+    try:
+        # newline='' keeps line endings byte for byte
+        with open(path, 'r', encoding='utf-8', newline='') as src, \
+                os.fdopen(fd, 'w', encoding='utf-8', newline='') as dst:
+            for text in iter_chunks(src, chunk_size):
+                for pattern, replacement in steps:
+                    if callable(replacement):
+                        text = pattern.sub(replacement, text)
+                    else:
+                        text, n = pattern.subn(replacement, text)
+                        count += n
+                dst.write(text)
+        if count:
+            os.chmod(tmp, stat.S_IMODE(os.stat(path).st_mode))
+            os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+    return count
+
+
+def scan_spans(path: Path, pattern: re.Pattern, exclude=None) -> list:
+    """(offset, length) of every match of a bytes pattern, scanned over an mmap of path
+
+    Matches for which exclude(match) is true are skipped. The file is never
+    decoded or read into memory; the OS pages it in as the regex walks the
+    mapping.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return [(m.start(), m.end() - m.start()) for m in pattern.finditer(mm)
+                    if not (exclude and exclude(m))]
+
+
+def splice(path: Path, spans: list, replacement) -> int:
+    """Replace each (offset, length) span of path with replacement, atomically
+
+    replacement is bytes or a function of the span's original bytes; a span
+    given as (offset, length, bytes) carries its own replacement. Unchanged
+    regions are copied straight from the mapping into a temp file next to
+    path, which is renamed over it. Returns the number of spans.
+    """
+    if not spans:
+        return 0
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with open(path, 'rb') as src, os.fdopen(fd, 'wb') as dst:
+            with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                pos = 0
+                for offset, length, *own in spans:
+                    dst.write(view[pos:offset])
+                    if own:
+                        dst.write(own[0])
+                    elif callable(replacement):
+                        dst.write(replacement(bytes(view[offset:offset + length])))
+                    else:
+                        dst.write(replacement)
+                    pos = offset + length
+                dst.write(view[pos:])
+        os.chmod(tmp, stat.S_IMODE(os.stat(path).st_mode))
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+    return len(spans)
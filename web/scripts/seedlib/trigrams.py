@@ -0,0 +1,245 @@
+"""
+Memory-mapped character-trigram index of labelled names
+
+build() writes names and their labels (category slugs) as an inverted
+index: sorted trigram codes, a posting list of name ids per trigram, and
+each name's label and trigram count. TrigramIndex maps that file read-only,
+so it is built once, shared between worker processes through the page cache
+and opened without parsing anything.
+
+Names are only uppercased and whitespace-collapsed here. Callers that fold
+more (fix-categories keys on normalize_name) must key their queries the
+same way as the names they build from.
+
+A query scores every indexed name that shares a trigram with it by Dice
+similarity, 2 * shared / (query trigrams + name trigrams), and takes a
+similarity-weighted vote among the nearest names. Only posting lists of the
+query's own trigrams are read; nothing is compared pairwise. With NumPy a
+whole batch of queries is scored with array operations.
+"""
+
+import json
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # queries fall back to one Counter per name
+    np = None
+
+MAGIC = b'TGIX'
+# Bump when the layout or the way callers key names changes; older indexes are rebuilt
+FORMAT_VERSION = 2
+# magic, format version, names, trigrams, postings, stamp bytes, labels bytes
+_HEADER = struct.Struct('<4sIIIIII')
+NEIGHBOURS = 10
+# Postings gathered per NumPy pass, bounds memory on common trigrams
+PAIR_BUDGET = 1 << 22
+# Queries per NumPy pass, keeps (query, -similarity) exact as one float sort key
+QUERY_BUDGET = 1 << 16
+
+
+def trigrams(text: str) -> set:
+    """Trigram codes of an uppercased, whitespace-collapsed, space-padded text"""
+    padded = f"  {' '.join(text.upper().split())} "
+    return {(ord(padded[i]) << 42) | (ord(padded[i + 1]) << 21) | ord(padded[i + 2])
+            for i in range(len(padded) - 2)}
+
+
+def _pad(f):
+    f.write(b'\0' * (-f.tell() % 8))
+
+
+def build(path: Path, entries, stamp: str = '') -> int:
+    """Write an index of (name, label) entries, returning how many distinct names it holds
+
+    The first label seen for a name wins. stamp is stored as-is so callers can
+    tell whether the index still matches its source.
+    """
+    labels = {}
+    names = {}
+    for name, label in entries:
+        key = ' '.join(name.upper().split())
+        if key and key not in names:
+            names[key] = labels.setdefault(label, len(labels))
+
+    postings = defaultdict(list)
+    sizes = []
+    for doc, key in enumerate(names):
+        grams = trigrams(key)
+        sizes.append(min(len(grams), 0xFFFF))
+        for gram in grams:
+            postings[gram].append(doc)
+    keys = sorted(postings)
+    offsets = [0]
+    for gram in keys:
+        offsets.append(offsets[-1] + len(postings[gram]))
+
+    stamp_bytes = stamp.encode('utf-8')
+    label_bytes = json.dumps(list(labels), ensure_ascii=False).encode('utf-8')
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(names), len(keys), offsets[-1],
+                             len(stamp_bytes), len(label_bytes)))
+        f.write(stamp_bytes + label_bytes)
+        _pad(f)
+        f.write(struct.pack(f'<{len(keys)}Q', *keys))
+        f.write(struct.pack(f'<{len(offsets)}I', *offsets))
+        for gram in keys:
+            f.write(struct.pack(f'<{len(postings[gram])}I', *postings[gram]))
+        f.write(struct.pack(f'<{len(names)}H', *names.values()))
+        f.write(struct.pack(f'<{len(sizes)}H', *sizes))
+    os.replace(tmp, path)
+    return len(names)
+
+
+class TrigramIndex:
+    """Read-only view of a file written by build()"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.size, n_keys, n_postings, n_stamp, n_labels = _HEADER.unpack_from(self._mm)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"{self.path} is not a trigram index (format {FORMAT_VERSION})")
+        pos = _HEADER.size
+        self.stamp = self._mm[pos:pos + n_stamp].decode('utf-8')
+        pos += n_stamp
+        self.labels = json.loads(self._mm[pos:pos + n_labels].decode('utf-8'))
+        pos += n_labels
+        pos += -pos % 8
+
+        view = memoryview(self._mm)
+        sections = []
+        for fmt, count in (('Q', n_keys), ('I', n_keys + 1), ('I', n_postings), ('H', self.size), ('H', self.size)):
+            length = struct.calcsize(fmt) * count
+            sections.append((fmt, pos, count, view[pos:pos + length].cast(fmt)))
+            pos += length
+        self._views = [section[3] for section in sections]
+        self.keys, self.offsets, self.postings, self.doc_labels, self.doc_sizes = self._views
+        if np is not None:
+            dtypes = {'Q': np.uint64, 'I': np.uint32, 'H': np.uint16}
+            self._arrays = [np.frombuffer(self._mm, dtypes[fmt], count, offset)
+                            for fmt, offset, count, _ in sections]
+
+    @staticmethod
+    def stamp_of(path: Path):
+        """The stamp stored in an index file, or None if there is no readable index"""
+        try:
+            with open(path, 'rb') as f:
+                header = f.read(_HEADER.size)
+                magic, version, _, _, _, n_stamp, _ = _HEADER.unpack(header)
+                if magic != MAGIC or version != FORMAT_VERSION:
+                    return None
+                return f.read(n_stamp).decode('utf-8')
+        except (OSError, struct.error, UnicodeDecodeError):
+            return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if np is not None:
+            self._arrays = None
+        for view in self._views:
+            view.release()
+        self._mm.close()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def query(self, name: str, k: int = NEIGHBOURS) -> tuple:
+        return self.query_many([name], k)[0]
+
+    def query_many(self, names, k: int = NEIGHBOURS) -> list:
+        """(label, confidence) per name; ('UNKNOWN', 0.0) when no indexed name is similar
+
+        Confidence is the summed similarity of the k nearest names that agree
+        with the winning label, divided by k: 1.0 only for k exact matches.
+        """
+        grams = [trigrams(name) for name in names]
+        if np is None:
+            neighbours = [self._nearest(g, k) for g in grams]
+        else:
+            neighbours = self._nearest_many(grams, k)
+        return [self._vote(found, k) for found in neighbours]
+
+    def _vote(self, found: list, k: int) -> tuple:
+        votes = defaultdict(float)
+        for doc, score in found:
+            votes[self.doc_labels[doc]] += score
+        if not votes:
+            return 'UNKNOWN', 0.0
+        label, weight = max(votes.items(), key=lambda item: (item[1], -item[0]))
+        return self.labels[label], round(weight / k, 3)
+
+    def _nearest(self, grams: set, k: int) -> list:
+        """(doc, similarity) of the k most similar names, ties broken by doc id"""
+        shared = Counter()
+        for gram in grams:
+            i = bisect_left(self.keys, gram)
+            if i < len(self.keys) and self.keys[i] == gram:
+                shared.update(self.postings[self.offsets[i]:self.offsets[i + 1]])
+        scored = [(2 * n / (len(grams) + self.doc_sizes[doc]), doc) for doc, n in shared.items()]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [(doc, score) for score, doc in scored[:k]]
+
+    def _nearest_many(self, grams: list, k: int) -> list:
+        keys, offsets, postings, _, doc_sizes = self._arrays
+        results = [[] for _ in grams]
+        if not len(keys):
+            return results
+
+        query_sizes = np.array([len(g) for g in grams], dtype=np.float64)
+        qids = np.repeat(np.arange(len(grams)), query_sizes.astype(np.int64))
+        codes = np.fromiter((code for g in grams for code in g), np.uint64, len(qids))
+        slots = np.minimum(np.searchsorted(keys, codes), len(keys) - 1)
+        hit = keys[slots] == codes
+        qids, slots = qids[hit], slots[hit]
+        starts = offsets[slots].astype(np.int64)
+        lengths = offsets[slots + 1].astype(np.int64) - starts
+
+        # Split the queries into passes of at most PAIR_BUDGET postings
+        per_query = np.bincount(qids, weights=lengths, minlength=len(grams))
+        bounds = [0]
+        total = 0
+        for q, n in enumerate(per_query):
+            if total and (total + n > PAIR_BUDGET or q - bounds[-1] >= QUERY_BUDGET):
+                bounds.append(q)
+                total = 0
+            total += n
+        bounds.append(len(grams))
+        edges = np.searchsorted(qids, bounds)
+
+        for lo, hi in zip(edges[:-1], edges[1:]):
+            q, s, n = qids[lo:hi], starts[lo:hi], lengths[lo:hi]
+            if not len(n):
+                continue
+            base = q[0]
+            # Flat positions of every posting of every matched trigram in this pass
+            ends = np.cumsum(n)
+            positions = np.arange(ends[-1]) - np.repeat(ends - n - s, n)
+            pairs = np.repeat(q - base, n) * np.int64(self.size) + postings[positions]
+            pairs, shared = np.unique(pairs, return_counts=True)
+            pq, docs = np.divmod(pairs, self.size)
+            scores = 2 * shared / (query_sizes[pq + base] + doc_sizes[docs])
+            # pairs come sorted by (query, doc); a stable sort on query then
+            # descending similarity keeps doc order among equal scores
+            order = np.argsort(pq + (1.0 - scores) / 2, kind='stable')
+            pq, docs, scores = pq[order] + base, docs[order], scores[order]
+            rank = np.arange(len(pq)) - np.searchsorted(pq, pq)
+            top = rank < k
+            for qid, doc, score in zip(pq[top].tolist(), docs[top].tolist(), scores[top].tolist()):
+                results[qid].append((doc, score))
+        return results
@@ -0,0 +1,228 @@
+"""
+Concurrent image URL health checks
+
+Each URL is probed with HEAD, falling back to a one-byte ranged GET when the
+server rejects HEAD, over keep-alive connections reused per host. Requests
+wait for their host's rate slot first and only then take one of the
+concurrency slots, so a slow host never starves the others. HTTP statuses go
+to a JSON cache with a TTL, so reruns only probe what expired. A URL that
+could not be reached at all (timeout, DNS, refused or dropped connection) is
+reported as unknown and never cached, so an offline run leaves no trace.
+Only asyncio streams are used: no extra packages, and any URL (including a
+local stub server) can be checked.
+"""
+
+import asyncio
+import json
+import os
+import ssl
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+CONCURRENCY = 32
+HOST_RATE = 8.0  # requests per second per host; None for no limit
+TIMEOUT = 10.0
+TTL = 7 * 24 * 3600
+MAX_REDIRECTS = 5
+MAX_DRAIN = 1 << 16  # larger bodies close the connection instead of being read
+USER_AGENT = 'vete-seed-tools/1.0'
+
+
+class UrlCache:
+    """url -> {ok, status, checked_at}, entries older than ttl seconds are ignored
+
+    Only real HTTP statuses are stored; unreachable URLs (status 0) are
+    probed again on the next run.
+    """
+
+    def __init__(self, path: Path, ttl: float = TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.entries = {}
+        self.dirty = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('urls', {})
+        except (OSError, ValueError):
+            pass
+
+    def get(self, url: str):
+        entry = self.entries.get(url)
+        if entry and entry['status'] and time.time() - entry['checked_at'] < self.ttl:
+            return entry
+        return None
+
+    def put(self, url: str, ok: bool, status: int):
+        if not status:
+            return
+        self.entries[url] = {'ok': ok, 'status': status, 'checked_at': time.time()}
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'urls': self.entries}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+class URLChecker:
+    """Check many URLs at once; check_all(urls) -> {url: ok}
+
+    ok is True for a 2xx answer, False for any other HTTP status and None when
+    the URL could not be reached, so callers can tell a broken image from a
+    flaky network.
+    """
+
+    def __init__(self, concurrency: int = CONCURRENCY, host_rate: float = HOST_RATE,
+                 timeout: float = TIMEOUT, cache: UrlCache = None):
+        self.concurrency = concurrency
+        self.host_rate = host_rate
+        self.timeout = timeout
+        self.cache = cache
+        self.statuses = {}
+        self.cached = 0
+        self.probed = 0
+
+    def check_all(self, urls) -> dict:
+        urls = set(urls)
+        results = {}
+        pending = []
+        for url in urls:
+            entry = self.cache.get(url) if self.cache else None
+            if entry:
+                results[url] = entry['ok']
+                self.statuses[url] = entry['status']
+                self.cached += 1
+            else:
+                pending.append(url)
+        if pending:
+            results.update(asyncio.run(self._check_all(sorted(pending))))
+        return results
+
+    async def _check_all(self, urls: list) -> dict:
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._idle = defaultdict(list)
+        self._host_locks = defaultdict(asyncio.Lock)
+        self._next_slot = defaultdict(float)
+        self._ssl = ssl.create_default_context()
+        try:
+            checked = await asyncio.gather(*(self._check(url) for url in urls))
+        finally:
+            for connections in self._idle.values():
+                for _, writer in connections:
+                    writer.close()
+        return dict(zip(urls, checked))
+
+    async def _check(self, url: str) -> bool:
+        try:
+            status = await self._probe(url, 'HEAD')
+            if status >= 400:
+                # Plenty of CDNs answer HEAD with 403/405 but serve GET fine
+                status = await self._probe(url, 'GET')
+        except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            status = 0
+        ok = 200 <= status < 300 if status else None
+        self.statuses[url] = status
+        self.probed += 1
+        if self.cache:
+            self.cache.put(url, ok, status)
+        return ok
+
+    async def _probe(self, url: str, method: str) -> int:
+        for _ in range(MAX_REDIRECTS + 1):
+            # Wait for the host's rate slot before taking a concurrency slot, so
+            # requests queued on one slow host never hold slots other hosts need;
+            # neither wait counts against the request timeout
+            await self._throttle(urlsplit(url).hostname)
+            async with self._semaphore:
+                status, headers = await asyncio.wait_for(self._request(url, method), self.timeout)
+            location = headers.get('location')
+            if status not in (301, 302, 303, 307, 308) or not location:
+                return status
+            url = urljoin(url, location)
+        return status
+
+    async def _throttle(self, host: str):
+        if not self.host_rate:
+            return
+        async with self._host_locks[host]:
+            loop = asyncio.get_running_loop()
+            wait = self._next_slot[host] - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_slot[host] = max(loop.time(), self._next_slot[host]) + 1 / self.host_rate
+
+    async def _request(self, url: str, method: str):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f"Not an http(s) URL: {url}")
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        key = (parts.scheme, parts.hostname, port)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        request = (f"{method} {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+                   f"User-Agent: {USER_AGENT}\r\nAccept: */*\r\n")
+        if method == 'GET':
+            request += "Range: bytes=0-0\r\n"
+        request = (request + "\r\n").encode('latin-1')
+
+        # A pooled connection may have been closed by the server; retry once on a fresh one
+        while True:
+            reused = bool(self._idle[key])
+            if reused:
+                reader, writer = self._idle[key].pop()
+            else:
+                reader, writer = await asyncio.open_connection(
+                    parts.hostname, port, ssl=self._ssl if parts.scheme == 'https' else None)
+            try:
+                writer.write(request)
+                await writer.drain()
+                status, headers, reusable = await self._read_response(reader, method)
+            except (OSError, ValueError, asyncio.IncompleteReadError):
+                writer.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                # Cancelled by the timeout mid-response: the connection is unusable
+                writer.close()
+                raise
+            break
+
+        if reusable:
+            self._idle[key].append((reader, writer))
+        else:
+            writer.close()
+        return status, headers
+
+    async def _read_response(self, reader, method: str):
+        line = await reader.readline()
+        fields = line.decode('latin-1').split(None, 2)
+        if len(fields) < 2 or not fields[0].startswith('HTTP/'):
+            raise ValueError(f"Bad status line: {line!r}")
+        status = int(fields[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        reusable = headers.get('connection', '').lower() != 'close' and fields[0] != 'HTTP/1.0'
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            return status, headers, reusable
+        length = headers.get('content-length')
+        if length is not None and 'chunked' not in headers.get('transfer-encoding', '') \
+                and int(length) <= MAX_DRAIN:
+            await reader.readexactly(int(length))
+            return status, headers, reusable
+        # Unknown or large body: drop the connection rather than read it
+        return status, headers, False
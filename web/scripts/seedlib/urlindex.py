@@ -0,0 +1,214 @@
+"""
+URL rewrite index for seed image URLs
+
+Decides in one lookup per URL whether to keep it, point it at a local
+asset or replace it with the placeholder. Rules are host patterns with an
+optional path prefix ("cdn.shopify.com", "*.cloudinary.com",
+"www.*.com", "example.org/media/"), stored in a trie keyed by reversed host
+labels. A rule for a host also covers its subdomains. The most specific
+host wins, exact labels beat "*", and within a host the longest path prefix
+wins. Exact URLs, such as the curated ones in image-urls.json, override
+every rule.
+
+quoted_patterns() compiles the index into regexes for scanning text such
+as SQL, where URLs on hosts that always become the placeholder are replaced
+by the regex engine alone and only the rest need a rewrite() call.
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from urllib.parse import urlsplit
+
+ACTIONS = ('keep', 'local', 'placeholder')
+
+
+class _Node:
+    __slots__ = ('children', 'rules')
+
+    def __init__(self):
+        self.children = {}
+        self.rules = []  # (path prefix, action, target), longest prefix first
+
+
+class UrlIndex:
+    """Compiled keep/local/placeholder decisions for absolute http(s) URLs"""
+
+    def __init__(self, placeholder: str, default: str = 'keep'):
+        self.placeholder = placeholder
+        self.default = default
+        self.exact = {}
+        self.root = _Node()
+        self._by_host = {}
+        self._hash = hashlib.sha256(placeholder.encode('utf-8'))
+
+    @property
+    def version(self) -> str:
+        """Hash of everything that shaped the index, for manifests of processed files"""
+        return self._hash.hexdigest()[:16]
+
+    def add(self, match: str, action: str, target: str = None):
+        """Add a rule for "host[/path-prefix]"; local rules swap the matched prefix for target"""
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown URL action {action!r} for {match!r}")
+        if action == 'local' and not target:
+            raise ValueError(f"Local URL rule {match!r} needs a target")
+        host, slash, path = match.partition('/')
+        node = self.root
+        for label in reversed(host.lower().split('.')):
+            node = node.children.setdefault(label, _Node())
+        node.rules.append((slash + path if slash else '/', action, target))
+        node.rules.sort(key=lambda rule: -len(rule[0]))
+        self._hash.update(repr((match, action, target)).encode('utf-8'))
+        self._by_host.clear()
+
+    def add_exact(self, url: str, action: str, target: str = None):
+        self.exact[url] = (action, target)
+        self._hash.update(repr((url, action, target)).encode('utf-8'))
+        self._by_host.clear()
+
+    def load(self, path: Path):
+        """Add rules from a rules file or exact keeps from an image-urls.json style mapping"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, list):
+            # [{sku, imageUrl, images: [...]}, ...]: curated URLs are known good
+            for entry in data:
+                for url in [entry.get('imageUrl')] + list(entry.get('images') or []):
+                    if url:
+                        self.add_exact(url, 'keep')
+            return self
+        self.default = data.get('default', self.default)
+        self._hash.update(self.default.encode('utf-8'))
+        if self.default not in ('keep', 'placeholder'):
+            raise ValueError(f"Default URL action must be keep or placeholder, not {self.default!r}")
+        for rule in data.get('rules', []):
+            self.add(rule['match'], rule['action'], rule.get('target'))
+        return self
+
+    def _host_rules(self, host: str) -> list:
+        """Rules for host, most specific host pattern first, longest prefix first within it"""
+        matches = []
+        frontier = [(self.root, 0)]
+        for depth, label in enumerate(reversed(host.split('.')), 1):
+            step = []
+            for node, exact in frontier:
+                if label in node.children:
+                    step.append((node.children[label], exact + 1))
+                if '*' in node.children:
+                    step.append((node.children['*'], exact))
+            if not step:
+                break
+            frontier = step
+            matches.extend((depth, exact, node) for node, exact in step if node.rules)
+        matches.sort(key=lambda m: (-m[0], -m[1]))
+        return [rule for _, _, node in matches for rule in node.rules]
+
+    def decide(self, url: str):
+        """(action, target, matched prefix) for url, None if no rule applies or it is not remote"""
+        exact = self.exact.get(url)
+        if exact:
+            return exact[0], exact[1], None
+        if url.startswith('https://'):
+            rest = url[8:]
+        elif url.startswith('http://'):
+            rest = url[7:]
+        else:
+            return None
+        end = len(rest)
+        for sep in '/?#':
+            i = rest.find(sep, 0, end)
+            if i >= 0:
+                end = i
+        host = rest[:end].rpartition('@')[2].partition(':')[0].lower()
+        rules = self._by_host.get(host)
+        if rules is None:
+            rules = self._by_host[host] = self._host_rules(host) if host else []
+        if not rules:
+            return None
+        path = rest[end:]
+        if rules[0][0] != '/':
+            path = path.partition('?')[0].partition('#')[0] or '/'
+        for prefix, action, target in rules:
+            if path.startswith(prefix) or prefix == '/':
+                return action, target, prefix
+        return None
+
+    def rewrite(self, url: str, default: str = None) -> str:
+        """url after applying its rule; default overrides the index default for unmatched URLs"""
+        decision = self.decide(url)
+        if decision is None:
+            if not url.startswith(('http://', 'https://')):
+                return url
+            action, target, prefix = default or self.default, None, ''
+        else:
+            action, target, prefix = decision
+        if action == 'placeholder':
+            return self.placeholder
+        if action == 'keep':
+            return url
+        if prefix is None:
+            return target
+        path = urlsplit(url).path
+        return target.rstrip('/') + '/' + path[len(prefix):].lstrip('/')
+
+    def _nodes(self) -> list:
+        """(reversed host labels, rules) for every trie node that has rules"""
+        found = []
+        stack = [(self.root, ())]
+        while stack:
+            node, labels = stack.pop()
+            if node.rules:
+                found.append((labels, node.rules))
+            for label, child in node.children.items():
+                stack.append((child, labels + (label,)))
+        return found
+
+    def quoted_patterns(self, quote: str = "'", split: bool = True):
+        """(fast, slow) regexes matching quote-delimited URLs that some rule may change
+
+        Group 1 is the URL. Every fast match becomes the placeholder, so it can
+        be substituted with a plain string; slow matches need rewrite(url).
+        URLs neither matches are kept. Without split, slow covers both. Either
+        is None when it would match nothing.
+        """
+        q = re.escape(quote)
+        if self.default != 'keep':
+            # Any URL may change, so every one takes the lookup
+            return None, re.compile(f"{q}(https?://[^{q}]*){q}")
+        label_re = f"[^{q}/?#@:.]+"
+
+        def overlap(a, b):
+            return all(x == y or '*' in (x, y) for x, y in zip(a, b))
+
+        def host_re(labels):
+            return r'\.'.join(label_re if label == '*' else re.escape(label) for label in reversed(labels))
+
+        def url_re(hosts):
+            # Subdomains are matched once in front of the alternation; a
+            # per-host prefix makes the regex backtrack through every host
+            return (rf"https?://(?:{label_re}\.)*?(?i:{'|'.join(hosts)})"
+                    rf"(?::[^{q}/?#]*)?(?=[/?#{q}])[^{q}]*")
+
+        nodes = self._nodes()
+        fast, slow = [], []
+        for labels, rules in nodes:
+            if all(action == 'keep' for _, action, _ in rules):
+                continue
+            simple = rules == [('/', 'placeholder', None)] and not any(
+                other != rules and overlap(labels, other_labels) for other_labels, other in nodes)
+            (fast if simple and split else slow).append(host_re(labels))
+
+        exact_changes = [re.escape(url) for url, (action, _) in self.exact.items() if action != 'keep']
+        fast_re = slow_re = None
+        if fast:
+            # Exact URLs have the final say, so they never take the fast path
+            lookahead = f"(?!(?:{'|'.join(map(re.escape, self.exact))}){q})" if self.exact else ''
+            fast_re = re.compile(f"{q}{lookahead}({url_re(fast)}){q}")
+        if fast or slow or exact_changes:
+            # URLs with user info are rare enough to always take the lookup
+            alternatives = ([url_re(slow)] if slow else []) + exact_changes
+            alternatives.append(rf"https?://[^{q}/?#@]*@[^{q}]*")
+            slow_re = re.compile(f"{q}((?:{'|'.join(alternatives)})){q}")
+        return fast_re, slow_re
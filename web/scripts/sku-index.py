@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Resolve SKUs and barcodes across the store seed files.
+
+Keeps a SQLite index of every variant SKU defined by the master product
+files and every SKU referenced by the tenant files, updated incrementally
+on each run (only changed files are re-read). Reports duplicate SKUs,
+tenant references to SKUs no master file defines, and barcode mismatches.
+
+Usage:
+  python sku-index.py                     # update the index and report
+  python sku-index.py lookup SKU [SKU ...]
+  python sku-index.py barcode CODE [CODE ...]
+  python sku-index.py --rebuild
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from seedlib.skuindex import SkuIndex  # noqa: E402
+
+STORE_DIR = Path(__file__).parent.parent / 'db' / 'seeds' / 'data' / '03-store'
+PRODUCTS_DIR = STORE_DIR / 'products'
+TENANT_DIR = STORE_DIR / 'tenant-products'
+INDEX_FILE = Path(__file__).parent / '.cache' / 'sku-index.sqlite'
+REPORT_LIMIT = 20
+
+
+def short(path: str) -> str:
+    return Path(path).name
+
+
+def print_limited(rows: list, fmt):
+    for row in rows[:REPORT_LIMIT]:
+        print(fmt(row))
+    if len(rows) > REPORT_LIMIT:
+        print(f"  ... and {len(rows) - REPORT_LIMIT} more")
+
+
+def report(index: SkuIndex):
+    stats = index.stats()
+    print(f"{stats['files']} files, {stats['variants']} variants ({stats['skus']} distinct SKUs), "
+          f"{stats['refs']} tenant references")
+
+    duplicates = index.duplicates()
+    print(f"\nDuplicate SKUs ({len(duplicates)}):")
+    print_limited(duplicates, lambda d: f"  {d[0]}: " + ', '.join(
+        f"{short(file)}#{position}" for file, position, _ in d[1]))
+
+    orphans = index.orphans()
+    print(f"\nOrphaned tenant references ({len(orphans)}):")
+    print_limited(orphans, lambda r: f"  {r['tenant']}: {r['sku']} ({short(r['file'])}#{r['position']})")
+
+    mismatches = index.barcode_mismatches()
+    print(f"\nBarcode mismatches ({len(mismatches)}):")
+    print_limited(mismatches, lambda r: f"  {r['tenant']}: {r['sku']} has {r['barcode']}, "
+                                        f"master has {r['master_barcode']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index SKUs and barcodes of the store seed files")
+    parser.add_argument('command', nargs='?', choices=('report', 'lookup', 'barcode'), default='report')
+    parser.add_argument('values', nargs='*', help="SKUs or barcodes to look up")
+    parser.add_argument('--index', type=Path, default=INDEX_FILE, help="SQLite index file")
+    parser.add_argument('--rebuild', action='store_true', help="drop the index and read every file again")
+    args = parser.parse_args()
+    if args.command != 'report' and not args.values:
+        parser.error(f"{args.command} needs at least one value")
+
+    if args.rebuild and args.index.exists():
+        args.index.unlink()
+
+    with SkuIndex(args.index) as index:
+        index.update(sorted(PRODUCTS_DIR.glob('*.json')), sorted(TENANT_DIR.glob('*.json')))
+        print(f"Index: {len(index.updated)} files (re)indexed, {len(index.removed)} dropped")
+
+        if args.command == 'report':
+            print("\n" + "=" * 50)
+            print("SKU Report")
+            print("=" * 50)
+            report(index)
+            return
+
+        lookup = index.lookup if args.command == 'lookup' else index.lookup_barcode
+        for value in args.values:
+            rows = lookup(value)
+            print(f"\n{value}: {len(rows) or 'not found'}")
+            for row in rows:
+                print(f"  {row['sku']:<24} {row['barcode'] or '-':<15} {short(row['file'])}#{row['position']}  "
+                      f"{row['name']}")
+
+
+if __name__ == '__main__':
+    main()
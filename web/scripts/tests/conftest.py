@@ -0,0 +1,25 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+@pytest.fixture(scope='session')
+def load_script():
+    """Import a script whose file name is not a valid module name (fix-product-images.py)
+
+    name is relative to web/scripts, e.g. 'gsheets/import-seed-csv'.
+    """
+    def load(name: str):
+        module_name = Path(name).name.replace('-', '_')
+        if module_name not in sys.modules:
+            spec = importlib.util.spec_from_file_location(module_name, SCRIPTS_DIR / f"{name}.py")
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+        return sys.modules[module_name]
+    return load
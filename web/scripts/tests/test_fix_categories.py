@@ -0,0 +1,60 @@
+import ast
+import json
+
+import pytest
+
+
+@pytest.fixture(scope='module')
+def fc(load_script):
+    return load_script('gsheets/fix-categories')
+
+
+@pytest.fixture(scope='module')
+def legacy(load_script):
+    return load_script('gsheets/legacy_categorize')
+
+
+def legacy_keywords(legacy) -> list:
+    """Every keyword listed in the legacy if-chain"""
+    with open(legacy.__file__, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    return sorted({item.value for node in ast.walk(tree) if isinstance(node, ast.List)
+                   for item in node.elts if isinstance(item, ast.Constant) and isinstance(item.value, str)})
+
+
+def test_rule_table_matches_the_legacy_if_chain_on_the_catalog(fc):
+    checked, known, mismatches = fc.parity_check(sorted(fc.PRODUCTS_DIR.glob('*.json')))
+    assert checked > 0
+    assert mismatches == []
+    assert known == len(fc.PARITY_EXCEPTIONS)
+
+
+def test_rule_table_matches_the_legacy_if_chain_on_every_keyword(fc, legacy):
+    # Catches a keyword dropped from category-rules.json that no catalog product uses yet
+    keywords = legacy_keywords(legacy)
+    assert len(keywords) > 500
+    names = [f"PRODUCTO {keyword.strip()} X" for keyword in keywords]
+    results = [(name, legacy.categorize_product(name), fc.RULES.categorize(name)) for name in names]
+    assert [r for r in results if r[1] != r[2]] == []
+
+
+def test_parity_exceptions_still_differ_as_reviewed(fc, legacy):
+    for name, reviewed in fc.PARITY_EXCEPTIONS.items():
+        assert (legacy.categorize_product(name), fc.RULES.categorize(name)) == reviewed, name
+
+
+def test_fuzzy_index_folds_accents_like_the_rules(fc, tmp_path, monkeypatch):
+    catalog = tmp_path / 'products-test.json'
+    catalog.write_text(json.dumps({'products': [
+        {'name': 'Arena Sanitaria Gatos 4kg'},
+        {'name': 'Comedero Acero Inoxidable Perro'},
+    ]}), encoding='utf-8')
+    monkeypatch.setattr(fc, 'FUZZY_FILE', tmp_path / 'trigrams.idx')
+    monkeypatch.setattr(fc, '_fuzzy', None)
+    try:
+        assert fc.ensure_fuzzy_index([catalog])
+        plain, accented = fc.fuzzy_query(['ARENA SANITARIA GATOS 4 KG', 'Aréna Sanitária Gatos 4kg'])
+    finally:
+        fc.fuzzy_index().close()
+    assert plain == accented
+    assert plain[0] == 'ACC-HIG-ARE'
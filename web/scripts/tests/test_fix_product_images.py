@@ -0,0 +1,58 @@
+import pytest
+
+from seedlib.urlindex import UrlIndex
+
+URLS = [
+    'https://images.unsplash.com/photo-1?w=400&fit=crop',  # placeholder rule
+    'https://purina.com.py/sites/default/files/2020-10/dog-chow.png',  # placeholder rule with a path
+    'https://www.purina.com.py/dog-chow',  # same host family, outside the rule's path
+    'https://cdn.unknown-shop.net/img/1.jpg',  # no rule
+]
+
+
+@pytest.fixture(scope='module')
+def fpi(load_script):
+    return load_script('fix-product-images')
+
+
+def through_json(fpi, index, url):
+    products = [{'image_url': url}]
+    fpi.replace_product_images(products, fpi.url_rewriter(index))
+    return products[0]['image_url']
+
+
+def through_sql(fpi, index, url, tmp_path, use_mmap):
+    sql_file = tmp_path / 'generated-seed.sql'
+    sql_file.write_text("-- it's generated\nINSERT INTO store_products (sku, image_url) "
+                        f"VALUES (E'it\\'s', '{url}');\n", encoding='utf-8')
+    fpi.update_sql_seed(sql_file, index, use_mmap=use_mmap)
+    return sql_file.read_text(encoding='utf-8').split("', '")[1].rstrip("');\n")
+
+
+@pytest.mark.parametrize('use_mmap', [False, True])
+@pytest.mark.parametrize('url', URLS)
+def test_json_and_sql_rewrite_a_url_alike(fpi, tmp_path, url, use_mmap):
+    expected = through_json(fpi, fpi.URL_INDEX, url)
+    assert through_sql(fpi, fpi.URL_INDEX, url, tmp_path, use_mmap) == expected
+
+
+@pytest.mark.parametrize('default', ['keep', 'placeholder'])
+def test_sql_follows_the_index_default(fpi, tmp_path, default):
+    index = UrlIndex(fpi.PLACEHOLDER_URL, default)
+    index.add('cdn.shopify.com', 'keep')
+    for url in ('https://cdn.shopify.com/a.jpg', 'https://cdn.unknown-shop.net/b.jpg'):
+        assert through_sql(fpi, index, url, tmp_path, False) == through_json(fpi, index, url)
+
+
+def test_shipped_rules_do_not_depend_on_the_default(fpi):
+    index = fpi.URL_INDEX
+    assert index.default == 'keep'
+    assert index.rewrite(URLS[1]) == fpi.PLACEHOLDER_URL
+    assert index.rewrite(URLS[2]) == URLS[2]
+
+
+def test_only_urls_failing_with_a_status_become_the_placeholder(fpi):
+    broken, flaky = URLS[0], 'https://images.unsplash.com/photo-2?w=400'
+    rewrite = fpi.url_rewriter(fpi.URL_INDEX, {broken: False, flaky: None}.get)
+    assert rewrite(broken) == fpi.PLACEHOLDER_URL
+    assert rewrite(flaky) == flaky
@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+from seedlib import sheetcsv
+from seedlib.skuindex import SkuIndex
+
+BRANDS = {'$schema': '../_schemas/store.schema.json', 'brands': [
+    {'slug': 'hills', 'name': "Hill's Science Diet", 'specialties': ['perros', 'gatos']},
+    {'slug': 'elanco', 'name': 'Elanco Animal Health'},
+]}
+
+
+@pytest.fixture(scope='module')
+def isc(load_script):
+    return load_script('gsheets/import-seed-csv')
+
+
+@pytest.fixture(scope='module')
+def fc(isc):
+    return isc.load_categorizer()
+
+
+def run_import(isc, fc, tmp_path, text: str, existing=(), **kwargs):
+    """Import text as a CSV export into tmp_path/store, returning the committed Importer
+
+    existing lists other product files whose SKUs are already taken.
+    """
+    csv_file = tmp_path / 'export.csv'
+    csv_file.write_text(text, encoding='utf-8')
+    store = tmp_path / 'store'
+    store.mkdir(exist_ok=True)
+    if not (store / 'brands.json').exists():
+        (store / 'brands.json').write_text(json.dumps(BRANDS, indent=2) + '\n', encoding='utf-8')
+    clinic = isc.ClinicSheet(csv_file)
+    with SkuIndex(tmp_path / 'sku-index.sqlite') as index:
+        index.update(existing, [])
+        importer = isc.Importer(fc, 'export', store, index, clinic=clinic.get, **kwargs)
+        for sheet, _, record in sheetcsv.iter_records(csv_file):
+            importer.add(sheet, record)
+    clinic.close()
+    importer.commit()
+    return importer
+
+
+def products_of(tmp_path, brand_slug: str) -> list:
+    path = tmp_path / 'store' / 'products' / f"products-export-{brand_slug}.json"
+    return json.loads(path.read_text(encoding='utf-8'))['products']
+
+
+def test_brands_match_by_name_without_punctuation_and_missing_ones_are_added(isc, fc, tmp_path):
+    importer = run_import(isc, fc, tmp_path, """\
+# HOJA: 🏷️ Marcas
+Hills Science Diet,USA,Sí
+Elanco,USA,Sí
+Laboratorios Bagó,Argentina,Sí
+# HOJA: 🆕 Productos (CATÁLOGO MASTER)
+Hills Prescription Diet k/d 4kg,ALI-TER,HI-001,Bolsa,1,Bolsa,350000,,Dieta renal perros,Sí
+Milbemax Perros 5-25kg,ANT-INT,EL-002,Caja,2,Comprimido,90000,,Antiparasitario interno,Sí
+Amoxicilina 500mg,MED-ANT,LA-003,Caja,10,Comprimido,30000,,Antibiótico,Sí
+""")
+
+    assert set(importer.per_brand) == {'hills', 'elanco', 'laboratorios-bago'}
+    brands = json.loads((tmp_path / 'store' / 'brands.json').read_text(encoding='utf-8'))['brands']
+    assert brands[:2] == BRANDS['brands']
+    assert brands[2:] == [{'slug': 'laboratorios-bago', 'name': 'Laboratorios Bagó', 'country_origin': 'Argentina'}]
+    assert products_of(tmp_path, 'laboratorios-bago')[0]['name'] == 'Amoxicilina 500mg'
+
+
+def test_price_and_prescription_come_from_mis_productos(isc, fc, tmp_path):
+    run_import(isc, fc, tmp_path, """\
+# HOJA: 🆕 Productos (CATÁLOGO MASTER)
+Amoxicilina 500mg,MED-ANT,Zoetis,Caja,10,Comprimido,30000,,Antibiótico,Sí
+Enrofloxacina 50mg,MED-ANT,Zoetis,Caja,10,Comprimido,38000,,Antibiótico,Sí
+# HOJA: 📋 Mis Productos (PRODUCTOS DE TU CLÍNICA)
+Amoxicilina 500mg,7500,20,50,Farmacia,Sí,Sí
+""", tenant='demo')
+
+    listed, unlisted = products_of(tmp_path, 'zoetis')
+    assert listed['requires_prescription'] is True
+    assert listed['variants'] == [{'size': 'Comprimido', 'base_price': 7500, 'cost_price': 3000, 'sku_suffix': ''}]
+    assert 'requires_prescription' not in unlisted
+    assert unlisted['variants'] == [{'size': 'Comprimido', 'cost_price': 3800, 'sku_suffix': ''}]
+    tenant = json.loads((tmp_path / 'store' / 'tenant-products' / 'demo.json').read_text(encoding='utf-8'))
+    assert 'requires_prescription' not in tenant['products'][0]
+
+
+def test_unknown_products_fall_back_to_their_sheet_category(isc, fc, tmp_path):
+    importer = run_import(isc, fc, tmp_path, """\
+# HOJA: 🆕 Productos (CATÁLOGO MASTER)
+Guantes Látex M x100,INS-GUA,Kruuse,Caja,100,Unidad,52000,,Guantes examen,Sí
+Producto Especial X,ALI-TER,Kruuse,Bolsa,1,Bolsa,90000,,Dieta para gatos adultos,Sí
+Producto Especial Y,XYZ,Kruuse,Bolsa,1,Bolsa,90000,,Sin categoría,Sí
+""")
+
+    assert [p['category_slug'] for p in products_of(tmp_path, 'kruuse')] == ['CLI-INS-EPP', 'NUT-FEL-PRE']
+    assert importer.by_sheet == 2
+    assert importer.skip_reasons == [('Producto Especial Y', "no category in the tree for 'XYZ'")]
+
+
+def test_duplicate_skus_are_skipped(isc, fc, tmp_path):
+    other = tmp_path / 'products-other.json'
+    other.write_text(json.dumps({'products': [{'sku': 'KRU-COLLAR-ISABELINO-M', 'name': 'Collar'}]}),
+                     encoding='utf-8')
+    importer = run_import(isc, fc, tmp_path, """\
+# HOJA: 🆕 Productos (CATÁLOGO MASTER)
+Guantes Látex M x100,INS-GUA,Kruuse,Caja,100,Unidad,52000,,Guantes examen,Sí
+Guantes-Látex M x100,INS-GUA,Kruuse,Caja,100,Unidad,52000,,Misma SKU,Sí
+Collar Isabelino M,ACC-COL,Kruuse,Unidad,1,Unidad,25000,,Ya en el catálogo,Sí
+# HOJA: 📋 Mis Productos (PRODUCTOS DE TU CLÍNICA)
+Guantes Látex M x100,950,10,300,Consultorio,No,Sí
+""", existing=[other], tenant='demo')
+
+    assert [p['name'] for p in products_of(tmp_path, 'kruuse')] == ['Guantes Látex M x100']
+    assert importer.skip_reasons == [
+        ('Guantes-Látex M x100',
+         'SKU KRU-GUANTES-LATEX-M-X100 already used by products-export-kruuse.json#0'),
+        ('Collar Isabelino M', 'SKU KRU-COLLAR-ISABELINO-M already used by products-other.json#0'),
+    ]
+    assert importer.rows['assigned'] == 1
@@ -0,0 +1,78 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from seedlib.imagestore import ImageStore, sniff_extension
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 64
+SOFT_404 = b'<!DOCTYPE html><html><body>Producto no encontrado</body></html>'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """/a.jpg and /b.jpg serve the same PNG, /gone.jpg an HTML page with 200, /short.jpg a truncated body"""
+
+    def do_GET(self):
+        body, content_type, length = PNG, 'image/png', len(PNG)
+        if self.path == '/gone.jpg':
+            body, content_type, length = SOFT_404, 'text/html; charset=utf-8', len(SOFT_404)
+        elif self.path == '/short.jpg':
+            length = len(PNG) * 2
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(length))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def lpi(load_script):
+    return load_script('localize-product-images')
+
+
+@pytest.fixture(scope='module')
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_identical_images_are_stored_once_and_both_products_rewritten(lpi, server, tmp_path):
+    store = ImageStore(tmp_path / 'store', '/images/products')
+    urls = [f"{server}/a.jpg", f"{server}/b.jpg"]
+
+    assert lpi.fetch_all(urls, store) == []
+
+    assert (store.added, store.deduped) == (1, 1)
+    assert len(list((tmp_path / 'store').rglob('*.png'))) == 1
+    products = [{'image_url': urls[0]}, {'image_url': urls[1], 'images': [urls[0]]}]
+    assert lpi.localize_products(products, store) == 2
+    local = store.local_url(urls[0])
+    assert local.startswith('/images/products/') and local.endswith('.png')
+    assert products == [{'image_url': local}, {'image_url': local, 'images': [local]}]
+
+
+def test_failed_fetches_are_reported_and_keep_their_url(lpi, server, tmp_path):
+    store = ImageStore(tmp_path / 'store', '/images/products')
+    urls = [f"{server}/gone.jpg", f"{server}/short.jpg"]
+
+    failed = dict(lpi.fetch_all(urls, store))
+
+    assert set(failed) == set(urls)
+    assert 'not an image' in str(failed[urls[0]])
+    assert store.sources == {}
+    products = [{'image_url': url} for url in urls]
+    assert lpi.localize_products(products, store) == 0
+
+
+def test_html_is_not_an_image_whatever_the_url_says():
+    assert sniff_extension(PNG) == 'png'
+    assert sniff_extension(b'<?xml version="1.0"?>\n<svg xmlns="http://www.w3.org/2000/svg"/>') == 'svg'
+    with pytest.raises(ValueError):
+        sniff_extension(SOFT_404)
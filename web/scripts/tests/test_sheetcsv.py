@@ -0,0 +1,59 @@
+import pytest
+
+from seedlib import sheetcsv
+
+
+def records(tmp_path, text: str) -> list:
+    path = tmp_path / 'export.csv'
+    path.write_text(text, encoding='utf-8')
+    return list(sheetcsv.iter_records(path))
+
+
+def test_banners_switch_the_sheet_and_comments_are_skipped(tmp_path):
+    found = records(tmp_path, """\
+# HOJA: 🏷️ Marcas
+# Columnas: Nombre, País, Activo
+Royal Canin,Francia,Sí
+
+# HOJA: ⚙️ Configuración (Ubicaciones)
+DEP-MAIN,Depósito Principal,,No
+# HOJA: 📦 Movimientos Internos
+a,b
+""")
+    assert found == [
+        ('Marcas', 3, {'name': 'Royal Canin', 'country': 'Francia', 'active': True}),
+        ('Configuración', 6, {'code': 'DEP-MAIN', 'location': 'Depósito Principal', 'description': None,
+                              'active': False}),
+        ('Movimientos Internos', 8, ['a', 'b']),
+    ]
+
+
+def test_int_reads_thousands_separators():
+    assert sheetcsv._int('580.000') == 580000
+    assert sheetcsv._int('1.250.000') == 1250000
+    assert sheetcsv._int(' 42 ') == 42
+    with pytest.raises(ValueError):
+        sheetcsv._int('12.5')
+
+
+def test_trailing_empty_cells_are_dropped(tmp_path):
+    found = records(tmp_path, "# HOJA: 🏷️ Marcas\nKong,USA,Sí,,,\n")
+    assert found[0][2] == {'name': 'Kong', 'country': 'USA', 'active': True}
+
+
+def test_a_wrong_column_count_names_the_line(tmp_path):
+    with pytest.raises(ValueError, match=r'export.csv:3: Marcas rows have 3 columns, got 2'):
+        records(tmp_path, "# HOJA: 🏷️ Marcas\n\nKong,USA\n")
+
+
+def test_data_before_the_first_banner_is_an_error(tmp_path):
+    with pytest.raises(ValueError, match='before the first'):
+        records(tmp_path, "Kong,USA,Sí\n")
+
+
+def test_quoted_cells_keep_comment_and_blank_lines(tmp_path):
+    found = records(tmp_path, '# HOJA: ⚙️ Configuración\n'
+                              'DEP-MAIN,Depósito,"Línea 1\n\n# no es comentario\n""fin""",Sí\n')
+    # The line number is the row's last line
+    assert found == [('Configuración', 5, {'code': 'DEP-MAIN', 'location': 'Depósito', 'active': True,
+                                           'description': 'Línea 1\n\n# no es comentario\n"fin"'})]
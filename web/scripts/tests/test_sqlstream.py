@@ -0,0 +1,34 @@
+import io
+import re
+
+import pytest
+
+from seedlib import sqlstream
+
+URL = re.compile(r"'(https?://[^']*)'")
+
+# Apostrophes outside string literals used to shift the chunk cuts into a URL
+SQL = (
+    "-- don't rewrite by hand\n"
+    "INSERT INTO products VALUES (E'it\\'s', 'https://images.example.com/a.jpg');\n"
+    "/* the owner's pick */ UPDATE products SET image_url = 'https://cdn.example.com/b.png';\n"
+) * 50 + "SELECT 'https://cdn.example.com/last.png'"
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 4096, sqlstream.CHUNK_SIZE])
+def test_chunks_keep_every_url_whole(chunk_size):
+    chunks = list(sqlstream.iter_chunks(io.StringIO(SQL), chunk_size))
+    assert ''.join(chunks) == SQL
+    found = [m.group(1) for text in chunks for m in URL.finditer(text)]
+    assert found == [m.group(1) for m in URL.finditer(SQL)]
+
+
+def test_rewrite_replaces_urls_next_to_comment_apostrophes(tmp_path):
+    path = tmp_path / 'seed.sql'
+    path.write_text(SQL, encoding='utf-8')
+    assert sqlstream.count(path, URL, chunk_size=64) == 101
+
+    assert sqlstream.rewrite(path, URL, "'/placeholder.svg'", chunk_size=64) == 101
+    text = path.read_text(encoding='utf-8')
+    assert 'https://' not in text
+    assert text == URL.sub("'/placeholder.svg'", SQL)
@@ -0,0 +1,96 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from seedlib.urlcheck import URLChecker, UrlCache
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """/ok 200, /missing 404, /redirect 302 to /ok, /nohead 405 on HEAD, /drop closes without answering"""
+
+    protocol_version = 'HTTP/1.1'
+    arrivals = []
+
+    def _reply(self, status: int, location: str = None):
+        self.send_response(status)
+        if location:
+            self.send_header('Location', location)
+        body = b'x' if self.command == 'GET' else b''
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _answer(self):
+        self.arrivals.append(self.headers['Host'].partition(':')[0])
+        if self.path == '/ok':
+            self._reply(200)
+        elif self.path == '/redirect':
+            self._reply(302, location='/ok')
+        elif self.path == '/nohead':
+            self._reply(405 if self.command == 'HEAD' else 200)
+        elif self.path == '/drop':
+            self.close_connection = True
+        else:
+            self._reply(404)
+
+    do_HEAD = do_GET = _answer
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_check_all_against_a_stub_server(server, tmp_path):
+    urls = {name: f"{server}/{name}" for name in ('ok', 'missing', 'redirect', 'nohead', 'drop')}
+    cache = UrlCache(tmp_path / 'url-health.json')
+    checker = URLChecker(host_rate=None, timeout=2, cache=cache)
+
+    results = checker.check_all(urls.values())
+
+    assert results == {urls['ok']: True, urls['missing']: False, urls['redirect']: True,
+                       urls['nohead']: True, urls['drop']: None}
+    assert checker.statuses[urls['missing']] == 404
+    assert checker.statuses[urls['drop']] == 0
+    cache.save()
+    cached = UrlCache(tmp_path / 'url-health.json').entries
+    assert {url: entry['ok'] for url, entry in cached.items()} == {
+        urls['ok']: True, urls['missing']: False, urls['redirect']: True, urls['nohead']: True}
+
+
+def test_cache_answers_reruns_except_unreachable_urls(server, tmp_path):
+    urls = [f"{server}/ok", f"{server}/drop"]
+    cache = UrlCache(tmp_path / 'url-health.json')
+    URLChecker(host_rate=None, timeout=2, cache=cache).check_all(urls)
+    cache.save()
+
+    checker = URLChecker(host_rate=None, timeout=2, cache=UrlCache(tmp_path / 'url-health.json'))
+    checker.check_all(urls)
+    assert (checker.cached, checker.probed) == (1, 1)
+
+
+def test_unreachable_entries_from_older_caches_are_ignored(tmp_path):
+    cache = UrlCache(tmp_path / 'url-health.json')
+    cache.entries['http://offline.example/a.jpg'] = {'ok': False, 'status': 0, 'checked_at': 2e9}
+    assert cache.get('http://offline.example/a.jpg') is None
+
+
+def test_a_rate_limited_host_does_not_hold_every_slot(server):
+    port = server.rpartition(':')[2]
+    slow = [f"http://127.0.0.1:{port}/ok?{i}" for i in range(6)]
+    other = [f"http://localhost:{port}/ok?{i}" for i in range(2)]
+    StubHandler.arrivals.clear()
+
+    URLChecker(concurrency=2, host_rate=20, timeout=2).check_all(slow + other)
+
+    # 127.0.0.1 only gets a request every 50 ms; localhost must not queue behind it
+    assert StubHandler.arrivals[:4].count('localhost') == 2